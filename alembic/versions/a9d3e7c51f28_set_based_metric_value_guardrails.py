@@ -0,0 +1,155 @@
+"""set-based metric value guardrails
+
+Revision ID: a9d3e7c51f28
+Revises: e8c4f0b6a213
+Create Date: 2026-10-17 16:40:12.507311
+
+Replaces the FOR EACH ROW raw-only (8faf87dba1c4) and percent range
+(58a6ff0e42f7) triggers, which ran two metric_definitions lookups per
+written row, with statement-level triggers: one query joins every row
+written by the statement (transition table) with metric_definitions.
+Error messages are unchanged.
+
+The SQL is kept in module constants so that benchmarks/guardrails.py can
+install both variants.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e7c51f28'
+down_revision = 'e8c4f0b6a213'
+branch_labels = None
+depends_on = None
+
+VALUE_TABLES = {
+    "team": "team_match_metric_values",
+    "player": "player_match_metric_values",
+}
+
+# Rows of the triggering statement are exposed as the `new_values`
+# transition table (same name in every trigger using the function)
+SET_BASED_FUNCTION = """
+CREATE OR REPLACE FUNCTION check_metric_values()
+RETURNS trigger AS $$
+DECLARE
+    bad record;
+BEGIN
+    SELECT v.metric_id, v.value_number, d.is_derived
+    INTO bad
+    FROM new_values v
+    JOIN metric_definitions d ON d.id = v.metric_id
+    WHERE d.is_derived
+       OR (d.datatype = 'PERCENT' AND (v.value_number < 0 OR v.value_number > 100))
+    LIMIT 1;
+
+    IF FOUND THEN
+        IF bad.is_derived THEN
+            RAISE EXCEPTION 'Cannot store derived metric_id=%', bad.metric_id;
+        END IF;
+        RAISE EXCEPTION 'Percent metric out of range (0-100): metric_id=% value=%',
+            bad.metric_id, bad.value_number;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Transition tables cannot be used by a trigger with several events:
+# one trigger for INSERT, one for UPDATE (ON CONFLICT DO UPDATE fires both)
+SET_BASED_TRIGGERS = "".join(
+    f"""
+    DROP TRIGGER IF EXISTS trg_check_{name}_values_{event.lower()} ON {table};
+    CREATE TRIGGER trg_check_{name}_values_{event.lower()}
+    AFTER {event} ON {table}
+    REFERENCING NEW TABLE AS new_values
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION check_metric_values();
+    """
+    for name, table in VALUE_TABLES.items()
+    for event in ("INSERT", "UPDATE")
+)
+
+DROP_SET_BASED = "".join(
+    f"DROP TRIGGER IF EXISTS trg_check_{name}_values_{event.lower()} ON {table};\n"
+    for name, table in VALUE_TABLES.items()
+    for event in ("INSERT", "UPDATE")
+) + "DROP FUNCTION IF EXISTS check_metric_values();\n"
+
+# Previous per-row guardrails (downgrade)
+ROW_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION prevent_derived_metric_values()
+RETURNS trigger AS $$
+DECLARE
+    derived boolean;
+BEGIN
+    SELECT is_derived INTO derived
+    FROM metric_definitions
+    WHERE id = NEW.metric_id;
+
+    IF derived IS TRUE THEN
+        RAISE EXCEPTION 'Cannot store derived metric_id=%', NEW.metric_id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enforce_percent_range()
+RETURNS trigger AS $$
+DECLARE
+    dtype text;
+BEGIN
+    SELECT datatype::text INTO dtype
+    FROM metric_definitions
+    WHERE id = NEW.metric_id;
+
+    -- Only enforce for PERCENT metrics
+    IF dtype = 'PERCENT' THEN
+        IF NEW.value_number < 0 OR NEW.value_number > 100 THEN
+            RAISE EXCEPTION 'Percent metric out of range (0-100): metric_id=% value=%',
+                NEW.metric_id, NEW.value_number;
+        END IF;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ROW_TRIGGERS = "".join(
+    f"""
+    DROP TRIGGER IF EXISTS trg_{trigger}_{name}_values ON {table};
+    CREATE TRIGGER trg_{trigger}_{name}_values
+    BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW
+    EXECUTE FUNCTION {function}();
+    """
+    for name, table in VALUE_TABLES.items()
+    for trigger, function in (
+        ("prevent_derived", "prevent_derived_metric_values"),
+        ("enforce_percent", "enforce_percent_range"),
+    )
+)
+
+DROP_ROW_BASED = "".join(
+    f"DROP TRIGGER IF EXISTS trg_{trigger}_{name}_values ON {table};\n"
+    for name, table in VALUE_TABLES.items()
+    for trigger in ("prevent_derived", "enforce_percent")
+) + """
+DROP FUNCTION IF EXISTS prevent_derived_metric_values();
+DROP FUNCTION IF EXISTS enforce_percent_range();
+"""
+
+
+def upgrade() -> None:
+    op.execute(DROP_ROW_BASED)
+    op.execute(SET_BASED_FUNCTION)
+    op.execute(SET_BASED_TRIGGERS)
+
+
+def downgrade() -> None:
+    op.execute(DROP_SET_BASED)
+    op.execute(ROW_FUNCTIONS)
+    op.execute(ROW_TRIGGERS)
@@ -0,0 +1,50 @@
+"""add data_versions stamps
+
+Revision ID: b7d41c2e9a63
+Revises: 58a6ff0e42f7
+Create Date: 2026-10-17 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41c2e9a63'
+down_revision = '58a6ff0e42f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+    # Any write to metric_definitions (seed, manual SQL) bumps the registry version
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_metric_definitions_version()
+    RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO data_versions (key, version) VALUES ('metric_definitions', 1)
+        ON CONFLICT (key) DO UPDATE SET version = data_versions.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS trg_bump_metric_definitions_version ON metric_definitions;
+    CREATE TRIGGER trg_bump_metric_definitions_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON metric_definitions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_metric_definitions_version();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_bump_metric_definitions_version ON metric_definitions;")
+    op.execute("DROP FUNCTION IF EXISTS bump_metric_definitions_version();")
+    op.drop_table('data_versions')
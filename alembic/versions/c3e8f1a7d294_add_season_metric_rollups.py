@@ -0,0 +1,81 @@
+"""add season metric rollups
+
+Revision ID: c3e8f1a7d294
+Revises: b7d41c2e9a63
+Create Date: 2026-10-17 10:04:27.381952
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8f1a7d294'
+down_revision = 'b7d41c2e9a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    metricside = postgresql.ENUM('OWN', 'OPPONENT', 'NONE', name='metricside', create_type=False)
+
+    op.create_table('team_season_metric_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('season_id', sa.Integer(), nullable=False),
+        sa.Column('metric_id', sa.Integer(), nullable=False),
+        sa.Column('side', metricside, nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+        sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+        sa.ForeignKeyConstraint(['metric_id'], ['metric_definitions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('team_id', 'season_id', 'metric_id', 'side', name='uq_team_season_metric_side')
+    )
+    op.create_index(op.f('ix_team_season_metric_rollups_id'), 'team_season_metric_rollups', ['id'], unique=False)
+
+    op.create_table('player_season_metric_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('season_id', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('metric_id', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+        sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.ForeignKeyConstraint(['metric_id'], ['metric_definitions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('team_id', 'season_id', 'player_id', 'metric_id', name='uq_team_season_player_metric')
+    )
+    op.create_index(op.f('ix_player_season_metric_rollups_id'), 'player_season_metric_rollups', ['id'], unique=False)
+
+    # Leaderboard reads: one metric of one team, grouped by player
+    op.create_index('ix_psmr_team_metric', 'player_season_metric_rollups', ['team_id', 'metric_id'], unique=False)
+
+    # Backfill from the raw values
+    op.execute("""
+    INSERT INTO team_season_metric_rollups (team_id, season_id, metric_id, side, value_sum, value_count)
+    SELECT m.team_id, m.season_id, v.metric_id, v.side, SUM(v.value_number), COUNT(*)
+    FROM team_match_metric_values v
+    JOIN matches m ON m.id = v.match_id
+    GROUP BY m.team_id, m.season_id, v.metric_id, v.side;
+    """)
+    op.execute("""
+    INSERT INTO player_season_metric_rollups (team_id, season_id, player_id, metric_id, value_sum, value_count)
+    SELECT m.team_id, m.season_id, v.player_id, v.metric_id, SUM(v.value_number), COUNT(*)
+    FROM player_match_metric_values v
+    JOIN matches m ON m.id = v.match_id
+    GROUP BY m.team_id, m.season_id, v.player_id, v.metric_id;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_psmr_team_metric', table_name='player_season_metric_rollups')
+    op.drop_index(op.f('ix_player_season_metric_rollups_id'), table_name='player_season_metric_rollups')
+    op.drop_table('player_season_metric_rollups')
+    op.drop_index(op.f('ix_team_season_metric_rollups_id'), table_name='team_season_metric_rollups')
+    op.drop_table('team_season_metric_rollups')
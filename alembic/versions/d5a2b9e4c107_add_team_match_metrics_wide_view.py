@@ -0,0 +1,75 @@
+"""add team_match_metrics_wide materialized view
+
+Revision ID: d5a2b9e4c107
+Revises: c3e8f1a7d294
+Create Date: 2026-10-17 14:21:09.517302
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a2b9e4c107'
+down_revision = 'c3e8f1a7d294'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per match, one column per raw team metric and side ("<slug>__own",
+    # "<slug>__opponent"). Columns follow metric_definitions, so the view is
+    # (re)created by a function: it is rebuilt when the column set changes
+    # (signature stored as the view comment) and refreshed concurrently otherwise.
+    # team_version records the team data version seen by the refresh, which lets
+    # readers detect rows older than the team's latest write.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION refresh_team_match_metrics_wide()
+    RETURNS void AS $$
+    DECLARE
+        cols text;
+        signature text;
+    BEGIN
+        SELECT string_agg(
+            format('max(v.value_number) FILTER (WHERE v.metric_id = %s AND v.side = %L) AS %I',
+                   md.id, s.side, md.slug || '__' || lower(s.side)),
+            ', ' ORDER BY md.slug, s.side)
+        INTO cols
+        FROM metric_definitions md
+        CROSS JOIN (VALUES ('OWN'), ('OPPONENT')) AS s(side)
+        WHERE md.scope::text = 'TEAM'
+          AND NOT md.is_derived
+          AND length(md.slug || '__' || lower(s.side)) <= 63;
+
+        signature := md5(coalesce(cols, ''));
+
+        IF to_regclass('team_match_metrics_wide') IS NOT NULL
+           AND obj_description(to_regclass('team_match_metrics_wide'), 'pg_class') = signature THEN
+            REFRESH MATERIALIZED VIEW CONCURRENTLY team_match_metrics_wide;
+            RETURN;
+        END IF;
+
+        DROP MATERIALIZED VIEW IF EXISTS team_match_metrics_wide;
+        EXECUTE format($view$
+            CREATE MATERIALIZED VIEW team_match_metrics_wide AS
+            SELECT m.id AS match_id, m.team_id, m.season_id, m.date,
+                   coalesce(dv.version, 0) AS team_version%s
+            FROM matches m
+            LEFT JOIN team_match_metric_values v ON v.match_id = m.id
+            LEFT JOIN data_versions dv ON dv.key = 'team:' || m.team_id
+            GROUP BY m.id, m.team_id, m.season_id, m.date, dv.version
+        $view$, CASE WHEN cols IS NULL THEN '' ELSE ', ' || cols END);
+
+        -- Unique index required by REFRESH ... CONCURRENTLY
+        CREATE UNIQUE INDEX ix_tmmw_match_id ON team_match_metrics_wide (match_id);
+        CREATE INDEX ix_tmmw_team_date ON team_match_metrics_wide (team_id, date);
+        EXECUTE format('COMMENT ON MATERIALIZED VIEW team_match_metrics_wide IS %L', signature);
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("SELECT refresh_team_match_metrics_wide();")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS team_match_metrics_wide;")
+    op.execute("DROP FUNCTION IF EXISTS refresh_team_match_metrics_wide();")
@@ -0,0 +1,39 @@
+"""add keyset pagination indexes
+
+Revision ID: e8c4f0b6a213
+Revises: d5a2b9e4c107
+Create Date: 2026-10-17 15:02:44.918230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c4f0b6a213'
+down_revision = 'd5a2b9e4c107'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # list_matches pages: WHERE team_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC
+    op.create_index(
+        "ix_matches_team_date_id",
+        "matches",
+        ["team_id", "date", "id"],
+        unique=False,
+    )
+
+    # list_players pages: WHERE team_id = ? AND (last_name, first_name, id) > (?, ?, ?)
+    op.create_index(
+        "ix_players_team_name_id",
+        "players",
+        ["team_id", "last_name", "first_name", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_players_team_name_id", table_name="players")
+    op.drop_index("ix_matches_team_date_id", table_name="matches")
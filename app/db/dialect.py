@@ -0,0 +1,23 @@
+"""
+Dialect helpers.
+
+PostgreSQL is the production database, SQLite is used by the test suite.
+Both support `INSERT ... ON CONFLICT DO UPDATE`, but through different
+SQLAlchemy constructs; `insert_for` picks the right one for a session.
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_name(db: Session) -> str:
+    """Name of the dialect bound to the session ("postgresql", "sqlite", ...)"""
+    return db.get_bind().dialect.name
+
+
+def insert_for(db: Session, table):
+    """Dialect-specific INSERT construct supporting on_conflict_do_update()"""
+    if dialect_name(db) == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name(db) == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Unsupported dialect: {dialect_name(db)}")
@@ -0,0 +1,149 @@
+"""
+Per-request SQL statistics and slow statement logging.
+
+Engine-level event listeners (registered for every Engine, including the
+async engines' sync side) add each statement to the QueryStats of the
+current request, found through a context variable set by the request
+middleware (app.instrumentation). The variable follows the request into
+threadpool routes and `AsyncSession.run_sync` greenlets.
+
+Statements slower than DB_SLOW_QUERY_MS are logged with their EXPLAIN plan
+(DB_EXPLAIN_SLOW_QUERIES), run on a separate DBAPI cursor of the same
+connection.
+"""
+import contextvars
+import logging
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Connection.info key of the statement start times
+_STARTED = "query_stats_started"
+
+# Length of the statement kept for the slowest query / logs
+STATEMENT_PREVIEW_CHARS = 200
+
+# First table of a statement (for short labels)
+_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)', re.IGNORECASE)
+
+
+def statement_label(statement: Optional[str]) -> str:
+    """Short label of a statement, its verb and first table (e.g. `SELECT matches`)"""
+    verb = re.match(r"\s*(\w+)", statement or "")
+    if verb is None:
+        return ""
+    table = _TABLE_RE.search(statement)
+    verb = verb.group(1).upper()
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+class QueryStats:
+    """SQL work done on behalf of one request"""
+
+    __slots__ = ("statements", "db_ms", "slowest_ms", "slowest_statement", "slow_statements", "rows_hydrated")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slow_statements = 0
+        self.rows_hydrated = 0
+
+    def observe(self, statement: str, elapsed_ms: float, slow: bool) -> None:
+        self.statements += 1
+        self.db_ms += elapsed_ms
+        if slow:
+            self.slow_statements += 1
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement[:STATEMENT_PREVIEW_CHARS]
+
+
+_current: "contextvars.ContextVar[Optional[QueryStats]]" = contextvars.ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> "contextvars.Token":
+    """Collect statistics for the current context (request)"""
+    return _current.set(QueryStats())
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def stop_query_stats(token: "contextvars.Token") -> None:
+    _current.reset(token)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN plan of a SELECT statement, on a separate cursor of the same connection"""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    raw = conn.connection.cursor()
+    try:
+        # On PostgreSQL a failed EXPLAIN must not abort the request's transaction
+        if dialect == "postgresql":
+            raw.execute("SAVEPOINT query_stats_explain")
+        try:
+            raw.execute(prefix + statement, parameters)
+            plan = "\n".join(" ".join(str(c) for c in row) for row in raw.fetchall())
+        except Exception as e:
+            if dialect == "postgresql":
+                raw.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+            plan = f"(EXPLAIN failed: {e})"
+        if dialect == "postgresql":
+            raw.execute("RELEASE SAVEPOINT query_stats_explain")
+        return plan
+    finally:
+        raw.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED)
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    threshold = settings.DB_SLOW_QUERY_MS
+    slow = threshold > 0 and elapsed_ms >= threshold
+
+    stats = _current.get()
+    if stats is not None:
+        stats.observe(statement, elapsed_ms, slow)
+
+    if slow:
+        plan = None
+        if settings.DB_EXPLAIN_SLOW_QUERIES and not executemany:
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:  # never fail the request because of the diagnostics
+                plan = f"(EXPLAIN failed: {e})"
+        logger.warning(
+            "Slow SQL statement (%.1f ms >= %s ms): %s%s",
+            elapsed_ms, threshold, statement[:STATEMENT_PREVIEW_CHARS * 5],
+            f"\nPlan:\n{plan}" if plan else "",
+        )
+
+
+@event.listens_for(Mapper, "load")
+def _on_load(target, context):
+    """Count ORM instances hydrated from result rows"""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows_hydrated += 1
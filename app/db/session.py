@@ -1,14 +1,56 @@
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.db.telemetry import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+
+# Async drivers for the sync DATABASE_URL drivers (psycopg 3 is both sync and async)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Async driver URL equivalent to a sync database URL"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    create_engine() keyword arguments from settings.
+
+    Pool sizing and the statement timeout only apply to server databases;
+    SQLite keeps SQLAlchemy's default pool for its driver.
+    """
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    options.update({
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    })
+    if settings.DB_STATEMENT_TIMEOUT_MS and make_url(url).get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_engine("sync", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,3 +62,20 @@ def get_db():
         yield db
     finally:
         db.close()
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+instrument_engine("async", async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    """
+    Async session dependency.
+
+    Queries are awaited on the event loop instead of holding a threadpool
+    slot; sync service code runs on it through `AsyncSession.run_sync`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
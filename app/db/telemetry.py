@@ -0,0 +1,158 @@
+"""
+Connection pool telemetry.
+
+Pool sizing depends on the number of workers and on how long requests hold
+connections, which is invisible with the default pools. Engines created by
+app.db.session use pool classes that time every checkout, plus pool / engine
+event listeners counting connects, invalidations and pre-ping failures.
+
+`pool_report()` backs the `/health/db` endpoint.
+"""
+import bisect
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolTelemetry:
+    """Counters and checkout wait histogram of one pool"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.wait_buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def observe_checkout(self, seconds: float, timed_out: bool = False) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+            self.wait_total_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            observed = self.checkouts + self.checkout_timeouts
+            labels = [f"le_{b}ms" for b in WAIT_BUCKETS_MS] + ["gt_5000ms"]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "pre_ping_failures": self.pre_ping_failures,
+                "wait_ms": {
+                    "avg": round(self.wait_total_ms / observed, 3) if observed else 0.0,
+                    "max": round(self.wait_max_ms, 3),
+                    "histogram": dict(zip(labels, self.wait_buckets)),
+                },
+            }
+
+
+class _TimedPoolMixin:
+    """Times Pool.connect() (queue wait + pre-ping + connect) into PoolTelemetry"""
+
+    telemetry: PoolTelemetry
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.telemetry.observe_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self.telemetry.observe_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # Engine.dispose() swaps the pool; keep the counters
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool with checkout telemetry"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout telemetry"""
+
+
+# name -> sync Engine
+_engines: "weakref.WeakValueDictionary[str, Engine]" = weakref.WeakValueDictionary()
+
+
+def _telemetry(pool: Pool) -> Optional[PoolTelemetry]:
+    return getattr(pool, "telemetry", None)
+
+
+def instrument_engine(name: str, engine: Engine) -> None:
+    """
+    Attach telemetry listeners to an engine (use `async_engine.sync_engine`
+    for async engines) and register it for pool_report().
+    """
+    _engines[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        telemetry = _telemetry(engine.pool)
+        if telemetry:
+            telemetry.increment("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        telemetry = _telemetry(engine.pool)
+        if telemetry:
+            telemetry.increment("invalidations")
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        telemetry = _telemetry(engine.pool)
+        if telemetry and getattr(context, "is_pre_ping", False):
+            telemetry.increment("pre_ping_failures")
+
+
+def pool_report() -> Dict[str, Dict]:
+    """Current state and counters of every instrumented engine's pool"""
+    report = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        entry: Dict = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "timeout": pool.timeout(),
+            })
+        telemetry = _telemetry(pool)
+        if telemetry:
+            entry.update(telemetry.snapshot())
+        report[name] = entry
+    return report
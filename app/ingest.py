@@ -0,0 +1,41 @@
+"""
+Bulk ingest CLI for match data (NDJSON or CSV)
+Run with: python -m app.ingest season.ndjson [--format csv] [--chunk-size 50]
+"""
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.ingest import INGEST_CHUNK_SIZE, ingest_records, parse_csv, parse_ndjson
+
+def main():
+    """Main ingest function"""
+    parser = argparse.ArgumentParser(description="Bulk ingest matches, participations and metrics")
+    parser.add_argument("path", help="Input file (.ndjson / .jsonl / .csv)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE, help="Matches per transaction")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            records = parse_csv(f) if fmt == "csv" else parse_ndjson(f)
+            report = ingest_records(db, records, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    rows = report.rows
+    print(f"✓ {report.succeeded}/{report.matches} matches ingested ({report.created_matches} created)")
+    print(f"  participations={rows.participations} team_metrics={rows.team_metrics} "
+          f"player_metrics={rows.player_metrics}")
+    print(f"  {report.elapsed_seconds}s, {report.rows_per_second} rows/sec")
+    for error in report.errors:
+        label = f" ({error.match})" if error.match else ""
+        print(f"  ✗ line {error.line}{label}: {'; '.join(error.errors)}")
+
+    if report.failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Request instrumentation.
+
+Every HTTP request collects the SQL statistics of app.db.query_stats and
+reports them:
+- in a `Server-Timing` header (browser devtools show it next to the request):
+  `db;dur=<ms>;desc="<n> queries"`, `db-slowest;dur=<ms>;desc="<verb> <table>"`
+  (e.g. `desc="SELECT matches"`), `app;dur=<ms>`, plus an
+  `X-DB-Rows-Hydrated` header,
+- aggregated per route template in Prometheus text format at
+  `/health/metrics` (`/metrics` is the metric definitions API).
+
+Streaming responses only account for the work done before their first byte.
+"""
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI, Request
+
+from app.db.query_stats import current_query_stats, start_query_stats, statement_label, stop_query_stats
+from app.db.telemetry import pool_report
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteMetrics:
+    """Counters of one (method, route, status)"""
+
+    __slots__ = ("requests", "duration_s", "duration_buckets", "statements", "db_s", "slow_statements", "rows")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.duration_s = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.statements = 0
+        self.db_s = 0.0
+        self.slow_statements = 0
+        self.rows = 0
+
+
+class RequestMetrics:
+    """Thread-safe per-route aggregates, rendered in Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, duration_s: float, stats) -> None:
+        with self._lock:
+            entry = self._routes.get((method, route, str(status)))
+            if entry is None:
+                entry = self._routes[(method, route, str(status))] = RouteMetrics()
+            entry.requests += 1
+            entry.duration_s += duration_s
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration_s <= bound:
+                    entry.duration_buckets[i] += 1
+            entry.statements += stats.statements
+            entry.db_s += stats.db_ms / 1000
+            entry.slow_statements += stats.slow_statements
+            entry.rows += stats.rows_hydrated
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+        def labels(key: Tuple[str, str, str], extra: str = "") -> str:
+            method, route, status = key
+            route = route.replace("\\", "\\\\").replace('"', '\\"')
+            return f'{{method="{method}",route="{route}",status="{status}"{extra}}}'
+
+        family("http_requests_total", "counter", "HTTP requests")
+        lines += [f"http_requests_total{labels(k)} {m.requests}" for k, m in routes]
+
+        family("http_request_duration_seconds", "histogram", "HTTP request duration")
+        for key, m in routes:
+            for bound, count in zip(DURATION_BUCKETS, m.duration_buckets):
+                le = ',le="%s"' % bound
+                lines.append(f"http_request_duration_seconds_bucket{labels(key, le)} {count}")
+            le = ',le="+Inf"'
+            lines.append(f"http_request_duration_seconds_bucket{labels(key, le)} {m.requests}")
+            lines.append(f"http_request_duration_seconds_sum{labels(key)} {m.duration_s:.6f}")
+            lines.append(f"http_request_duration_seconds_count{labels(key)} {m.requests}")
+
+        family("db_statements_total", "counter", "SQL statements issued while serving requests")
+        lines += [f"db_statements_total{labels(k)} {m.statements}" for k, m in routes]
+        family("db_time_seconds_total", "counter", "Time spent in SQL statements while serving requests")
+        lines += [f"db_time_seconds_total{labels(k)} {m.db_s:.6f}" for k, m in routes]
+        family("db_slow_statements_total", "counter", "Statements above DB_SLOW_QUERY_MS")
+        lines += [f"db_slow_statements_total{labels(k)} {m.slow_statements}" for k, m in routes]
+        family("db_rows_hydrated_total", "counter", "ORM instances loaded while serving requests")
+        lines += [f"db_rows_hydrated_total{labels(k)} {m.rows}" for k, m in routes]
+
+        pools = pool_report()
+        gauges = [("checked_out", "Connections checked out"), ("checked_in", "Idle connections in the pool"),
+                  ("overflow", "Overflow connections")]
+        for field, help_text in gauges:
+            family(f"db_pool_{field}", "gauge", help_text)
+            lines += [f'db_pool_{field}{{engine="{name}"}} {entry[field]}'
+                      for name, entry in sorted(pools.items()) if field in entry]
+        family("db_pool_checkout_timeouts_total", "counter", "Pool checkouts that timed out")
+        lines += [f'db_pool_checkout_timeouts_total{{engine="{name}"}} {entry["checkout_timeouts"]}'
+                  for name, entry in sorted(pools.items()) if "checkout_timeouts" in entry]
+
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def instrument_requests(app: FastAPI) -> None:
+    """Add the statistics middleware to the app"""
+
+    @app.middleware("http")
+    async def query_stats_middleware(request: Request, call_next):
+        token = start_query_stats()
+        stats = current_query_stats()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            stop_query_stats(token)
+        elapsed = time.perf_counter() - started
+
+        slowest = statement_label(stats.slowest_statement)
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.db_ms:.1f};desc="{stats.statements} queries", '
+            f'db-slowest;dur={stats.slowest_ms:.1f};desc="{slowest}", '
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+        response.headers["X-DB-Rows-Hydrated"] = str(stats.rows_hydrated)
+
+        route = request.scope.get("route")
+        request_metrics.observe(
+            request.method, getattr(route, "path", "<unmatched>"), response.status_code, elapsed, stats
+        )
+        return response
@@ -1,14 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
-from app.routes import seasons, teams, players, matches, metrics, analytics
+from app.db.telemetry import pool_report
+from app.instrumentation import instrument_requests, request_metrics
+from app.responses import FastJSONResponse
+from app.routes import seasons, teams, players, matches, metrics, analytics, ingest
 
 app = FastAPI(
     title="Veo Module V1 API",
     description="Football analytics platform for team and player statistics",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -18,8 +23,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers of the list endpoints (app.services.pagination)
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing", "X-DB-Rows-Hydrated"],
 )
 
+# Per-request SQL statistics (Server-Timing header, /health/metrics)
+instrument_requests(app)
+
 # Include routers
 app.include_router(seasons.router)
 app.include_router(teams.router)
@@ -27,6 +37,7 @@ app.include_router(players.router)
 app.include_router(matches.router)
 app.include_router(metrics.router)
 app.include_router(analytics.router)
+app.include_router(ingest.router)
 
 @app.get("/")
 def root():
@@ -40,3 +51,13 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/db")
+def health_db():
+    """Connection pool state and telemetry (checkouts, overflow, wait histogram, pre-ping failures)"""
+    return {"pools": pool_report()}
+
+@app.get("/health/metrics", response_class=PlainTextResponse)
+def health_metrics():
+    """Per-route request, SQL and pool metrics in Prometheus text format"""
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
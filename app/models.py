@@ -159,3 +159,42 @@ class PlayerMatchMetricValue(Base):
     match = relationship("Match", back_populates="player_metrics")
     player = relationship("Player", back_populates="metric_values")
     metric = relationship("MetricDefinition", back_populates="player_values")
+
+class DataVersion(Base):
+    """Monotonic version counters used to invalidate in-process caches across workers"""
+    __tablename__ = "data_versions"
+
+    key = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class TeamSeasonMetricRollup(Base):
+    """Running SUM / COUNT of raw team metric values per team, season, metric and side"""
+    __tablename__ = "team_season_metric_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    metric_id = Column(Integer, ForeignKey("metric_definitions.id"), nullable=False)
+    side = Column(Enum(MetricSide), nullable=False)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    value_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('team_id', 'season_id', 'metric_id', 'side', name='uq_team_season_metric_side'),
+    )
+
+class PlayerSeasonMetricRollup(Base):
+    """Running SUM / COUNT of raw player metric values per match team, season, player and metric"""
+    __tablename__ = "player_season_metric_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
+    metric_id = Column(Integer, ForeignKey("metric_definitions.id"), nullable=False)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    value_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('team_id', 'season_id', 'player_id', 'metric_id', name='uq_team_season_player_metric'),
+    )
@@ -0,0 +1,32 @@
+"""
+JSON response class used as the application's default.
+
+Routes that return dicts or models are still validated and encoded by FastAPI
+(`response_model`, `jsonable_encoder`); only the final `dumps` changes. When
+orjson is installed it writes the bytes, otherwise the stdlib encoder is used
+with the same compact output. The media type stays `application/json`, so the
+OpenAPI schema is unchanged.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON of already-encoded content (dicts, lists, scalars)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
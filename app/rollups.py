@@ -0,0 +1,37 @@
+"""
+Metric rollups maintenance CLI
+Run with: python -m app.rollups check | rebuild
+"""
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.rollups import check_rollups, rebuild_rollups
+
+def main():
+    """Main rollups maintenance function"""
+    parser = argparse.ArgumentParser(description="Check or rebuild the season metric rollups")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            counts = rebuild_rollups(db)
+            db.commit()
+            print(f"✓ Rebuilt rollups: team={counts['team']} player={counts['player']} rows")
+            return
+
+        problems = check_rollups(db)
+    finally:
+        db.close()
+
+    if not problems:
+        print("✓ Rollups are consistent with the raw metric values")
+        return
+    for problem in problems:
+        print(f"  ✗ {problem}")
+    print(f"✗ {len(problems)} inconsistent rollup rows (run: python -m app.rollups rebuild)")
+    raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Callable, Dict, Optional
 from datetime import date
-from app.db.session import get_db
-from app.services.analytics import AnalyticsService
+from app.db.session import get_async_db
+from app.schemas.construct import trusted_construct
+from app.services.analytics import SERIES_TRANSFORMS, AnalyticsService
+from app.services.metric_registry import get_metric_registry
+from app.services.response_cache import analytics_cache, cache_key, etag_for, etag_matches
+from app.services.team_versions import get_team_version
 from app import schemas
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+def _cached_response(
+    db: Session,
+    request: Request,
+    team_id: int,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[Session], BaseModel]
+) -> Response:
+    """
+    Serve an analytics response from the cache (or compute and cache it).
+
+    The key includes the team data version and the metric definitions
+    version, so any write to the team's data yields a new key / ETag.
+
+    Runs through `AsyncSession.run_sync`: the service code stays synchronous
+    while its queries are awaited on the event loop. Only the I/O yields,
+    though: the aggregation itself (matrices, formulas, serialization) runs
+    on the event-loop thread and blocks other requests while it computes.
+    Cache hits and 304s skip it; misses on large teams are bounded by the
+    batched queries and team snapshots rather than moved to a thread pool,
+    which `run_sync` (a greenlet on the loop) cannot hand work to.
+    """
+    version = f"{get_team_version(db, team_id)}.{get_metric_registry(db).version}"
+    key = cache_key(endpoint, {"team_id": team_id, **params}, version)
+    etag = etag_for(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = analytics_cache.get(key)
+    headers["X-Cache"] = "MISS" if body is None else "HIT"
+    if body is None:
+        body = compute(db).model_dump_json().encode("utf-8")
+        analytics_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Analytics response cache counters (entries, bytes, hits, misses, evictions)"""
+    return analytics_cache.stats()
+
 @router.get("/team/kpis", response_model=schemas.KPIResponse)
-def get_team_kpis(
+async def get_team_kpis(
+    request: Request,
     team_id: int = Query(..., description="Team ID"),
     metrics: str = Query(..., description="Comma-separated metric slugs"),
     season_id: Optional[int] = Query(None),
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
     compute_delta: bool = Query(False, description="Compute delta vs previous period"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get aggregated KPIs for a team.
@@ -25,48 +74,103 @@ def get_team_kpis(
     """
     metric_slugs = [s.strip() for s in metrics.split(",")]
 
-    analytics = AnalyticsService(db)
-    kpis = analytics.get_team_kpis(
-        team_id=team_id,
-        metric_slugs=metric_slugs,
-        season_id=season_id,
-        date_from=from_date,
-        date_to=to_date,
-        compute_delta=compute_delta
-    )
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        kpis = analytics.get_team_kpis(
+            team_id=team_id,
+            metric_slugs=metric_slugs,
+            season_id=season_id,
+            date_from=from_date,
+            date_to=to_date,
+            compute_delta=compute_delta
+        )
+        return trusted_construct(schemas.KPIResponse, {"kpis": kpis})
 
-    return schemas.KPIResponse(kpis=kpis)
+    params = {
+        "metrics": metric_slugs, "season_id": season_id, "from": from_date, "to": to_date,
+        "compute_delta": compute_delta,
+    }
+    return await db.run_sync(_cached_response, request, team_id, "team/kpis", params, compute)
 
 @router.get("/team/timeseries", response_model=schemas.TimeSeriesResponse)
-def get_team_timeseries(
+async def get_team_timeseries(
+    request: Request,
     team_id: int = Query(..., description="Team ID"),
     metric: str = Query(..., description="Metric slug"),
     last_n: int = Query(10, description="Number of recent matches"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get time series data for a team metric over last N matches.
 
     Example: /analytics/team/timeseries?team_id=1&metric=team_possession_pct&last_n=10
     """
-    analytics = AnalyticsService(db)
-    result = analytics.get_team_timeseries(
-        team_id=team_id,
-        metric_slug=metric,
-        last_n=last_n
-    )
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        result = analytics.get_team_timeseries(
+            team_id=team_id,
+            metric_slug=metric,
+            last_n=last_n
+        )
+        return trusted_construct(schemas.TimeSeriesResponse, result)
+
+    params = {"metric": metric, "last_n": last_n}
+    return await db.run_sync(_cached_response, request, team_id, "team/timeseries", params, compute)
+
+@router.get("/team/timeseries/multi", response_model=schemas.MultiTimeSeriesResponse)
+async def get_team_multi_timeseries(
+    request: Request,
+    team_id: int = Query(..., description="Team ID"),
+    metrics: str = Query(..., description="Comma-separated metric slugs"),
+    last_n: int = Query(10, ge=1, description="Number of recent matches"),
+    transforms: Optional[str] = Query(
+        None, description="Comma-separated series to add: rolling_mean, cumulative_sum, ewm"
+    ),
+    window: int = Query(5, ge=1, description="Rolling mean window (matches)"),
+    alpha: float = Query(0.3, gt=0, le=1, description="EWM smoothing factor"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get several team metrics over the last N matches, with optional
+    server-side rolling mean / cumulative sum / exponentially weighted series.
+
+    Example: /analytics/team/timeseries/multi?team_id=1&metrics=team_goals_scored,team_shots
+             &last_n=10&transforms=rolling_mean,ewm&window=3
+    """
+    metric_slugs = [s.strip() for s in metrics.split(",")]
+    transform_list = [t.strip() for t in transforms.split(",")] if transforms else []
+    unknown = [t for t in transform_list if t not in SERIES_TRANSFORMS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown transforms: {', '.join(unknown)}")
 
-    return result
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        result = analytics.get_team_multi_timeseries(
+            team_id=team_id,
+            metric_slugs=metric_slugs,
+            last_n=last_n,
+            transforms=transform_list,
+            window=window,
+            alpha=alpha
+        )
+        return trusted_construct(schemas.MultiTimeSeriesResponse, result)
+
+    params = {
+        "metrics": metric_slugs, "last_n": last_n, "transforms": sorted(transform_list),
+        "window": window, "alpha": alpha,
+    }
+    return await db.run_sync(_cached_response, request, team_id, "team/timeseries/multi", params, compute)
 
 @router.get("/team/radar", response_model=schemas.RadarResponse)
-def get_team_radar(
+async def get_team_radar(
+    request: Request,
     team_id: int = Query(..., description="Team ID"),
     metrics: str = Query(..., description="Comma-separated metric slugs (max 6 recommended)"),
     fromA: date = Query(..., description="Period A start date"),
     toA: date = Query(..., description="Period A end date"),
     fromB: date = Query(..., description="Period B start date"),
     toB: date = Query(..., description="Period B end date"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Compare two time periods on multiple metrics (for radar chart).
@@ -79,37 +183,103 @@ def get_team_radar(
     if len(metric_slugs) > 8:
         raise HTTPException(status_code=400, detail="Maximum 8 metrics allowed for radar chart")
 
-    analytics = AnalyticsService(db)
-    result = analytics.get_team_radar(
-        team_id=team_id,
-        metric_slugs=metric_slugs,
-        date_from_a=fromA,
-        date_to_a=toA,
-        date_from_b=fromB,
-        date_to_b=toB
-    )
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        result = analytics.get_team_radar(
+            team_id=team_id,
+            metric_slugs=metric_slugs,
+            date_from_a=fromA,
+            date_to_a=toA,
+            date_from_b=fromB,
+            date_to_b=toB
+        )
+        return trusted_construct(schemas.RadarResponse, result)
 
-    return result
+    params = {"metrics": metric_slugs, "fromA": fromA, "toA": toA, "fromB": fromB, "toB": toB}
+    return await db.run_sync(_cached_response, request, team_id, "team/radar", params, compute)
+
+@router.post("/team/dashboard", response_model=schemas.DashboardResponse)
+async def get_team_dashboard(
+    request: Request,
+    spec: schemas.DashboardRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Compute several dashboard panels (KPIs, timeseries, radar, leaderboards)
+    in one call.
+
+    With team snapshots enabled (ANALYTICS_SNAPSHOT_TEAMS) every panel reads
+    the same pinned snapshot; otherwise each panel runs its own batched
+    queries (rollups, wide view, requested metrics and periods only).
+
+    Each panel takes the same parameters as its GET endpoint; omitted panels
+    are not computed.
+    """
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        analytics.pin_team_data(spec.team_id)
+        result = {}
+        if spec.kpis:
+            result["kpis"] = analytics.get_team_kpis(
+                team_id=spec.team_id,
+                metric_slugs=spec.kpis.metrics,
+                season_id=spec.kpis.season_id,
+                date_from=spec.kpis.date_from,
+                date_to=spec.kpis.date_to,
+                compute_delta=spec.kpis.compute_delta
+            )
+        if spec.timeseries:
+            result["timeseries"] = analytics.get_team_timeseries(
+                team_id=spec.team_id,
+                metric_slug=spec.timeseries.metric,
+                last_n=spec.timeseries.last_n
+            ) or None
+        if spec.radar:
+            result["radar"] = analytics.get_team_radar(
+                team_id=spec.team_id,
+                metric_slugs=spec.radar.metrics,
+                date_from_a=spec.radar.fromA,
+                date_to_a=spec.radar.toA,
+                date_from_b=spec.radar.fromB,
+                date_to_b=spec.radar.toB
+            )
+        result["leaderboards"] = [
+            analytics.get_player_leaderboard(
+                team_id=spec.team_id,
+                metric_slug=panel.metric,
+                season_id=panel.season_id,
+                top_n=panel.top_n
+            )
+            for panel in spec.leaderboards
+        ]
+        return trusted_construct(schemas.DashboardResponse, result)
+
+    params = spec.model_dump(mode="json", exclude={"team_id"})
+    return await db.run_sync(_cached_response, request, spec.team_id, "team/dashboard", params, compute)
 
 @router.get("/players/leaderboard", response_model=schemas.LeaderboardResponse)
-def get_player_leaderboard(
+async def get_player_leaderboard(
+    request: Request,
     team_id: int = Query(..., description="Team ID"),
     metric: str = Query(..., description="Player metric slug"),
     season_id: Optional[int] = Query(None),
     top_n: int = Query(10, description="Number of top players"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get top players leaderboard for a metric.
 
     Example: /analytics/players/leaderboard?team_id=1&metric=player_goals&top_n=10
     """
-    analytics = AnalyticsService(db)
-    result = analytics.get_player_leaderboard(
-        team_id=team_id,
-        metric_slug=metric,
-        season_id=season_id,
-        top_n=top_n
-    )
-
-    return result
+    def compute(session: Session):
+        analytics = AnalyticsService(session)
+        result = analytics.get_player_leaderboard(
+            team_id=team_id,
+            metric_slug=metric,
+            season_id=season_id,
+            top_n=top_n
+        )
+        return trusted_construct(schemas.LeaderboardResponse, result)
+
+    params = {"metric": metric, "season_id": season_id, "top_n": top_n}
+    return await db.run_sync(_cached_response, request, team_id, "players/leaderboard", params, compute)
@@ -0,0 +1,45 @@
+import io
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.db.session import get_db
+from app.services.ingest import INGEST_CHUNK_SIZE, ingest_records, parse_csv, parse_ndjson
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+
+@router.post("/matches", response_model=schemas.IngestReport)
+def ingest_matches(
+    file: UploadFile = File(..., description="NDJSON (one match per line) or long-format CSV"),
+    format: Optional[str] = Query(
+        None, pattern="^(ndjson|csv)$", description="Input format (defaults to the file extension)"
+    ),
+    chunk_size: int = Query(INGEST_CHUNK_SIZE, ge=1, le=500, description="Matches per transaction"),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk ingest many matches (e.g. a whole season of Veo exports) in one request.
+
+    Each record carries a match (existing `match_id` or a new match matched on
+    team/date/opponent), its participations and its raw team / player metrics.
+    Records are validated and written in chunks, one transaction per chunk.
+
+    Returns:
+        An IngestReport with per-match errors and rows/sec throughput.
+    """
+    fmt = format
+    if fmt is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            fmt = "csv"
+        elif filename.endswith((".ndjson", ".jsonl", ".json")):
+            fmt = "ndjson"
+        else:
+            raise HTTPException(status_code=400, detail="Cannot infer format, use ?format=ndjson|csv")
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    records = parse_csv(lines) if fmt == "csv" else parse_ndjson(lines)
+    return ingest_records(db, records, chunk_size=chunk_size)
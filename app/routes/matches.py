@@ -1,29 +1,66 @@
 from datetime import date
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import schemas
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_async_db, get_db
 from app.models import Match, MatchPlayerParticipation, Player, Season, Team
 from app.schemas.summary import MatchSummaryResponse
+from app.services.export import EXPORT_MEDIA_TYPES, encode_rows
 from app.services.match_summary import MatchSummaryService
+from app.services.pagination import (
+    InvalidCursor,
+    InvalidFields,
+    SortKey,
+    paginate,
+    parse_fields,
+    project,
+    projection_columns,
+)
+from app.services.team_versions import bump_team_versions
 
 router = APIRouter(prefix="/matches", tags=["matches"])
 
+# Most recent first; id makes the key unique for keyset pagination
+MATCH_SORT_KEY = SortKey([Match.date, Match.id], descending=True, decoders=[date.fromisoformat, int])
+MATCH_FIELDS = list(schemas.Match.model_fields)
+# Upper bound of ids accepted by GET /matches/summaries
+MAX_SUMMARY_BATCH = 200
+
 
 @router.get("", response_model=List[schemas.Match])
 def list_matches(
+    response: Response,
     team_id: Optional[int] = Query(None),
     season_id: Optional[int] = Query(None),
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all matches when omitted)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. id,date,opponent_name)"),
+    include_total: bool = Query(False, description="Return the filtered count in X-Total-Count"),
     db: Session = Depends(get_db),
 ):
-    """List matches with optional filters"""
-    query = db.query(Match)
+    """
+    List matches with optional filters, most recent first.
+
+    Keyset pagination: pass `limit`, then the `X-Next-Cursor` response header
+    as `cursor` for the next page. `fields` selects only the given columns.
+    """
+    try:
+        field_names = parse_fields(fields, MATCH_FIELDS)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if field_names is None:
+        query = db.query(Match)
+    else:
+        query = db.query(*projection_columns(Match, field_names, MATCH_SORT_KEY))
 
     if team_id:
         query = query.filter(Match.team_id == team_id)
@@ -34,7 +71,14 @@ def list_matches(
     if to_date:
         query = query.filter(Match.date <= to_date)
 
-    matches = query.order_by(Match.date.desc()).all()
+    try:
+        matches, headers = paginate(query, MATCH_SORT_KEY, limit, cursor, include_total)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if field_names is not None:
+        return JSONResponse(jsonable_encoder(project(matches, field_names)), headers=headers)
+    response.headers.update(headers)
     return matches
 
 
@@ -58,6 +102,131 @@ def create_match(match: schemas.MatchCreate, db: Session = Depends(get_db)):
     return db_match
 
 
+def _export_response(
+    db: Session,
+    rows: Callable[[MatchSummaryService], Iterator[List[Any]]],
+    fmt: str,
+    filename: str,
+    sheet_title: str,
+) -> StreamingResponse:
+    """
+    Stream encoded rows.
+
+    The request session is closed by get_db before the body is sent, so the
+    rows are read from a dedicated session (same engine) opened by the
+    generator and closed once the last chunk is out.
+
+    Args:
+        db: Request session (only its engine is used).
+        rows: Builds the row iterator from a service bound to the export session.
+    """
+    bind = db.get_bind()
+
+    def body():
+        export_db = SessionLocal(bind=bind)
+        try:
+            yield from encode_rows(rows(MatchSummaryService(export_db)), fmt, sheet_title=sheet_title)
+        finally:
+            export_db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+# Declared before /{match_id} so that "export.csv" is not parsed as an id
+@router.get("/export.{fmt}")
+def export_matches(
+    fmt: str = Path(..., pattern="^(csv|xlsx)$"),
+    team_id: int = Query(...),
+    season_id: Optional[int] = Query(None),
+    kind: str = Query("players", pattern="^(players|team)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Export all matches of a team (optionally one season) as CSV or XLSX.
+
+    Rows are streamed from a server-side cursor, so the export size is not
+    bounded by memory.
+
+    Args:
+        fmt: "csv" or "xlsx".
+        team_id: Team identifier.
+        season_id: Optional season filter.
+        kind: "players" (one row per match x player) or "team" (one row per match).
+    """
+    team = db.query(Team).get(team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    def rows(service: MatchSummaryService):
+        if kind == "team":
+            return service.iter_team_metric_rows(team_id=team_id, season_id=season_id)
+        return service.iter_player_grid_rows(team_id=team_id, season_id=season_id)
+
+    filename = f"team_{team_id}_{kind}" + (f"_season_{season_id}" if season_id else "")
+    return _export_response(db, rows, fmt, filename, sheet_title=kind)
+
+
+# Declared before /{match_id} so that "summaries" is not parsed as an id
+@router.get("/summaries", response_model=List[MatchSummaryResponse])
+async def get_match_summaries(
+    ids: Optional[str] = Query(None, description="Comma-separated match ids"),
+    team_id: Optional[int] = Query(None),
+    season_id: Optional[int] = Query(None),
+    grid: str = Query("nested", pattern="^(nested|columnar)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get the summaries of many matches in one request.
+
+    Matches are selected by `ids` and / or `team_id` (optionally `season_id`).
+    The whole set is loaded with the same four queries as a single summary,
+    so the cost barely grows with the number of matches.
+
+    Args:
+        ids: Comma-separated match identifiers (at most MAX_SUMMARY_BATCH).
+        team_id: Team filter (required when `ids` is not given).
+        season_id: Optional season filter.
+        grid: Player grid encoding ("nested" or "columnar").
+        db: Async SQLAlchemy session dependency.
+
+    Returns:
+        MatchSummaryResponse payloads ordered by match date.
+
+    Raises:
+        HTTPException: 400 on invalid or missing filters, 404 if some ids do not exist.
+    """
+    match_ids = None
+    if ids is not None:
+        try:
+            match_ids = sorted({int(part) for part in ids.split(",") if part.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        if not match_ids:
+            raise HTTPException(status_code=400, detail="ids must not be empty")
+        if len(match_ids) > MAX_SUMMARY_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_SUMMARY_BATCH} ids per request")
+    elif team_id is None:
+        raise HTTPException(status_code=400, detail="ids or team_id is required")
+
+    def build(session: Session) -> List[MatchSummaryResponse]:
+        return MatchSummaryService(session).get_match_summaries(
+            match_ids=match_ids, team_id=team_id, season_id=season_id, grid=grid
+        )
+
+    summaries = await db.run_sync(build)
+    if match_ids is not None and team_id is None and season_id is None and len(summaries) != len(match_ids):
+        found = {summary.match.id for summary in summaries}
+        missing = ", ".join(str(i) for i in match_ids if i not in found)
+        raise HTTPException(status_code=404, detail=f"Matches not found: {missing}")
+
+    body = b"[" + b",".join(summary.model_dump_json().encode("utf-8") for summary in summaries) + b"]"
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/{match_id}", response_model=schemas.Match)
 def get_match(match_id: int, db: Session = Depends(get_db)):
     """Get match by ID"""
@@ -138,6 +307,7 @@ def update_match_participations(
     db.query(MatchPlayerParticipation).filter(
         MatchPlayerParticipation.match_id == match_id
     ).delete()
+    bump_team_versions(db, [match.team_id])
 
     # Create new participations
     new_participations = []
@@ -180,6 +350,7 @@ def duplicate_participations(
     db.query(MatchPlayerParticipation).filter(
         MatchPlayerParticipation.match_id == match_id
     ).delete()
+    bump_team_versions(db, [match.team_id])
 
     new_parts = []
     for src in source_parts:
@@ -202,7 +373,14 @@ def duplicate_participations(
 
 
 @router.get("/{match_id}/summary", response_model=MatchSummaryResponse)
-def get_match_summary(match_id: int, db: Session = Depends(get_db)):
+async def get_match_summary(
+    match_id: int,
+    grid: str = Query(
+        "nested", pattern="^(nested|columnar)$",
+        description="Player grid encoding: nested dicts, or columnar (dense values + presence bitmap)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Get a complete, Excel-like summary for a match.
 
@@ -213,10 +391,16 @@ def get_match_summary(match_id: int, db: Session = Depends(get_db)):
         - Raw values only (no derived computations).
         - Derived KPIs are computed via /analytics endpoints.
         - Designed as a stable contract for future CSV/Excel export.
+        - Async: the service runs through `AsyncSession.run_sync`.
+        - On PostgreSQL the JSON document is built by the database in one
+          statement and sent as-is.
+        - `grid=columnar` sends the player grid as PlayerMetricsColumnarGrid,
+          several times smaller for large squads.
 
     Args:
         match_id: Match identifier.
-        db: SQLAlchemy session dependency.
+        grid: Player grid encoding ("nested" or "columnar").
+        db: Async SQLAlchemy session dependency.
 
     Returns:
         A MatchSummaryResponse payload.
@@ -224,9 +408,37 @@ def get_match_summary(match_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: 404 if the match does not exist.
     """
-    service = MatchSummaryService(db)
+    def build(session: Session) -> bytes:
+        return MatchSummaryService(session).get_match_summary_json(match_id=match_id, grid=grid)
 
     try:
-        return service.get_match_summary(match_id=match_id)
+        return Response(content=await db.run_sync(build), media_type="application/json")
     except ValueError:
         raise HTTPException(status_code=404, detail="Match not found")
+
+
+@router.get("/{match_id}/summary.{fmt}")
+def export_match_summary(
+    match_id: int,
+    fmt: str = Path(..., pattern="^(csv|xlsx)$"),
+    kind: str = Query("players", pattern="^(players|team)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Export the summary grid of one match as CSV or XLSX.
+
+    Same columns as /matches/export.{fmt}, restricted to one match.
+
+    Raises:
+        HTTPException: 404 if the match does not exist.
+    """
+    match = db.query(Match).get(match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    def rows(service: MatchSummaryService):
+        if kind == "team":
+            return service.iter_team_metric_rows(match_id=match_id)
+        return service.iter_player_grid_rows(match_id=match_id)
+
+    return _export_response(db, rows, fmt, f"match_{match_id}_{kind}", sheet_title=kind)
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from typing import List, Optional
 from app.db.session import get_db
 from app.models import (
     MetricDefinition, TeamMatchMetricValue, PlayerMatchMetricValue,
-    Match, Player, MetricScope, MetricCategory, MetricSide
+    Match, Player, MetricScope, MetricCategory
 )
+from app.services.metric_registry import get_metric_record_by_id
+from app.services.metric_writes import upsert_player_metrics, upsert_team_metrics
 from app import schemas
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
@@ -34,7 +35,7 @@ def list_metrics(
 @router.get("/{metric_id}", response_model=schemas.MetricDefinition)
 def get_metric(metric_id: int, db: Session = Depends(get_db)):
     """Get metric definition by ID"""
-    metric = db.query(MetricDefinition).get(metric_id)
+    metric = get_metric_record_by_id(db, metric_id)
     if not metric:
         raise HTTPException(status_code=404, detail="Metric not found")
     return metric
@@ -75,51 +76,7 @@ def update_team_metrics(
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    results = {"created": 0, "updated": 0, "errors": []}
-
-    for value_input in bulk.values:
-        # Get metric definition
-        metric = db.query(MetricDefinition).filter_by(slug=value_input.metric_slug).first()
-        if not metric:
-            results["errors"].append(f"Metric {value_input.metric_slug} not found")
-            continue
-
-        # Validate not storing derived metrics
-        if metric.is_derived:
-            results["errors"].append(f"Cannot store derived metric {value_input.metric_slug}")
-            continue
-
-        # Validate scope
-        if metric.scope != MetricScope.TEAM:
-            results["errors"].append(f"Metric {value_input.metric_slug} is not a team metric")
-            continue
-
-        # Validate percentage range
-        if metric.datatype.value == "PERCENT" and not (0 <= value_input.value <= 100):
-            results["errors"].append(f"Percentage value must be between 0 and 100")
-            continue
-
-        # Upsert value
-        existing = db.query(TeamMatchMetricValue).filter(
-            and_(
-                TeamMatchMetricValue.match_id == match_id,
-                TeamMatchMetricValue.metric_id == metric.id,
-                TeamMatchMetricValue.side == value_input.side
-            )
-        ).first()
-
-        if existing:
-            existing.value_number = value_input.value
-            results["updated"] += 1
-        else:
-            new_value = TeamMatchMetricValue(
-                match_id=match_id,
-                metric_id=metric.id,
-                side=value_input.side,
-                value_number=value_input.value
-            )
-            db.add(new_value)
-            results["created"] += 1
+    results = upsert_team_metrics(db, match_id, bulk.values)
 
     db.commit()
     return results
@@ -163,57 +120,7 @@ def update_player_metrics(
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    results = {"created": 0, "updated": 0, "errors": []}
-
-    for value_input in bulk.values:
-        # Get metric definition
-        metric = db.query(MetricDefinition).filter_by(slug=value_input.metric_slug).first()
-        if not metric:
-            results["errors"].append(f"Metric {value_input.metric_slug} not found")
-            continue
-
-        # Validate not storing derived metrics
-        if metric.is_derived:
-            results["errors"].append(f"Cannot store derived metric {value_input.metric_slug}")
-            continue
-
-        # Validate scope
-        if metric.scope != MetricScope.PLAYER:
-            results["errors"].append(f"Metric {value_input.metric_slug} is not a player metric")
-            continue
-
-        # Verify player exists
-        player = db.query(Player).get(value_input.player_id)
-        if not player:
-            results["errors"].append(f"Player {value_input.player_id} not found")
-            continue
-
-        # Validate percentage range
-        if metric.datatype.value == "PERCENT" and not (0 <= value_input.value <= 100):
-            results["errors"].append(f"Percentage value must be between 0 and 100")
-            continue
-
-        # Upsert value
-        existing = db.query(PlayerMatchMetricValue).filter(
-            and_(
-                PlayerMatchMetricValue.match_id == match_id,
-                PlayerMatchMetricValue.player_id == value_input.player_id,
-                PlayerMatchMetricValue.metric_id == metric.id
-            )
-        ).first()
-
-        if existing:
-            existing.value_number = value_input.value
-            results["updated"] += 1
-        else:
-            new_value = PlayerMatchMetricValue(
-                match_id=match_id,
-                player_id=value_input.player_id,
-                metric_id=metric.id,
-                value_number=value_input.value
-            )
-            db.add(new_value)
-            results["created"] += 1
+    results = upsert_player_metrics(db, match_id, bulk.values)
 
     db.commit()
     return results
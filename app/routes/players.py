@@ -1,23 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.session import get_db
 from app.models import Player, Team
+from app.services.pagination import (
+    InvalidCursor,
+    InvalidFields,
+    SortKey,
+    paginate,
+    parse_fields,
+    project,
+    projection_columns,
+)
 from app import schemas
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+# Alphabetical; id makes the key unique for keyset pagination
+PLAYER_SORT_KEY = SortKey([Player.last_name, Player.first_name, Player.id], decoders=[str, str, int])
+PLAYER_FIELDS = list(schemas.Player.model_fields)
+
 @router.get("", response_model=List[schemas.Player])
 def list_players(
+    response: Response,
     team_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all players when omitted)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. id,last_name)"),
+    include_total: bool = Query(False, description="Return the filtered count in X-Total-Count"),
     db: Session = Depends(get_db)
 ):
-    """List players, optionally filtered by team"""
-    query = db.query(Player)
+    """
+    List players, optionally filtered by team.
+
+    Keyset pagination on (last_name, first_name, id): pass `limit`, then the
+    `X-Next-Cursor` response header as `cursor` for the next page.
+    """
+    try:
+        field_names = parse_fields(fields, PLAYER_FIELDS)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if field_names is None:
+        query = db.query(Player)
+    else:
+        query = db.query(*projection_columns(Player, field_names, PLAYER_SORT_KEY))
     if team_id:
         query = query.filter(Player.team_id == team_id)
 
-    players = query.order_by(Player.last_name, Player.first_name).all()
+    try:
+        players, headers = paginate(query, PLAYER_SORT_KEY, limit, cursor, include_total)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if field_names is not None:
+        return JSONResponse(jsonable_encoder(project(players, field_names)), headers=headers)
+    response.headers.update(headers)
     return players
 
 @router.post("", response_model=schemas.Player, status_code=201)
@@ -9,6 +9,12 @@ so existing imports like `from app import schemas` keep working.
 
 # Core (CRUD + common)
 from .core import (
+    DashboardKPIPanel,
+    DashboardLeaderboardPanel,
+    DashboardRadarPanel,
+    DashboardRequest,
+    DashboardResponse,
+    DashboardTimeseriesPanel,
     KPIResponse,
     KPIValue,
     LeaderboardEntry,  # noqa: F401
@@ -19,6 +25,7 @@ from .core import (
     MatchUpdate,
     MetricDefinition,
     MetricDefinitionBase,
+    MultiTimeSeriesResponse,
     Participation,
     ParticipationBase,
     ParticipationBulk,
@@ -42,8 +49,10 @@ from .core import (
     TeamMetricValueBulk,
     TeamMetricValueInput,
     TeamMetricValueOutput,
+    TimeSeriesMatch,
     TimeSeriesPoint,
     TimeSeriesResponse,
+    TimeSeriesSeries,
 )
 
 # Summary (new feature)
@@ -53,7 +62,16 @@ from .summary import (
     ParticipationWithPlayer,
     PlayerGridColumn,
     PlayerGridPlayer,
+    PlayerMetricsColumnarGrid,
     PlayerMetricsGrid,
     TeamMetricCell,
     TeamMetricsBlock,
 )
+
+# Bulk ingest
+from .ingest import (
+    IngestMatchError,
+    IngestReport,  # noqa: F401
+    IngestRowCounts,
+    MatchIngestRecord,
+)
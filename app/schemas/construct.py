@@ -0,0 +1,82 @@
+"""
+Construction of response schemas from trusted service data.
+
+`AnalyticsService` returns plain dicts built from database values whose
+types already match the response schemas. `trusted_construct` turns them into
+schema instances with `model_construct` (recursively, following the field
+annotations) instead of a full `model_validate` pass, so serialization
+(`model_dump_json`) produces the same JSON without re-checking every cell.
+
+Data that does not have the expected shape (not a dict, or a required field
+missing) still goes through `model_validate`, so malformed data fails the
+same way as before.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+# How a field value is built: (field name, nested model or None, is a list of it)
+FieldPlan = Tuple[str, Optional[Type[BaseModel]], bool]
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Model of a `Model`, `Optional[Model]`, `List[Model]` or `Optional[List[Model]]` annotation"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            # Unions of several models are passed through as built by the service
+            return None, False
+        annotation = args[0]
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation) or (Any,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, True
+        return None, False
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> Tuple[Tuple[FieldPlan, ...], frozenset]:
+    fields = tuple((name, *_nested_model(field.annotation)) for name, field in model.model_fields.items())
+    required = frozenset(name for name, field in model.model_fields.items() if field.is_required())
+    return fields, required
+
+
+def trusted_construct(model: Type[M], data: Any) -> M:
+    """
+    Build `model` from trusted data without validating it.
+
+    Args:
+        model: Response schema.
+        data: Dict keyed by field names (nested dicts / lists of dicts for
+            nested schemas), or an instance of `model`.
+
+    Returns:
+        An instance of `model`.
+
+    Raises:
+        pydantic.ValidationError: If the data does not have the expected shape.
+    """
+    if isinstance(data, model):
+        return data
+    fields, required = _plan(model)
+    if not isinstance(data, dict) or not required.issubset(data):
+        return model.model_validate(data)
+
+    values: Dict[str, Any] = {}
+    for name, nested, many in fields:
+        if name not in data:
+            continue
+        value = data[name]
+        if nested is not None and value is not None:
+            if many:
+                value = [trusted_construct(nested, item) for item in value]
+            else:
+                value = trusted_construct(nested, value)
+        values[name] = value
+    return model.model_construct(**values)
@@ -206,6 +206,26 @@ class TimeSeriesResponse(BaseModel):
     unit: Optional[str] = None
     data: List[TimeSeriesPoint]
 
+class TimeSeriesMatch(BaseModel):
+    match_id: int
+    match_date: date
+    opponent_name: str
+
+class TimeSeriesSeries(BaseModel):
+    metric_slug: str
+    metric_label: str
+    unit: Optional[str] = None
+    values: List[float]  # aligned on MultiTimeSeriesResponse.matches
+    rolling_mean: Optional[List[float]] = None
+    cumulative_sum: Optional[List[float]] = None
+    ewm: Optional[List[float]] = None
+
+class MultiTimeSeriesResponse(BaseModel):
+    window: int
+    alpha: float
+    matches: List[TimeSeriesMatch]
+    series: List[TimeSeriesSeries]
+
 class RadarPoint(BaseModel):
     metric_slug: str
     metric_label: str
@@ -218,6 +238,46 @@ class RadarResponse(BaseModel):
     label_b: str
     metrics: List[RadarPoint]
 
+# Dashboard: several panels computed from one load of the team's data
+class DashboardKPIPanel(BaseModel):
+    metrics: List[str]
+    season_id: Optional[int] = None
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    compute_delta: bool = False
+
+    class Config:
+        populate_by_name = True
+
+class DashboardTimeseriesPanel(BaseModel):
+    metric: str
+    last_n: int = Field(10, ge=1)
+
+class DashboardRadarPanel(BaseModel):
+    metrics: List[str] = Field(..., max_length=8)
+    fromA: date
+    toA: date
+    fromB: date
+    toB: date
+
+class DashboardLeaderboardPanel(BaseModel):
+    metric: str
+    season_id: Optional[int] = None
+    top_n: int = Field(10, ge=1)
+
+class DashboardRequest(BaseModel):
+    team_id: int
+    kpis: Optional[DashboardKPIPanel] = None
+    timeseries: Optional[DashboardTimeseriesPanel] = None
+    radar: Optional[DashboardRadarPanel] = None
+    leaderboards: List[DashboardLeaderboardPanel] = Field(default_factory=list)
+
+class DashboardResponse(BaseModel):
+    kpis: Optional[List[KPIValue]] = None
+    timeseries: Optional[TimeSeriesResponse] = None
+    radar: Optional[RadarResponse] = None
+    leaderboards: List["LeaderboardResponse"] = Field(default_factory=list)
+
 class LeaderboardEntry(BaseModel):
     player_id: int
     player_name: str
@@ -229,3 +289,5 @@ class LeaderboardResponse(BaseModel):
     metric_label: str
     unit: Optional[str] = None
     entries: List[LeaderboardEntry]
+
+DashboardResponse.model_rebuild()
@@ -0,0 +1,72 @@
+"""
+Bulk ingest schemas.
+
+This module defines the record format accepted by `POST /ingest/matches` and
+by the `python -m app.ingest` CLI: one record per match, carrying the match
+itself, its participations and its raw team / player metrics.
+
+A record either targets an existing match (`match_id`) or describes one
+(`match`). Described matches are matched on their natural key
+(team, date, opponent) so that re-running an ingest is idempotent.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from .core import MatchCreate, ParticipationBase, PlayerMetricValueInput, TeamMetricValueInput
+
+
+class MatchIngestRecord(BaseModel):
+    """
+    One match worth of data for bulk ingest.
+
+    Notes:
+        - `participations`, when provided, replace the match participations
+          (same semantics as `PUT /matches/{id}/participations`).
+        - Metrics are upserted, invalid values are reported per match.
+    """
+
+    match_id: Optional[int] = None
+    match: Optional[MatchCreate] = None
+
+    participations: Optional[List[ParticipationBase]] = None
+    team_metrics: List[TeamMetricValueInput] = Field(default_factory=list)
+    player_metrics: List[PlayerMetricValueInput] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_match_reference(self) -> "MatchIngestRecord":
+        if (self.match_id is None) == (self.match is None):
+            raise ValueError("Exactly one of match_id or match is required")
+        return self
+
+
+class IngestMatchError(BaseModel):
+    """Errors reported for one input record."""
+
+    line: int = Field(description="Line (NDJSON) or first row (CSV) of the record.")
+    match: Optional[str] = None
+    errors: List[str]
+
+
+class IngestRowCounts(BaseModel):
+    """Rows written, per table."""
+
+    participations: int = 0
+    team_metrics: int = 0
+    player_metrics: int = 0
+
+
+class IngestReport(BaseModel):
+    """Result of a bulk ingest run."""
+
+    matches: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    created_matches: int = 0
+    rows: IngestRowCounts = Field(default_factory=IngestRowCounts)
+    errors: List[IngestMatchError] = Field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
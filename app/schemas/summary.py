@@ -20,7 +20,7 @@ Derived KPIs remain exposed exclusively through the `/analytics` endpoints.
 from __future__ import annotations
 
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -175,6 +175,31 @@ class PlayerMetricsGrid(BaseModel):
     values: Dict[str, Dict[str, Optional[float]]]
 
 
+class PlayerMetricsColumnarGrid(BaseModel):
+    """
+    Columnar encoding of the player metrics grid (`?grid=columnar`).
+
+    Same players and columns as PlayerMetricsGrid, in the same order, but
+    the cells are sent once, without repeating the metric slugs per player:
+
+    Structure:
+        - values: dense row-major array, cell (row r, column c) at index
+          `r * len(columns) + c`; missing cells hold 0,
+        - present: base64 bitmap of the cells holding a value, cell i is
+          bit `i % 8` (least significant first) of byte `i // 8`.
+
+    Notes:
+        - Payload size grows with players + columns + cells instead of
+          players x (columns x slug length).
+    """
+
+    format: Literal["columnar"] = "columnar"
+    players: List[PlayerGridPlayer]
+    columns: List[PlayerGridColumn]
+    values: List[float]
+    present: str
+
+
 # =============================================================================
 # Full response
 # =============================================================================
@@ -191,4 +216,4 @@ class MatchSummaryResponse(BaseModel):
     match: MatchSummaryMatch
     participations: List[ParticipationWithPlayer]
     team_metrics: TeamMetricsBlock
-    player_metrics: PlayerMetricsGrid
+    player_metrics: Union[PlayerMetricsGrid, PlayerMetricsColumnarGrid]
@@ -5,6 +5,7 @@ Run with: python -m app.seed
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal, engine
 from app.models import MetricDefinition, MetricScope, MetricCategory, MetricDataType, MetricSide, Base
+from app.services.metric_registry import invalidate_metric_registry
 
 PLAYER_METRICS = [
     # GENERAL
@@ -476,6 +477,8 @@ def seed_metrics(db: Session):
         print(f"  + Added metric: {metric_data['slug']}")
 
     db.commit()
+    # Let every API worker reload its metric registry
+    invalidate_metric_registry(db)
     print(f"✓ Seeded {len(all_metrics)} metric definitions")
 
 def main():
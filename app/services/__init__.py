@@ -1 +1,5 @@
 # Services
+
+# Register the ORM hooks keeping metric rollups, team data versions and the
+# wide metrics view in sync
+from app.services import rollups, team_versions, wide_metrics  # noqa: F401
@@ -1,6 +1,7 @@
 """
 Analytics service for computing derived metrics and aggregations
 """
+import heapq
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import List, Dict, Optional, Tuple
@@ -9,46 +10,166 @@ from app.models import (
     Match, Player, MetricDefinition, TeamMatchMetricValue, PlayerMatchMetricValue,
     MetricScope, MetricSide, MatchPlayerParticipation
 )
+from app.config import settings
+from app.services.formulas import CompiledFormula
+from app.services.metric_matrix import MetricMatrix, cumulative_sum, ewm, rolling_mean, stored_avg, stored_sum
+from app.services.metric_registry import MetricRecord, get_metric_records, get_metric_registry
+from app.services.rollups import player_rollup_totals, team_rollup_totals
+from app.services.team_snapshot import TeamSnapshot, get_team_snapshot
+from app.services.wide_metrics import load_wide_team_matrix
+
+# (date_from, date_to), either bound may be open
+Period = Tuple[Optional[date], Optional[date]]
+
+# Server-side transforms available on multi-metric timeseries
+SERIES_TRANSFORMS = ("rolling_mean", "cumulative_sum", "ewm")
 
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
-
-    def _get_metric_by_slug(self, slug: str) -> Optional[MetricDefinition]:
+        # team_id -> snapshot shared by every call of this service instance
+        self._pinned: Dict[int, TeamSnapshot] = {}
+
+    def _team_snapshot(self, team_id: int) -> Optional[TeamSnapshot]:
+        """Pinned snapshot of the team, else the shared one (None: read SQL)"""
+        snapshot = self._pinned.get(team_id)
+        return snapshot if snapshot is not None else get_team_snapshot(self.db, team_id)
+
+    def pin_team_data(self, team_id: int) -> Optional[TeamSnapshot]:
+        """
+        Pin the team's shared snapshot for the following calls on this instance.
+
+        Used when one request computes several panels (dashboard), so that
+        every panel reads the same version of the data. Nothing is pinned when
+        snapshots are disabled (or the session has pending writes): loading
+        the team's whole history would cost more than the panels' own batched
+        queries (rollups, wide view, requested metrics and periods only).
+        """
+        snapshot = get_team_snapshot(self.db, team_id)
+        if snapshot is not None:
+            self._pinned[team_id] = snapshot
+        return snapshot
+
+    def _get_metric_by_slug(self, slug: str) -> Optional[MetricRecord]:
         """Get metric definition by slug"""
-        return self.db.query(MetricDefinition).filter_by(slug=slug).first()
+        return get_metric_records(self.db, [slug]).get(slug)
 
-    def _get_team_metric_value(self, match_id: int, metric_slug: str, side: MetricSide) -> float:
-        """Get stored team metric value"""
-        metric = self._get_metric_by_slug(metric_slug)
-        if not metric:
-            return 0.0
+    def _get_metrics_by_slugs(self, slugs: List[str]) -> Dict[str, MetricRecord]:
+        """Get metric definitions for several slugs"""
+        return get_metric_records(self.db, slugs)
+
+    def _get_formula(self, slug: str) -> Optional[CompiledFormula]:
+        """Compiled formula of a derived metric (None if it cannot be compiled)"""
+        return get_metric_registry(self.db).formulas.get(slug)
+
+    def _input_keys(self, metric_defs: List[MetricRecord]) -> List[Tuple[str, MetricSide]]:
+        """Raw (slug, side) columns needed to evaluate the given metrics"""
+        keys: List[Tuple[str, MetricSide]] = []
+        for metric_def in metric_defs:
+            if metric_def.is_derived:
+                formula = self._get_formula(metric_def.slug)
+                inputs = formula.inputs if formula else ()
+            else:
+                inputs = ((metric_def.slug, metric_def.side),)
+            for key in inputs:
+                if key not in keys:
+                    keys.append(key)
+        return keys
 
-        value = self.db.query(TeamMatchMetricValue).filter(
+    def _load_team_matrix(
+        self,
+        match_ids: List[int],
+        keys: List[Tuple[str, MetricSide]],
+        snapshot: Optional[TeamSnapshot] = None,
+        team_id: Optional[int] = None
+    ) -> MetricMatrix:
+        """
+        Load every requested raw team value for all matches in one query.
+
+        Sources, in order: the team snapshot, the wide metrics view (when
+        `team_id` is given and the view is up to date), the EAV table.
+        """
+        if snapshot is not None:
+            return snapshot.team_matrix(match_ids, keys)
+        if team_id is not None:
+            matrix = load_wide_team_matrix(self.db, team_id, match_ids, keys)
+            if matrix is not None:
+                return matrix
+        matrix = MetricMatrix(match_ids)
+        if not match_ids or not keys:
+            return matrix
+
+        wanted = set(keys)
+        rows = self.db.query(
+            TeamMatchMetricValue.match_id,
+            MetricDefinition.slug,
+            TeamMatchMetricValue.side,
+            TeamMatchMetricValue.value_number
+        ).join(
+            MetricDefinition, TeamMatchMetricValue.metric_id == MetricDefinition.id
+        ).filter(
             and_(
-                TeamMatchMetricValue.match_id == match_id,
-                TeamMatchMetricValue.metric_id == metric.id,
-                TeamMatchMetricValue.side == side
+                TeamMatchMetricValue.match_id.in_(match_ids),
+                MetricDefinition.slug.in_({slug for slug, _ in keys})
             )
-        ).first()
+        ).all()
 
-        return value.value_number if value else 0.0
+        for match_id, slug, side, value in rows:
+            if (slug, side) in wanted:
+                matrix.set(match_id, (slug, side), value)
+        return matrix
 
-    def _get_player_metric_value(self, match_id: int, player_id: int, metric_slug: str) -> float:
-        """Get stored player metric value"""
-        metric = self._get_metric_by_slug(metric_slug)
-        if not metric:
-            return 0.0
-
-        value = self.db.query(PlayerMatchMetricValue).filter(
+    def _load_player_matrix(
+        self,
+        match_ids: List[int],
+        keys: List[Tuple[str, MetricSide]],
+        player_ids: Optional[List[int]] = None,
+        row_keys: Optional[List[Tuple[int, int]]] = None
+    ) -> MetricMatrix:
+        """
+        Load raw player values in one query.
+
+        Rows are (player_id, match_id) pairs: `row_keys` when given, otherwise
+        every pair that has at least one stored value.
+        """
+        if not match_ids or not keys:
+            return MetricMatrix(row_keys or [])
+
+        key_by_slug = {slug: (slug, side) for slug, side in keys}
+        query = self.db.query(
+            PlayerMatchMetricValue.player_id,
+            PlayerMatchMetricValue.match_id,
+            MetricDefinition.slug,
+            PlayerMatchMetricValue.value_number
+        ).join(
+            MetricDefinition, PlayerMatchMetricValue.metric_id == MetricDefinition.id
+        ).filter(
             and_(
-                PlayerMatchMetricValue.match_id == match_id,
-                PlayerMatchMetricValue.player_id == player_id,
-                PlayerMatchMetricValue.metric_id == metric.id
+                PlayerMatchMetricValue.match_id.in_(match_ids),
+                MetricDefinition.slug.in_(key_by_slug.keys())
             )
-        ).first()
-
-        return value.value_number if value else 0.0
+        )
+        if player_ids is not None:
+            query = query.filter(PlayerMatchMetricValue.player_id.in_(player_ids))
+        rows = query.all()
+
+        if row_keys is None:
+            row_keys = sorted({(player_id, match_id) for player_id, match_id, _, _ in rows})
+        matrix = MetricMatrix(row_keys)
+        for player_id, match_id, slug, value in rows:
+            matrix.set((player_id, match_id), key_by_slug[slug], value)
+        return matrix
+
+    def _metric_column(self, matrix: MetricMatrix, metric_def: MetricRecord) -> List[Optional[float]]:
+        """Per-row values of a metric (raw: None when missing)"""
+        if not metric_def.is_derived:
+            return matrix.column((metric_def.slug, metric_def.side))
+
+        formula = self._get_formula(metric_def.slug)
+        if formula is None:
+            return [0.0] * len(matrix)
+        columns = {key: matrix.filled(key) for key in formula.inputs}
+        return formula.evaluate(columns, len(matrix))
 
     def compute_team_derived_metric(self, match_id: int, metric_slug: str) -> float:
         """Compute derived team metric on the fly"""
@@ -56,57 +177,123 @@ class AnalyticsService:
         if not match:
             return 0.0
 
-        if metric_slug == "team_attempts":
-            goals = self._get_team_metric_value(match_id, "team_goals_scored", MetricSide.OWN)
-            shots = self._get_team_metric_value(match_id, "team_shots", MetricSide.OWN)
-            return goals + shots
-
-        elif metric_slug == "team_conversion_rate":
-            attempts = self.compute_team_derived_metric(match_id, "team_attempts")
-            if attempts == 0:
-                return 0.0
-            goals = self._get_team_metric_value(match_id, "team_goals_scored", MetricSide.OWN)
-            return (goals / attempts) * 100
-
-        elif metric_slug == "team_attempts_conceded":
-            goals = self._get_team_metric_value(match_id, "team_goals_conceded", MetricSide.OPPONENT)
-            shots = self._get_team_metric_value(match_id, "team_shots_conceded", MetricSide.OPPONENT)
-            return goals + shots
-
-        elif metric_slug == "team_offensive_events":
-            goals = self._get_team_metric_value(match_id, "team_goals_scored", MetricSide.OWN)
-            corners = self._get_team_metric_value(match_id, "team_corners", MetricSide.OWN)
-            free_kicks = self._get_team_metric_value(match_id, "team_free_kicks", MetricSide.OWN)
-            shots = self._get_team_metric_value(match_id, "team_shots", MetricSide.OWN)
-            return goals + corners + free_kicks + shots
-
-        elif metric_slug == "team_defensive_events":
-            goals = self._get_team_metric_value(match_id, "team_goals_conceded", MetricSide.OPPONENT)
-            shots = self._get_team_metric_value(match_id, "team_shots_conceded", MetricSide.OPPONENT)
-            return goals + shots
-
-        return 0.0
+        metric_def = self._get_metric_by_slug(metric_slug)
+        if not metric_def or not metric_def.is_derived:
+            return 0.0
+
+        matrix = self._load_team_matrix([match_id], self._input_keys([metric_def]))
+        return self._metric_column(matrix, metric_def)[0]
 
     def compute_player_derived_metric(self, match_id: int, player_id: int, metric_slug: str) -> float:
         """Compute derived player metric on the fly"""
-        if metric_slug == "player_attempts":
-            goals = self._get_player_metric_value(match_id, player_id, "player_goals")
-            shots = self._get_player_metric_value(match_id, player_id, "player_shots")
-            return goals + shots
+        metric_def = self._get_metric_by_slug(metric_slug)
+        if not metric_def or not metric_def.is_derived:
+            return 0.0
 
-        elif metric_slug == "player_conversion_rate":
-            attempts = self.compute_player_derived_metric(match_id, player_id, "player_attempts")
-            if attempts == 0:
-                return 0.0
-            goals = self._get_player_metric_value(match_id, player_id, "player_goals")
-            return (goals / attempts) * 100
+        matrix = self._load_player_matrix(
+            [match_id], self._input_keys([metric_def]), [player_id], row_keys=[(player_id, match_id)]
+        )
+        return self._metric_column(matrix, metric_def)[0]
 
-        elif metric_slug == "player_goal_involvements":
-            goals = self._get_player_metric_value(match_id, player_id, "player_goals")
-            assists = self._get_player_metric_value(match_id, player_id, "player_goal_assists")
-            return goals + assists
+    def _period_match_ids(
+        self,
+        team_id: int,
+        periods: List[Period],
+        season_id: Optional[int] = None,
+        snapshot: Optional[TeamSnapshot] = None
+    ) -> List[List[int]]:
+        """
+        Match ids of the team in each period, from a single query.
+
+        Matches are read once over the union of the periods and bucketed by
+        date, instead of one query per period.
+        """
+        if snapshot is not None:
+            return snapshot.period_match_ids(periods, season_id)
+        query = self.db.query(Match.id, Match.date).filter(Match.team_id == team_id)
+        if season_id:
+            query = query.filter(Match.season_id == season_id)
 
-        return 0.0
+        starts = [date_from for date_from, _ in periods]
+        ends = [date_to for _, date_to in periods]
+        if starts and None not in starts:
+            query = query.filter(Match.date >= min(starts))
+        if ends and None not in ends:
+            query = query.filter(Match.date <= max(ends))
+
+        buckets: List[List[int]] = [[] for _ in periods]
+        for match_id, match_date in query.order_by(Match.id).all():
+            for bucket, (date_from, date_to) in zip(buckets, periods):
+                if (date_from is None or match_date >= date_from) and (date_to is None or match_date <= date_to):
+                    bucket.append(match_id)
+        return buckets
+
+    def _last_matches(
+        self,
+        team_id: int,
+        last_n: int,
+        snapshot: Optional[TeamSnapshot] = None
+    ) -> List[Tuple[int, date, str]]:
+        """(id, date, opponent) of the team's last N matches, chronological"""
+        if snapshot is not None:
+            return snapshot.last_matches(last_n)
+        matches = self.db.query(Match.id, Match.date, Match.opponent_name).filter(
+            Match.team_id == team_id
+        ).order_by(Match.date.desc(), Match.id.desc()).limit(last_n).all()
+        return [tuple(m) for m in reversed(matches)]  # Chronological order
+
+    def _aggregate_team_metric(
+        self,
+        matrix: MetricMatrix,
+        metric_def: MetricRecord,
+        rollups: Optional[Dict[Tuple[int, MetricSide], Tuple[float, int]]] = None
+    ) -> float:
+        """Aggregate of one team metric over the matrix rows (or its season rollup)"""
+        is_percent = metric_def.datatype.value == "PERCENT"
+        if rollups is not None and not metric_def.is_derived:
+            total, count = rollups.get((metric_def.id, metric_def.side), (0.0, 0))
+            if is_percent:
+                return total / count if count else 0.0
+            return total
+        if metric_def.is_derived:
+            # Sum derived values across matches
+            total = sum(self._metric_column(matrix, metric_def))
+            # Average for rates/percentages
+            if is_percent:
+                return total / len(matrix) if len(matrix) else 0
+            return total
+        if is_percent:
+            # Average for percentages (over stored values only)
+            return stored_avg(self._metric_column(matrix, metric_def))
+        return stored_sum(self._metric_column(matrix, metric_def))
+
+    def _team_period_values(
+        self,
+        team_id: int,
+        metric_defs: List[MetricRecord],
+        periods: List[Period],
+        season_id: Optional[int] = None,
+        snapshot: Optional[TeamSnapshot] = None
+    ) -> List[Optional[Dict[str, float]]]:
+        """
+        Aggregated metric values for several periods in one pass.
+
+        One match query and one value query cover every period; each period
+        is then evaluated on its subset of the loaded matrix. None marks a
+        period without matches.
+        """
+        buckets = self._period_match_ids(team_id, periods, season_id, snapshot)
+        all_match_ids = sorted({mid for bucket in buckets for mid in bucket})
+        matrix = self._load_team_matrix(all_match_ids, self._input_keys(metric_defs), snapshot, team_id)
+
+        results: List[Optional[Dict[str, float]]] = []
+        for bucket in buckets:
+            if not bucket:
+                results.append(None)
+                continue
+            sub = matrix.subset(bucket)
+            results.append({m.slug: self._aggregate_team_metric(sub, m) for m in metric_defs})
+        return results
 
     def get_team_kpis(
         self,
@@ -118,74 +305,52 @@ class AnalyticsService:
         compute_delta: bool = False
     ) -> List[Dict]:
         """Compute aggregated KPIs for team"""
-        # Build query for matches
-        query = self.db.query(Match).filter(Match.team_id == team_id)
-
-        if season_id:
-            query = query.filter(Match.season_id == season_id)
-        if date_from:
-            query = query.filter(Match.date >= date_from)
-        if date_to:
-            query = query.filter(Match.date <= date_to)
-
-        matches = query.all()
-        match_ids = [m.id for m in matches]
-
-        if not match_ids:
-            return []
+        metric_defs = self._get_metrics_by_slugs(metric_slugs)
+        requested = [metric_defs[slug] for slug in dict.fromkeys(metric_slugs) if slug in metric_defs]
+
+        # The previous period (for deltas) is evaluated together with the current one
+        periods: List[Period] = [(date_from, date_to)]
+        with_delta = compute_delta and date_from and date_to
+        if with_delta:
+            period_days = (date_to - date_from).days
+            periods.append((date_from - timedelta(days=period_days), date_from - timedelta(days=1)))
+
+        snapshot = self._team_snapshot(team_id)
+
+        # Raw metrics over whole seasons are read from the rollups (O(metrics));
+        # derived metrics and date ranges still need per-match values.
+        use_rollups = settings.ANALYTICS_USE_ROLLUPS and not date_from and not date_to and snapshot is None
+        if use_rollups:
+            (match_ids,) = self._period_match_ids(team_id, periods, season_id)
+            if not match_ids:
+                return []
+            rollups = team_rollup_totals(
+                self.db, team_id, [m.id for m in requested if not m.is_derived], season_id
+            )
+            matrix = self._load_team_matrix(
+                match_ids, self._input_keys([m for m in requested if m.is_derived]), team_id=team_id
+            )
+            current = {m.slug: self._aggregate_team_metric(matrix, m, rollups) for m in requested}
+            previous = None
+        else:
+            period_values = self._team_period_values(team_id, requested, periods, season_id, snapshot)
+            current = period_values[0]
+            previous = period_values[1] if with_delta else None
+            if current is None:
+                return []
 
         results = []
         for slug in metric_slugs:
-            metric_def = self._get_metric_by_slug(slug)
+            metric_def = metric_defs.get(slug)
             if not metric_def:
                 continue
 
-            # Compute aggregate value
-            if metric_def.is_derived:
-                # Sum derived values across matches
-                total = sum(self.compute_team_derived_metric(mid, slug) for mid in match_ids)
-                # Average for rates/percentages
-                if metric_def.datatype.value == "PERCENT":
-                    value = total / len(match_ids) if match_ids else 0
-                else:
-                    value = total
-            else:
-                # Query stored values
-                values = self.db.query(func.sum(TeamMatchMetricValue.value_number)).filter(
-                    and_(
-                        TeamMatchMetricValue.match_id.in_(match_ids),
-                        TeamMatchMetricValue.metric_id == metric_def.id,
-                        TeamMatchMetricValue.side == metric_def.side
-                    )
-                ).scalar()
-
-                # Average for percentages
-                if metric_def.datatype.value == "PERCENT":
-                    avg = self.db.query(func.avg(TeamMatchMetricValue.value_number)).filter(
-                        and_(
-                            TeamMatchMetricValue.match_id.in_(match_ids),
-                            TeamMatchMetricValue.metric_id == metric_def.id,
-                            TeamMatchMetricValue.side == metric_def.side
-                        )
-                    ).scalar()
-                    value = float(avg) if avg else 0.0
-                else:
-                    value = float(values) if values else 0.0
-
+            value = current[slug]
             delta = None
-            if compute_delta and date_from and date_to:
-                # Compute previous period delta
-                period_days = (date_to - date_from).days
-                prev_from = date_from - timedelta(days=period_days)
-                prev_to = date_from - timedelta(days=1)
-
-                prev_kpis = self.get_team_kpis(
-                    team_id, [slug], season_id, prev_from, prev_to, compute_delta=False
-                )
-                if prev_kpis:
-                    prev_value = prev_kpis[0]["value"]
-                    if prev_value > 0:
-                        delta = ((value - prev_value) / prev_value) * 100
+            if previous is not None:
+                prev_value = round(previous[slug], 2)
+                if prev_value > 0:
+                    delta = ((value - prev_value) / prev_value) * 100
 
             results.append({
                 "metric_slug": slug,
@@ -208,23 +373,20 @@ class AnalyticsService:
         if not metric_def:
             return []
 
-        matches = self.db.query(Match).filter(
-            Match.team_id == team_id
-        ).order_by(Match.date.desc()).limit(last_n).all()
+        snapshot = self._team_snapshot(team_id)
+        matches = self._last_matches(team_id, last_n, snapshot)
 
-        matches = list(reversed(matches))  # Chronological order
+        matrix = self._load_team_matrix(
+            [m[0] for m in matches], self._input_keys([metric_def]), snapshot, team_id
+        )
+        values = [0.0 if v is None else v for v in self._metric_column(matrix, metric_def)]
 
         data = []
-        for match in matches:
-            if metric_def.is_derived:
-                value = self.compute_team_derived_metric(match.id, metric_slug)
-            else:
-                value = self._get_team_metric_value(match.id, metric_slug, metric_def.side)
-
+        for (match_id, match_date, opponent_name), value in zip(matches, values):
             data.append({
-                "match_id": match.id,
-                "match_date": match.date,
-                "opponent_name": match.opponent_name,
+                "match_id": match_id,
+                "match_date": match_date,
+                "opponent_name": opponent_name,
                 "value": round(value, 2)
             })
 
@@ -235,6 +397,57 @@ class AnalyticsService:
             "data": data
         }
 
+    def get_team_multi_timeseries(
+        self,
+        team_id: int,
+        metric_slugs: List[str],
+        last_n: int = 10,
+        transforms: Optional[List[str]] = None,
+        window: int = 5,
+        alpha: float = 0.3
+    ) -> Dict:
+        """
+        Several metrics over the last N matches, with optional smoothed series.
+
+        All metrics are read in one value query and evaluated column by column;
+        `transforms` (see SERIES_TRANSFORMS) are computed on the chronological
+        values so that form charts do not need the raw points client-side.
+        """
+        metric_defs = self._get_metrics_by_slugs(metric_slugs)
+        requested = [metric_defs[slug] for slug in dict.fromkeys(metric_slugs) if slug in metric_defs]
+        transforms = transforms or []
+
+        snapshot = self._team_snapshot(team_id)
+        matches = self._last_matches(team_id, last_n, snapshot)
+        matrix = self._load_team_matrix([m[0] for m in matches], self._input_keys(requested), snapshot, team_id)
+
+        series = []
+        for metric_def in requested:
+            values = [0.0 if v is None else v for v in self._metric_column(matrix, metric_def)]
+            entry = {
+                "metric_slug": metric_def.slug,
+                "metric_label": metric_def.label_fr,
+                "unit": metric_def.unit,
+                "values": [round(v, 2) for v in values],
+            }
+            if "rolling_mean" in transforms:
+                entry["rolling_mean"] = [round(v, 2) for v in rolling_mean(values, window)]
+            if "cumulative_sum" in transforms:
+                entry["cumulative_sum"] = [round(v, 2) for v in cumulative_sum(values)]
+            if "ewm" in transforms:
+                entry["ewm"] = [round(v, 2) for v in ewm(values, alpha)]
+            series.append(entry)
+
+        return {
+            "window": window,
+            "alpha": alpha,
+            "matches": [
+                {"match_id": match_id, "match_date": match_date, "opponent_name": opponent_name}
+                for match_id, match_date, opponent_name in matches
+            ],
+            "series": series
+        }
+
     def get_team_radar(
         self,
         team_id: int,
@@ -245,15 +458,20 @@ class AnalyticsService:
         date_to_b: date
     ) -> Dict:
         """Compare two time periods on multiple metrics (radar chart)"""
-        kpis_a = self.get_team_kpis(team_id, metric_slugs, None, date_from_a, date_to_a, False)
-        kpis_b = self.get_team_kpis(team_id, metric_slugs, None, date_from_b, date_to_b, False)
+        metric_defs = self._get_metrics_by_slugs(metric_slugs)
+        requested = [metric_defs[slug] for slug in dict.fromkeys(metric_slugs) if slug in metric_defs]
 
-        metrics_map_a = {k["metric_slug"]: k["value"] for k in kpis_a}
-        metrics_map_b = {k["metric_slug"]: k["value"] for k in kpis_b}
+        # Both periods are evaluated from the same match / value queries
+        values_a, values_b = self._team_period_values(
+            team_id, requested, [(date_from_a, date_to_a), (date_from_b, date_to_b)],
+            snapshot=self._team_snapshot(team_id)
+        )
+        metrics_map_a = {slug: round(v, 2) for slug, v in (values_a or {}).items()}
+        metrics_map_b = {slug: round(v, 2) for slug, v in (values_b or {}).items()}
 
         metrics = []
         for slug in metric_slugs:
-            metric_def = self._get_metric_by_slug(slug)
+            metric_def = metric_defs.get(slug)
             if not metric_def:
                 continue
 
@@ -283,63 +501,120 @@ class AnalyticsService:
         if not metric_def or metric_def.scope != MetricScope.PLAYER:
             return {"metric_slug": metric_slug, "entries": []}
 
-        # Get matches for filtering
-        query = self.db.query(Match).filter(Match.team_id == team_id)
-        if season_id:
-            query = query.filter(Match.season_id == season_id)
-        matches = query.all()
-        match_ids = [m.id for m in matches]
-
-        if not match_ids:
-            return {"metric_slug": metric_slug, "entries": []}
-
-        # Get all players
-        players = self.db.query(Player).filter(Player.team_id == team_id).all()
-
-        leaderboard = []
-        for player in players:
-            # Count matches played
-            matches_played = self.db.query(MatchPlayerParticipation).filter(
-                and_(
-                    MatchPlayerParticipation.player_id == player.id,
-                    MatchPlayerParticipation.match_id.in_(match_ids)
-                )
-            ).count()
-
-            if matches_played == 0:
-                continue
+        snapshot = self._team_snapshot(team_id)
+        if snapshot is not None:
+            rows = self._snapshot_leaderboard_rows(snapshot, metric_def, season_id)
+            return self._leaderboard(metric_def, rows, top_n)
 
-            # Compute total value
-            if metric_def.is_derived:
-                total = sum(
-                    self.compute_player_derived_metric(mid, player.id, metric_slug)
-                    for mid in match_ids
+        # Matches in scope, as a subquery
+        match_query = self.db.query(Match.id).filter(Match.team_id == team_id)
+        if season_id:
+            match_query = match_query.filter(Match.season_id == season_id)
+        match_ids_subq = match_query.scalar_subquery()
+
+        # Matches played per player
+        played = self.db.query(
+            MatchPlayerParticipation.player_id.label("player_id"),
+            func.count(MatchPlayerParticipation.id).label("matches_played")
+        ).filter(
+            MatchPlayerParticipation.match_id.in_(match_ids_subq)
+        ).group_by(MatchPlayerParticipation.player_id).subquery()
+
+        if metric_def.is_derived:
+            rows = self.db.query(
+                Player.id, Player.first_name, Player.last_name, played.c.matches_played
+            ).join(
+                played, played.c.player_id == Player.id
+            ).filter(Player.team_id == team_id).order_by(Player.id).all()
+
+            # Derived values are evaluated per (player, match) on stored inputs;
+            # pairs without any stored input contribute formula(0, ...) = 0.
+            totals: Dict[int, float] = {}
+            if rows:
+                matrix = self._load_player_matrix(
+                    [mid for (mid,) in match_query.all()],
+                    self._input_keys([metric_def]),
+                    [player_id for player_id, _, _, _ in rows]
                 )
+                for (player_id, _), value in zip(matrix.row_keys, self._metric_column(matrix, metric_def)):
+                    totals[player_id] = totals.get(player_id, 0.0) + value
+            rows = [
+                (player_id, first_name, last_name, matches_played, totals.get(player_id, 0.0))
+                for player_id, first_name, last_name, matches_played in rows
+            ]
+        else:
+            # Single grouped statement: players x matches played x summed values
+            if settings.ANALYTICS_USE_ROLLUPS:
+                values = player_rollup_totals(self.db, team_id, metric_def.id, season_id).subquery()
             else:
-                total_query = self.db.query(func.sum(PlayerMatchMetricValue.value_number)).filter(
+                values = self.db.query(
+                    PlayerMatchMetricValue.player_id.label("player_id"),
+                    func.sum(PlayerMatchMetricValue.value_number).label("total")
+                ).filter(
                     and_(
-                        PlayerMatchMetricValue.player_id == player.id,
-                        PlayerMatchMetricValue.match_id.in_(match_ids),
+                        PlayerMatchMetricValue.match_id.in_(match_ids_subq),
                         PlayerMatchMetricValue.metric_id == metric_def.id
                     )
-                ).scalar()
-                total = float(total_query) if total_query else 0.0
+                ).group_by(PlayerMatchMetricValue.player_id).subquery()
 
-            leaderboard.append({
-                "player_id": player.id,
-                "player_name": f"{player.first_name} {player.last_name}",
-                "value": round(total, 2),
-                "matches_played": matches_played
-            })
+            rows = self.db.query(
+                Player.id, Player.first_name, Player.last_name, played.c.matches_played,
+                func.coalesce(values.c.total, 0.0)
+            ).join(
+                played, played.c.player_id == Player.id
+            ).outerjoin(
+                values, values.c.player_id == Player.id
+            ).filter(Player.team_id == team_id).order_by(Player.id).all()
 
-        # Sort by value descending
-        leaderboard.sort(key=lambda x: x["value"], reverse=True)
+        return self._leaderboard(metric_def, rows, top_n)
 
+    def _snapshot_leaderboard_rows(
+        self,
+        snapshot: TeamSnapshot,
+        metric_def: MetricRecord,
+        season_id: Optional[int] = None
+    ) -> List[Tuple[int, str, str, int, float]]:
+        """Leaderboard rows (same shape as the SQL path) from a team snapshot"""
+        (match_ids,) = snapshot.period_match_ids([(None, None)], season_id)
+        played = snapshot.matches_played(match_ids)
+        players = [player_id for player_id in sorted(played) if player_id in snapshot.player_names]
+
+        if metric_def.is_derived:
+            totals: Dict[int, float] = {}
+            matrix = snapshot.player_matrix(match_ids, self._input_keys([metric_def]), players)
+            for (player_id, _), value in zip(matrix.row_keys, self._metric_column(matrix, metric_def)):
+                totals[player_id] = totals.get(player_id, 0.0) + value
+        else:
+            totals = snapshot.player_totals(metric_def.slug, match_ids)
+
+        return [
+            (player_id, *snapshot.player_names[player_id], played[player_id], totals.get(player_id, 0.0))
+            for player_id in players
+        ]
+
+    def _leaderboard(
+        self,
+        metric_def: MetricRecord,
+        rows: List[Tuple[int, str, str, int, float]],
+        top_n: int
+    ) -> Dict:
+        """Top N entries from (player_id, first_name, last_name, matches_played, total) rows"""
+        leaderboard = (
+            {
+                "player_id": player_id,
+                "player_name": f"{first_name} {last_name}",
+                "value": round(float(total or 0.0), 2),
+                "matches_played": matches_played
+            }
+            for player_id, first_name, last_name, matches_played, total in rows
+        )
+
+        # Top N by value descending (ties keep player order)
         return {
-            "metric_slug": metric_slug,
+            "metric_slug": metric_def.slug,
             "metric_label": metric_def.label_fr,
             "unit": metric_def.unit,
-            "entries": leaderboard[:top_n]
+            "entries": heapq.nlargest(top_n, leaderboard, key=lambda x: x["value"])
         }
 
     def compute_team_win_rate(
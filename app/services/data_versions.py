@@ -0,0 +1,30 @@
+"""
+Data version stamps.
+
+A version stamp is a row of `data_versions` incremented whenever the data it
+guards changes. In-process caches remember the version they were built from
+and compare it with a single primary-key lookup, which keeps every uvicorn
+worker consistent without any cross-process messaging.
+"""
+from sqlalchemy.orm import Session
+
+from app.db.dialect import insert_for
+from app.models import DataVersion
+
+METRIC_DEFINITIONS_KEY = "metric_definitions"
+
+
+def get_data_version(db: Session, key: str) -> int:
+    """Current version for a key (0 if never bumped)"""
+    version = db.query(DataVersion.version).filter(DataVersion.key == key).scalar()
+    return version or 0
+
+
+def bump_data_version(db: Session, key: str) -> None:
+    """Increment the version for a key (the caller commits)"""
+    stmt = insert_for(db, DataVersion.__table__).values(key=key, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.key],
+        set_={"version": DataVersion.version + 1},
+    )
+    db.execute(stmt)
@@ -0,0 +1,86 @@
+"""
+Streaming file encoders for tabular exports.
+
+Row iterators (see MatchSummaryService.iter_*_rows) are turned into byte
+chunks that can be handed to a `StreamingResponse`:
+- CSV is encoded row by row, a few KB at a time,
+- XLSX is written with openpyxl's write-only workbook (rows are not kept in
+  memory) into a spooled temporary file, then streamed back in chunks.
+"""
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List
+
+# Bytes per streamed chunk
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# XLSX archives above this size are spooled to disk instead of memory
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def csv_stream(rows: Iterable[List[Any]]) -> Iterator[bytes]:
+    """
+    Encode rows as UTF-8 CSV.
+
+    Args:
+        rows: Header row followed by data rows (None -> empty cell).
+
+    Yields:
+        Byte chunks of roughly EXPORT_CHUNK_BYTES.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def xlsx_stream(rows: Iterable[List[Any]], sheet_title: str = "Export") -> Iterator[bytes]:
+    """
+    Encode rows as a single-sheet XLSX workbook.
+
+    The archive can only be emitted once complete, so rows are written to a
+    spooled temporary file first; memory stays bounded by the write-only
+    workbook and XLSX_SPOOL_MAX_BYTES.
+
+    Args:
+        rows: Header row followed by data rows.
+        sheet_title: Worksheet name.
+
+    Yields:
+        Byte chunks of EXPORT_CHUNK_BYTES.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    for row in rows:
+        sheet.append([v.isoformat() if isinstance(v, (date, datetime)) else v for v in row])
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES) as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(EXPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def encode_rows(rows: Iterable[List[Any]], fmt: str, sheet_title: str = "Export") -> Iterator[bytes]:
+    """Dispatch to the encoder of `fmt` ("csv" or "xlsx")"""
+    if fmt == "xlsx":
+        return xlsx_stream(rows, sheet_title=sheet_title)
+    return csv_stream(rows)
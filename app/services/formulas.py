@@ -0,0 +1,251 @@
+"""
+Derived metric formula compiler.
+
+`MetricDefinition.formula` is the single source of truth for derived metrics,
+e.g. `"goals_scored / attempts * 100"`. This module:
+- parses formulas with a restricted grammar (numbers, identifiers, + - * /,
+  unary minus and parentheses),
+- resolves identifiers to metric slugs of the same scope
+  (`shots` -> `team_shots`, `assists` -> `player_goal_assists`),
+- orders derived metrics along their dependency DAG (cycles are rejected),
+- compiles each formula into a function evaluated on whole columns of values.
+
+Compiled formulas only depend on raw metrics: references to other derived
+metrics are inlined, so one batched load of the raw inputs is enough to
+evaluate any set of derived metrics.
+
+Division by zero yields 0.0, consistent with the conversion rates semantics.
+"""
+import ast
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models import MetricScope, MetricSide
+
+# (raw metric slug, side) - the column key used by MetricMatrix
+InputKey = Tuple[str, MetricSide]
+Columns = Dict[InputKey, List[float]]
+_Node = Callable[[Columns, int], List[float]]
+
+SCOPE_PREFIXES = {
+    MetricScope.TEAM: "team_",
+    MetricScope.PLAYER: "player_",
+}
+
+
+class FormulaError(ValueError):
+    """Raised when a formula cannot be parsed, resolved or compiled."""
+
+
+class CompiledFormula:
+    """Executable form of a derived metric formula."""
+
+    def __init__(self, slug: str, formula: str, inputs: Tuple[InputKey, ...], node: _Node) -> None:
+        self.slug = slug
+        self.formula = formula
+        self.inputs = inputs
+        self._node = node
+
+    def evaluate(self, columns: Columns, size: int) -> List[float]:
+        """
+        Evaluate the formula on aligned columns.
+
+        Args:
+            columns: Raw input columns keyed by (slug, side), missing cells as 0.0.
+            size: Number of rows (used for constant-only formulas).
+
+        Returns:
+            One value per row.
+        """
+        return self._node(columns, size)
+
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.slug!r}, {self.formula!r})"
+
+
+def parse_formula(formula: str) -> ast.expr:
+    """Parse a formula and check it only uses the supported grammar."""
+    try:
+        tree = ast.parse(formula.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula {formula!r}: {e.msg}") from e
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load,
+                             ast.Add, ast.Sub, ast.Mult, ast.Div, ast.USub, ast.UAdd)):
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            continue
+        raise FormulaError(f"Unsupported syntax in formula {formula!r}: {type(node).__name__}")
+    return tree.body
+
+
+def formula_identifiers(expr: ast.expr) -> List[str]:
+    """Identifiers referenced by a parsed formula, in order of appearance."""
+    names: List[str] = []
+    for node in ast.walk(expr):
+        if isinstance(node, ast.Name) and node.id not in names:
+            names.append(node.id)
+    return names
+
+
+def resolve_identifier(name: str, scope: MetricScope, slugs: Iterable[str]) -> str:
+    """
+    Resolve a formula identifier to a metric slug of the given scope.
+
+    Resolution order:
+    1. exact slug (`team_shots`),
+    2. scope prefix + name (`shots` -> `team_shots`),
+    3. unique slug of the scope ending with `_<name>` (`assists` -> `player_goal_assists`).
+    """
+    prefix = SCOPE_PREFIXES[scope]
+    scoped = [s for s in slugs if s.startswith(prefix)]
+    if name in scoped:
+        return name
+    if prefix + name in scoped:
+        return prefix + name
+
+    candidates = [s for s in scoped if s.endswith("_" + name)]
+    if len(candidates) == 1:
+        return candidates[0]
+    if candidates:
+        raise FormulaError(f"Ambiguous identifier {name!r}: {', '.join(sorted(candidates))}")
+    raise FormulaError(f"Unknown identifier {name!r}")
+
+
+# -----------------------------------------------------------------------------
+# Column operators
+# -----------------------------------------------------------------------------
+
+def _safe_div(a: float, b: float) -> float:
+    return a / b if b else 0.0
+
+
+_BINARY_OPS = {
+    ast.Add: lambda xs, ys: [x + y for x, y in zip(xs, ys)],
+    ast.Sub: lambda xs, ys: [x - y for x, y in zip(xs, ys)],
+    ast.Mult: lambda xs, ys: [x * y for x, y in zip(xs, ys)],
+    ast.Div: lambda xs, ys: [_safe_div(x, y) for x, y in zip(xs, ys)],
+}
+
+
+def _compile_node(expr: ast.expr, refs: Dict[str, "_Ref"]) -> _Node:
+    if isinstance(expr, ast.Constant):
+        value = float(expr.value)
+        return lambda columns, size: [value] * size
+
+    if isinstance(expr, ast.Name):
+        ref = refs[expr.id]
+        if ref.key is not None:
+            key = ref.key
+            return lambda columns, size: columns[key]
+        return ref.compiled._node
+
+    if isinstance(expr, ast.UnaryOp):
+        operand = _compile_node(expr.operand, refs)
+        if isinstance(expr.op, ast.USub):
+            return lambda columns, size: [-x for x in operand(columns, size)]
+        return operand
+
+    if isinstance(expr, ast.BinOp):
+        left = _compile_node(expr.left, refs)
+        right = _compile_node(expr.right, refs)
+        op = _BINARY_OPS[type(expr.op)]
+        return lambda columns, size: op(left(columns, size), right(columns, size))
+
+    raise FormulaError(f"Unsupported expression: {type(expr).__name__}")
+
+
+class _Ref:
+    """Resolved identifier: either a raw input column or another compiled formula."""
+
+    def __init__(self, key: Optional[InputKey] = None, compiled: Optional[CompiledFormula] = None) -> None:
+        self.key = key
+        self.compiled = compiled
+
+
+# -----------------------------------------------------------------------------
+# Compiler
+# -----------------------------------------------------------------------------
+
+def compile_formulas(definitions: Iterable) -> Tuple[Dict[str, CompiledFormula], Dict[str, str]]:
+    """
+    Compile every derived metric formula.
+
+    Args:
+        definitions: Objects exposing slug, scope, side, is_derived and formula
+            (MetricDefinition rows or equivalent records).
+
+    Returns:
+        (compiled, errors): compiled formulas by slug, and an error message by
+        slug for derived metrics that could not be compiled (unknown
+        identifiers, cycles, invalid syntax). Those metrics evaluate to 0.0.
+    """
+    by_slug = {d.slug: d for d in definitions}
+    errors: Dict[str, str] = {}
+
+    # 1. parse + resolve identifiers -> dependency graph
+    parsed: Dict[str, ast.expr] = {}
+    resolved: Dict[str, Dict[str, str]] = {}
+    deps: Dict[str, Set[str]] = {}
+    for slug, definition in by_slug.items():
+        if not definition.is_derived:
+            continue
+        try:
+            if not definition.formula:
+                raise FormulaError("Missing formula")
+            expr = parse_formula(definition.formula)
+            names = {
+                name: resolve_identifier(name, definition.scope, by_slug.keys())
+                for name in formula_identifiers(expr)
+            }
+        except FormulaError as e:
+            errors[slug] = str(e)
+            continue
+        parsed[slug] = expr
+        resolved[slug] = names
+        deps[slug] = {target for target in names.values() if by_slug[target].is_derived}
+
+    # 2. topological order (Kahn); anything left over is in / behind a cycle
+    order: List[str] = []
+    remaining = {slug: set(d) for slug, d in deps.items()}
+    ready = sorted(slug for slug, d in remaining.items() if not d)
+    while ready:
+        slug = ready.pop(0)
+        order.append(slug)
+        del remaining[slug]
+        for other in sorted(remaining):
+            if slug in remaining[other]:
+                remaining[other].discard(slug)
+                if not remaining[other]:
+                    ready.append(other)
+    for slug in remaining:
+        errors[slug] = "Cyclic formula dependency"
+
+    # 3. compile along the DAG; derived references are inlined
+    compiled: Dict[str, CompiledFormula] = {}
+    for slug in order:
+        refs: Dict[str, _Ref] = {}
+        inputs: List[InputKey] = []
+        try:
+            for name, target in resolved[slug].items():
+                target_def = by_slug[target]
+                if target_def.is_derived:
+                    if target not in compiled:
+                        raise FormulaError(f"Depends on invalid formula {target!r}")
+                    refs[name] = _Ref(compiled=compiled[target])
+                    new_inputs: Iterable[InputKey] = compiled[target].inputs
+                else:
+                    key = (target, target_def.side)
+                    refs[name] = _Ref(key=key)
+                    new_inputs = (key,)
+                for key in new_inputs:
+                    if key not in inputs:
+                        inputs.append(key)
+            node = _compile_node(parsed[slug], refs)
+        except FormulaError as e:
+            errors[slug] = str(e)
+            continue
+        compiled[slug] = CompiledFormula(slug, by_slug[slug].formula, tuple(inputs), node)
+
+    return compiled, errors
@@ -0,0 +1,345 @@
+"""
+Multi-match bulk ingest.
+
+Backfilling a season of Veo exports through the per-match endpoints means
+hundreds of sequential PUTs, each with its own transaction. This service
+takes a stream of match records (NDJSON or CSV, see app.schemas.ingest) and
+processes it in chunks of matches. Each chunk:
+- is validated with a constant number of lookups (matches, teams, seasons,
+  players and metric definitions are fetched once per chunk),
+- is written with multi-row statements (match inserts are flushed together,
+  participations and metric values use multi-row inserts / upserts),
+- runs in its own transaction, so a database failure only rolls back one
+  bounded chunk.
+
+Errors are reported per input record. Structural errors (unknown match,
+team, season or players) skip the record; invalid metric values are reported
+but do not prevent the rest of the record from being written, exactly like
+the bulk PUT endpoints.
+"""
+import csv
+import time
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import Match, MatchPlayerParticipation, Player, Season, Team
+from app.schemas.core import MatchBase
+from app.schemas.ingest import IngestMatchError, IngestReport, IngestRowCounts, MatchIngestRecord
+from app.services.metric_registry import get_metric_records
+from app.services.metric_writes import (
+    validate_player_values,
+    validate_team_values,
+    write_player_values,
+    write_team_values,
+)
+from app.services.team_versions import bump_match_teams
+
+# Matches per transaction
+INGEST_CHUNK_SIZE = 50
+
+# (line number, record or parse error message)
+ParsedRecord = Tuple[int, Union[MatchIngestRecord, str]]
+
+CSV_MATCH_KEY_COLUMNS = ("team_id", "season_id", "date", "opponent_name")
+
+
+# -----------------------------------------------------------------------------
+# Parsing
+# -----------------------------------------------------------------------------
+
+def _format_validation_error(error: ValidationError) -> str:
+    parts = []
+    for e in error.errors():
+        location = ".".join(str(p) for p in e["loc"])
+        parts.append(f"{location}: {e['msg']}" if location else e["msg"])
+    return "Invalid record: " + "; ".join(parts)
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[ParsedRecord]:
+    """Parse one MatchIngestRecord per non-empty line."""
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, MatchIngestRecord.model_validate_json(line)
+        except ValidationError as e:
+            yield line_no, _format_validation_error(e)
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParsedRecord]:
+    """
+    Parse a long-format CSV export (one metric value per row).
+
+    Columns:
+        - match reference: `match_id`, or `team_id,season_id,date,opponent_name`
+          (+ optional match columns such as `score_for`, `competition`, ...),
+        - `player_id` (empty for team metrics), `metric_slug`, `side`, `value`.
+
+    Consecutive rows of the same match form one record. Participations are
+    not expressible in this format (use NDJSON).
+    """
+    reader = csv.DictReader(lines)
+    match_columns = [c for c in MatchBase.model_fields if c not in CSV_MATCH_KEY_COLUMNS]
+
+    current_key = None
+    current: Optional[Dict] = None
+    first_line = 0
+
+    def build() -> ParsedRecord:
+        try:
+            return first_line, MatchIngestRecord.model_validate(current)
+        except ValidationError as e:
+            return first_line, _format_validation_error(e)
+
+    for row in reader:
+        row = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        if row.get("match_id"):
+            key = ("id", row["match_id"])
+        else:
+            key = ("natural",) + tuple(row.get(c) or "" for c in CSV_MATCH_KEY_COLUMNS)
+
+        if key != current_key:
+            if current is not None:
+                yield build()
+            current_key = key
+            first_line = reader.line_num
+            if row.get("match_id"):
+                current = {"match_id": row["match_id"]}
+            else:
+                match = {c: row.get(c) for c in CSV_MATCH_KEY_COLUMNS}
+                match.update({c: row[c] for c in match_columns if row.get(c)})
+                current = {"match": match}
+            current["team_metrics"] = []
+            current["player_metrics"] = []
+
+        if not row.get("metric_slug"):
+            continue
+        if row.get("player_id"):
+            current["player_metrics"].append({
+                "player_id": row["player_id"],
+                "metric_slug": row["metric_slug"],
+                "value": row.get("value"),
+            })
+        else:
+            current["team_metrics"].append({
+                "metric_slug": row["metric_slug"],
+                "side": row.get("side"),
+                "value": row.get("value"),
+            })
+
+    if current is not None:
+        yield build()
+
+
+# -----------------------------------------------------------------------------
+# Ingest
+# -----------------------------------------------------------------------------
+
+def _describe(record: MatchIngestRecord) -> str:
+    if record.match is not None:
+        return f"{record.match.date} {record.match.opponent_name}"
+    return f"match {record.match_id}"
+
+
+def _natural_key(team_id: int, match_date: date, opponent_name: str) -> Tuple[int, date, str]:
+    return team_id, match_date, opponent_name
+
+
+def ingest_records(
+    db: Session,
+    records: Iterable[ParsedRecord],
+    chunk_size: int = INGEST_CHUNK_SIZE,
+) -> IngestReport:
+    """
+    Ingest a stream of parsed records.
+
+    Args:
+        db: SQLAlchemy session (committed once per chunk).
+        records: Output of parse_ndjson / parse_csv.
+        chunk_size: Matches per transaction.
+
+    Returns:
+        IngestReport with per-record errors and throughput.
+    """
+    report = IngestReport()
+    started = time.perf_counter()
+
+    chunk: List[ParsedRecord] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            _ingest_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        _ingest_chunk(db, chunk, report)
+
+    elapsed = time.perf_counter() - started
+    total_rows = report.rows.participations + report.rows.team_metrics + report.rows.player_metrics
+    report.elapsed_seconds = round(elapsed, 3)
+    report.rows_per_second = round(total_rows / elapsed, 1) if elapsed > 0 else 0.0
+    return report
+
+
+def _ingest_chunk(db: Session, chunk: List[ParsedRecord], report: IngestReport) -> None:
+    """Validate and write one chunk of records in a single transaction."""
+    report.matches += len(chunk)
+
+    parsed: List[Tuple[int, MatchIngestRecord]] = []
+    for line, record in chunk:
+        if isinstance(record, MatchIngestRecord):
+            parsed.append((line, record))
+        else:
+            report.failed += 1
+            report.errors.append(IngestMatchError(line=line, errors=[record]))
+    if not parsed:
+        return
+
+    records = [record for _, record in parsed]
+
+    # --- lookups (one query each) ------------------------------------------
+    metrics = get_metric_records(
+        db,
+        {v.metric_slug for r in records for v in r.team_metrics}
+        | {v.metric_slug for r in records for v in r.player_metrics},
+    )
+
+    match_ids = {r.match_id for r in records if r.match_id is not None}
+    matches_by_id = {
+        m.id: m for m in db.query(Match).filter(Match.id.in_(match_ids))
+    } if match_ids else {}
+
+    natural_keys = {
+        _natural_key(r.match.team_id, r.match.date, r.match.opponent_name)
+        for r in records if r.match is not None
+    }
+    matches_by_key = {
+        _natural_key(m.team_id, m.date, m.opponent_name): m
+        for m in db.query(Match).filter(
+            tuple_(Match.team_id, Match.date, Match.opponent_name).in_(natural_keys)
+        )
+    } if natural_keys else {}
+
+    team_ids = {r.match.team_id for r in records if r.match is not None}
+    season_ids = {r.match.season_id for r in records if r.match is not None}
+    known_teams = {tid for (tid,) in db.query(Team.id).filter(Team.id.in_(team_ids))} if team_ids else set()
+    known_seasons = {
+        sid for (sid,) in db.query(Season.id).filter(Season.id.in_(season_ids))
+    } if season_ids else set()
+
+    player_ids = {p.player_id for r in records for p in (r.participations or [])}
+    player_ids |= {v.player_id for r in records for v in r.player_metrics}
+    player_teams: Dict[int, int] = dict(
+        db.query(Player.id, Player.team_id).filter(Player.id.in_(player_ids))
+    ) if player_ids else {}
+
+    # --- resolve / create matches -----------------------------------------
+    resolved: List[Tuple[int, MatchIngestRecord, Match, List[str]]] = []
+    created = 0
+    for line, record in parsed:
+        errors: List[str] = []
+        match: Optional[Match] = None
+
+        if record.match_id is not None:
+            match = matches_by_id.get(record.match_id)
+            if match is None:
+                errors.append(f"Match {record.match_id} not found")
+        else:
+            if record.match.team_id not in known_teams:
+                errors.append(f"Team {record.match.team_id} not found")
+            if record.match.season_id not in known_seasons:
+                errors.append(f"Season {record.match.season_id} not found")
+
+        team_id = match.team_id if match is not None else (record.match.team_id if record.match else None)
+        for part in record.participations or []:
+            if part.player_id not in player_teams:
+                errors.append(f"Player {part.player_id} not found")
+            elif player_teams[part.player_id] != team_id:
+                errors.append(f"Player {part.player_id} does not belong to match team")
+
+        if errors:
+            report.failed += 1
+            report.errors.append(IngestMatchError(line=line, match=_describe(record), errors=errors))
+            continue
+
+        if match is None:
+            key = _natural_key(record.match.team_id, record.match.date, record.match.opponent_name)
+            match = matches_by_key.get(key)
+            if match is None:
+                match = Match(**record.match.model_dump())
+                db.add(match)
+                matches_by_key[key] = match
+                created += 1
+            else:
+                for field, value in record.match.model_dump(exclude_unset=True).items():
+                    setattr(match, field, value)
+
+        resolved.append((line, record, match, []))
+
+    if not resolved:
+        return
+
+    try:
+        # New matches are inserted together and get their ids here
+        db.flush()
+
+        # --- build rows (last occurrence wins within the chunk) ------------
+        participations: Dict[int, Dict[int, Dict]] = {}
+        team_rows: Dict[Tuple, Dict] = {}
+        player_rows: Dict[Tuple, Dict] = {}
+        for line, record, match, errors in resolved:
+            if record.participations is not None:
+                participations[match.id] = {
+                    p.player_id: {"match_id": match.id, **p.model_dump()} for p in record.participations
+                }
+
+            valid, value_errors = validate_team_values(record.team_metrics, metrics)
+            errors.extend(value_errors)
+            for (metric_id, side), value in valid:
+                team_rows[(match.id, metric_id, side)] = {
+                    "match_id": match.id, "metric_id": metric_id, "side": side, "value_number": value
+                }
+
+            valid, value_errors = validate_player_values(record.player_metrics, metrics, set(player_teams))
+            errors.extend(value_errors)
+            for (player_id, metric_id), value in valid:
+                player_rows[(match.id, player_id, metric_id)] = {
+                    "match_id": match.id, "player_id": player_id, "metric_id": metric_id, "value_number": value
+                }
+
+        # --- writes ----------------------------------------------------------
+        participation_rows = [row for rows in participations.values() for row in rows.values()]
+        if participations:
+            db.query(MatchPlayerParticipation).filter(
+                MatchPlayerParticipation.match_id.in_(participations.keys())
+            ).delete(synchronize_session=False)
+            bump_match_teams(db, participations.keys())
+        if participation_rows:
+            db.execute(insert(MatchPlayerParticipation.__table__), participation_rows)
+        write_team_values(db, list(team_rows.values()))
+        write_player_values(db, list(player_rows.values()))
+
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        message = f"Database error: {e.__class__.__name__}: {getattr(e, 'orig', e)}"
+        for line, record, _, _ in resolved:
+            report.failed += 1
+            report.errors.append(IngestMatchError(line=line, match=_describe(record), errors=[message]))
+        return
+
+    report.succeeded += len(resolved)
+    report.created_matches += created
+    report.rows = IngestRowCounts(
+        participations=report.rows.participations + len(participation_rows),
+        team_metrics=report.rows.team_metrics + len(team_rows),
+        player_metrics=report.rows.player_metrics + len(player_rows),
+    )
+    for line, record, _, errors in resolved:
+        if errors:
+            report.errors.append(IngestMatchError(line=line, match=_describe(record), errors=errors))
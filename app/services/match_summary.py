@@ -9,15 +9,35 @@ Design goals:
 - No N+1 queries (explicit joins).
 - No derived computations (raw values only).
 - Frontend-friendly structure (Excel-like grid).
+- Schema objects are built with `model_construct`: the values come from typed
+  columns, so they are not validated a second time before serialization.
+
+On PostgreSQL, `get_match_summary_json` assembles the whole payload in one
+statement (`json_build_object` / `json_agg`) and returns the JSON bytes
+as-is; other databases build the same document from the four queries of
+`get_match_summary`.
+
+The player grid can also be requested in a columnar encoding
+(`?grid=columnar`, PlayerMetricsColumnarGrid): a dense value array and a
+presence bitmap instead of one dict per player.
+
+It also provides the row streams behind the CSV / Excel exports
+(`/matches/{match_id}/summary.csv`, `/matches/export.csv`): rows are read
+from a server-side cursor and yielded one by one, so exporting a full season
+keeps a constant memory footprint.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
+import base64
+import string
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import and_
+from sqlalchemy import and_, select, text
 from sqlalchemy.orm import Session
 
+from app.db.dialect import dialect_name
 from app.models import (
     Match,
     MatchPlayerParticipation,
@@ -28,18 +48,253 @@ from app.models import (
     PlayerMatchMetricValue,
     TeamMatchMetricValue,
 )
+from app.services.metric_registry import get_metric_registry
 from app.schemas.summary import (
     MatchSummaryMatch,
     MatchSummaryResponse,
     ParticipationWithPlayer,
     PlayerGridColumn,
     PlayerGridPlayer,
+    PlayerMetricsColumnarGrid,
     PlayerMetricsGrid,
     TeamMetricCell,
     TeamMetricsBlock,
 )
 
 
+# Same document as MatchSummaryResponse, same orderings as the ORM path:
+# Python sorts strings by code point, hence COLLATE "C"; grid players use the
+# full key of _player_sort_key (lower() under "C" only folds ASCII letters,
+# whatever the database LC_CTYPE).
+SUMMARY_JSON_SQL = text("""
+WITH m AS (
+    SELECT * FROM matches WHERE id = :match_id
+),
+participations AS (
+    SELECT json_agg(json_build_object(
+        'player_id', p.id,
+        'player_name', p.first_name || ' ' || p.last_name,
+        'main_position', p.main_position,
+        'is_starter', coalesce(mp.is_starter, false),
+        'is_captain', coalesce(mp.is_captain, false),
+        'minutes_played', mp.minutes_played,
+        'position_played', mp.position_played
+    ) ORDER BY p.last_name, p.first_name, p.id) AS items
+    FROM match_player_participations mp
+    JOIN players p ON p.id = mp.player_id
+    WHERE mp.match_id = :match_id
+),
+team AS (
+    SELECT
+        json_agg(cell ORDER BY category, slug) FILTER (WHERE side <> 'OPPONENT') AS own,
+        json_agg(cell ORDER BY category, slug) FILTER (WHERE side = 'OPPONENT') AS opponent
+    FROM (
+        SELECT d.category, d.slug, v.side, json_build_object(
+            'metric_slug', d.slug,
+            'metric_label', d.label_fr,
+            'side', v.side,
+            'value', v.value_number,
+            'unit', d.unit
+        ) AS cell
+        FROM team_match_metric_values v
+        JOIN metric_definitions d ON d.id = v.metric_id
+        WHERE v.match_id = :match_id
+    ) cells
+),
+pv AS (
+    SELECT v.player_id, v.metric_id, v.value_number
+    FROM player_match_metric_values v
+    WHERE v.match_id = :match_id
+),
+grid_players AS (
+    SELECT DISTINCT p.id, p.first_name || ' ' || p.last_name AS name, p.last_name, p.first_name, p.main_position
+    FROM pv JOIN players p ON p.id = pv.player_id
+),
+grid_columns AS (
+    SELECT DISTINCT d.id, d.slug, d.label_fr, d.unit, d.category
+    FROM pv JOIN metric_definitions d ON d.id = pv.metric_id
+),
+grid_values AS (
+    SELECT gp.id AS player_id, json_object_agg(gc.slug, pv.value_number ORDER BY gc.slug COLLATE "C") AS player_values
+    FROM grid_players gp
+    CROSS JOIN grid_columns gc
+    LEFT JOIN pv ON pv.player_id = gp.id AND pv.metric_id = gc.id
+    GROUP BY gp.id
+)
+SELECT json_build_object(
+    'match', json_build_object(
+        'id', m.id,
+        'team_id', m.team_id,
+        'season_id', m.season_id,
+        'date', m.date,
+        'opponent_name', m.opponent_name,
+        'is_home', coalesce(m.is_home, false),
+        'match_type', m.match_type,
+        'competition', m.competition,
+        'score_for', m.score_for,
+        'score_against', m.score_against,
+        'veo_title', m.veo_title,
+        'veo_url', m.veo_url,
+        'veo_duration', m.veo_duration,
+        'veo_camera', m.veo_camera
+    ),
+    'participations', coalesce((SELECT items FROM participations), '[]'::json),
+    'team_metrics', json_build_object(
+        'OWN', coalesce(team.own, '[]'::json),
+        'OPPONENT', coalesce(team.opponent, '[]'::json)
+    ),
+    'player_metrics', json_build_object(
+        'players', coalesce((
+            SELECT json_agg(json_build_object('id', id, 'name', name, 'main_position', main_position)
+                            ORDER BY lower(name COLLATE "C"), last_name COLLATE "C",
+                                     first_name COLLATE "C", id)
+            FROM grid_players
+        ), '[]'::json),
+        'columns', coalesce((
+            SELECT json_agg(json_build_object('slug', slug, 'label', label_fr, 'unit', unit, 'category', category)
+                            ORDER BY slug COLLATE "C")
+            FROM grid_columns
+        ), '[]'::json),
+        'values', coalesce((
+            SELECT json_object_agg(player_id::text, player_values) FROM grid_values
+        ), '{}'::json)
+    )
+)::text
+FROM m, team
+""")
+
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _player_sort_key(player_id: int, first_name: str, last_name: str) -> Tuple[str, str, str, int]:
+    """
+    Order of the players of a summary grid.
+
+    Case-insensitive on ASCII letters only, then last name, first name and
+    id, all compared by code point: the same key as the PostgreSQL statement
+    (`lower(... COLLATE "C")`), independent of the database locale.
+    """
+    name = f"{first_name} {last_name}".translate(_ASCII_LOWER)
+    return name, last_name, first_name, player_id
+
+
+def _category_name(category: Any) -> str:
+    return category.value if hasattr(category, "value") else str(category)
+
+
+class _NestedGridBuilder:
+    """
+    Excel-like grid of one match (PlayerMetricsGrid).
+
+    The grid structure is:
+    - players (rows)
+    - columns (metric definitions)
+    - values: {player_id(str): {metric_slug: value_or_null}}
+    """
+
+    def __init__(self) -> None:
+        self.players: Dict[int, PlayerGridPlayer] = {}
+        self.player_keys: Dict[int, Tuple[str, str, str, int]] = {}
+        self.columns: Dict[str, PlayerGridColumn] = {}
+        # values[player_id_str][metric_slug] = value
+        self.values: Dict[str, Dict[str, Optional[float]]] = {}
+
+    def add(self, player_id, first_name, last_name, position, slug, label, unit, category, value) -> None:
+        if player_id not in self.players:
+            self.players[player_id] = PlayerGridPlayer.model_construct(
+                id=player_id, name=f"{first_name} {last_name}", main_position=position
+            )
+            self.player_keys[player_id] = _player_sort_key(player_id, first_name, last_name)
+            self.values[str(player_id)] = {}
+        if slug not in self.columns:
+            self.columns[slug] = PlayerGridColumn.model_construct(
+                slug=slug, label=label, unit=unit, category=_category_name(category)
+            )
+        self.values[str(player_id)][slug] = float(value)
+
+    def build(self) -> PlayerMetricsGrid:
+        # Sort players and columns for stable frontend rendering
+        players_sorted = sorted(self.players.values(), key=lambda p: self.player_keys[p.id])
+        columns_sorted = sorted(self.columns.values(), key=lambda c: c.slug)
+
+        # Fill missing metrics with null for each player (important for grid)
+        for p in players_sorted:
+            row = self.values[str(p.id)]
+            for col in columns_sorted:
+                row.setdefault(col.slug, None)
+
+        return PlayerMetricsGrid.model_construct(
+            players=players_sorted, columns=columns_sorted, values=self.values
+        )
+
+
+class _ColumnarGridBuilder:
+    """
+    Columnar grid of one match (PlayerMetricsColumnarGrid).
+
+    Players and columns are ordered like the nested grid. Stored cells are
+    appended to flat arrays (no per-cell objects), then written into the
+    dense value array and the presence bitmap.
+    """
+
+    def __init__(self) -> None:
+        self.players: List[PlayerGridPlayer] = []
+        self.player_keys: List[Tuple[str, str, str, int]] = []
+        self.columns: List[PlayerGridColumn] = []
+        self.player_index: Dict[int, int] = {}
+        self.column_index: Dict[str, int] = {}
+        self.cell_players = array("q")
+        self.cell_columns = array("q")
+        self.cell_values = array("d")
+
+    def add(self, player_id, first_name, last_name, position, slug, label, unit, category, value) -> None:
+        row = self.player_index.get(player_id)
+        if row is None:
+            row = self.player_index[player_id] = len(self.players)
+            self.players.append(PlayerGridPlayer.model_construct(
+                id=player_id, name=f"{first_name} {last_name}", main_position=position
+            ))
+            self.player_keys.append(_player_sort_key(player_id, first_name, last_name))
+        col = self.column_index.get(slug)
+        if col is None:
+            col = self.column_index[slug] = len(self.columns)
+            self.columns.append(PlayerGridColumn.model_construct(
+                slug=slug, label=label, unit=unit, category=_category_name(category)
+            ))
+        self.cell_players.append(row)
+        self.cell_columns.append(col)
+        self.cell_values.append(float(value))
+
+    def build(self) -> PlayerMetricsColumnarGrid:
+        players, columns = self.players, self.columns
+
+        # Final order (same as the nested grid) and position of each first-seen index in it
+        player_order = sorted(range(len(players)), key=self.player_keys.__getitem__)
+        column_order = sorted(range(len(columns)), key=lambda i: columns[i].slug)
+        player_rank = [0] * len(players)
+        for rank, i in enumerate(player_order):
+            player_rank[i] = rank
+        column_rank = [0] * len(columns)
+        for rank, i in enumerate(column_order):
+            column_rank[i] = rank
+
+        width = len(columns)
+        values = array("d", [0.0]) * (len(players) * width)
+        present = bytearray((len(values) + 7) // 8)
+        for row, col, value in zip(self.cell_players, self.cell_columns, self.cell_values):
+            cell = player_rank[row] * width + column_rank[col]
+            values[cell] = value
+            present[cell >> 3] |= 1 << (cell & 7)
+
+        return PlayerMetricsColumnarGrid.model_construct(
+            players=[players[i] for i in player_order],
+            columns=[columns[i] for i in column_order],
+            values=values.tolist(),
+            present=base64.b64encode(bytes(present)).decode("ascii"),
+        )
+
+
 class MatchSummaryService:
     """Service responsible for building the match summary payload."""
 
@@ -52,7 +307,7 @@ class MatchSummaryService:
         """
         self.db = db
 
-    def get_match_summary(self, match_id: int) -> MatchSummaryResponse:
+    def get_match_summary(self, match_id: int, grid: str = "nested") -> MatchSummaryResponse:
         """
         Build the full match summary payload for a given match.
 
@@ -64,6 +319,8 @@ class MatchSummaryService:
 
         Args:
             match_id: Match identifier.
+            grid: Player grid encoding, "nested" (PlayerMetricsGrid) or
+                "columnar" (PlayerMetricsColumnarGrid).
 
         Returns:
             A MatchSummaryResponse object.
@@ -71,65 +328,135 @@ class MatchSummaryService:
         Raises:
             ValueError: If the match does not exist.
         """
-        match = self._get_match_or_raise(match_id)
-        participations = self._get_participations_with_players(match_id)
-        team_metrics = self._get_team_metrics(match_id)
-        player_grid = self._get_player_metrics_grid(match_id)
-
-        return MatchSummaryResponse(
-            match=self._map_match(match),
-            participations=participations,
-            team_metrics=team_metrics,
-            player_metrics=player_grid,
-        )
+        summaries = self.get_match_summaries(match_ids=[match_id], grid=grid)
+        if not summaries:
+            raise ValueError("Match not found")
+        return summaries[0]
+
+    def get_match_summaries(
+        self,
+        match_ids: Optional[Sequence[int]] = None,
+        team_id: Optional[int] = None,
+        season_id: Optional[int] = None,
+        grid: str = "nested",
+    ) -> List[MatchSummaryResponse]:
+        """
+        Build the summaries of many matches with the same four queries as one.
 
-    # ---------------------------------------------------------------------
-    # Queries
-    # ---------------------------------------------------------------------
+        Participations, team metrics and player metrics of the whole match set
+        are fetched with `IN` queries and split per match in memory.
 
-    def _get_match_or_raise(self, match_id: int) -> Match:
-        """Fetch a match by ID or raise.
+        Args:
+            match_ids: Matches to summarize (unknown ids are left out).
+            team_id: Restrict to a team.
+            season_id: Restrict to a season.
+            grid: Player grid encoding ("nested" or "columnar").
+
+        Returns:
+            MatchSummaryResponse objects ordered by match date then id.
+        """
+        matches = self._get_matches(match_ids, team_id, season_id)
+        if not matches:
+            return []
+        ids = [m.id for m in matches]
+
+        participations = self._get_participations_with_players(ids)
+        team_metrics = self._get_team_metrics(ids)
+        builder = _ColumnarGridBuilder if grid == "columnar" else _NestedGridBuilder
+        grids = self._get_player_metrics_grids(ids, builder)
+
+        return [
+            MatchSummaryResponse.model_construct(
+                match=self._map_match(match),
+                participations=participations.get(match.id, []),
+                team_metrics=team_metrics.get(match.id) or TeamMetricsBlock.model_construct(),
+                player_metrics=grids[match.id] if match.id in grids else builder().build(),
+            )
+            for match in matches
+        ]
+
+    def get_match_summary_json(self, match_id: int, grid: str = "nested") -> bytes:
+        """
+        Match summary serialized as JSON, ready to be sent as the response body.
+
+        On PostgreSQL the nested document is built by a single statement
+        (SUMMARY_JSON_SQL); elsewhere, and for the columnar grid, it is the
+        serialized `get_match_summary` payload. Both produce the same JSON
+        document (numbers may differ in formatting only, e.g. `3` vs `3.0`).
 
         Args:
             match_id: Match identifier.
+            grid: Player grid encoding ("nested" or "columnar").
 
         Returns:
-            Match ORM object.
+            UTF-8 encoded JSON.
 
         Raises:
-            ValueError: If match does not exist.
+            ValueError: If the match does not exist.
         """
-        match = self.db.query(Match).get(match_id)
-        if not match:
+        if grid != "nested" or dialect_name(self.db) != "postgresql":
+            return self.get_match_summary(match_id, grid=grid).model_dump_json().encode("utf-8")
+
+        payload = self.db.execute(SUMMARY_JSON_SQL, {"match_id": match_id}).scalar()
+        if payload is None:
             raise ValueError("Match not found")
-        return match
+        return payload.encode("utf-8")
+
+    # ---------------------------------------------------------------------
+    # Queries (one per block, for a whole set of matches)
+    # ---------------------------------------------------------------------
+
+    def _get_matches(
+        self,
+        match_ids: Optional[Sequence[int]],
+        team_id: Optional[int],
+        season_id: Optional[int],
+    ) -> List[Match]:
+        """Matches selected by ids and / or team and season, by date then id.
+
+        Args:
+            match_ids: Match identifiers (None for no id filter).
+            team_id: Restrict to a team.
+            season_id: Restrict to a season.
+
+        Returns:
+            Match ORM objects.
+        """
+        query = self.db.query(Match)
+        if match_ids is not None:
+            query = query.filter(Match.id.in_(list(match_ids)))
+        if team_id is not None:
+            query = query.filter(Match.team_id == team_id)
+        if season_id is not None:
+            query = query.filter(Match.season_id == season_id)
+        return query.order_by(Match.date.asc(), Match.id.asc()).all()
 
     def _get_participations_with_players(
-        self, match_id: int
-    ) -> List[ParticipationWithPlayer]:
+        self, match_ids: List[int]
+    ) -> Dict[int, List[ParticipationWithPlayer]]:
         """
-        Fetch participations for a match enriched with player identity.
+        Fetch participations of the matches enriched with player identity.
 
         This uses a join between match_player_participations and players.
 
         Args:
-            match_id: Match identifier.
+            match_ids: Match identifiers.
 
         Returns:
-            List of ParticipationWithPlayer objects.
+            match_id -> list of ParticipationWithPlayer objects.
         """
         rows: List[Tuple[MatchPlayerParticipation, Player]] = (
             self.db.query(MatchPlayerParticipation, Player)
             .join(Player, MatchPlayerParticipation.player_id == Player.id)
-            .filter(MatchPlayerParticipation.match_id == match_id)
-            .order_by(Player.last_name.asc(), Player.first_name.asc())
+            .filter(MatchPlayerParticipation.match_id.in_(match_ids))
+            .order_by(Player.last_name.asc(), Player.first_name.asc(), Player.id.asc())
             .all()
         )
 
-        result: List[ParticipationWithPlayer] = []
+        result: Dict[int, List[ParticipationWithPlayer]] = {}
         for part, player in rows:
-            result.append(
-                ParticipationWithPlayer(
+            result.setdefault(part.match_id, []).append(
+                ParticipationWithPlayer.model_construct(
                     player_id=player.id,
                     player_name=f"{player.first_name} {player.last_name}",
                     main_position=player.main_position,
@@ -141,129 +468,300 @@ class MatchSummaryService:
             )
         return result
 
-    def _get_team_metrics(self, match_id: int) -> TeamMetricsBlock:
+    def _get_team_metrics(self, match_ids: List[int]) -> Dict[int, TeamMetricsBlock]:
         """
-        Fetch all raw team metrics for a match, split by side.
+        Fetch all raw team metrics of the matches, split by side.
 
         Args:
-            match_id: Match identifier.
+            match_ids: Match identifiers.
 
         Returns:
-            TeamMetricsBlock with OWN and OPPONENT lists.
+            match_id -> TeamMetricsBlock with OWN and OPPONENT lists.
         """
         rows: List[Tuple[TeamMatchMetricValue, MetricDefinition]] = (
             self.db.query(TeamMatchMetricValue, MetricDefinition)
             .join(
                 MetricDefinition, TeamMatchMetricValue.metric_id == MetricDefinition.id
             )
-            .filter(TeamMatchMetricValue.match_id == match_id)
+            .filter(TeamMatchMetricValue.match_id.in_(match_ids))
             .order_by(MetricDefinition.category.asc(), MetricDefinition.slug.asc())
             .all()
         )
 
-        own: List[TeamMetricCell] = []
-        opp: List[TeamMetricCell] = []
-
+        blocks: Dict[int, TeamMetricsBlock] = {}
         for value, metric in rows:
-            cell = TeamMetricCell(
+            cell = TeamMetricCell.model_construct(
                 metric_slug=metric.slug,
                 metric_label=metric.label_fr,
                 side=value.side,
                 value=float(value.value_number),
                 unit=metric.unit,
             )
-            if value.side == MetricSide.OWN:
-                own.append(cell)
-            elif value.side == MetricSide.OPPONENT:
-                opp.append(cell)
+            block = blocks.get(value.match_id)
+            if block is None:
+                block = blocks[value.match_id] = TeamMetricsBlock.model_construct()
+            if value.side == MetricSide.OPPONENT:
+                block.OPPONENT.append(cell)
             else:
-                # Team metrics should not be NONE, but keep safe behavior.
-                own.append(cell)
+                # OWN (team metrics should not be NONE, but keep safe behavior)
+                block.OWN.append(cell)
+        return blocks
 
-        return TeamMetricsBlock(OWN=own, OPPONENT=opp)
-
-    def _get_player_metrics_grid(self, match_id: int) -> PlayerMetricsGrid:
+    def _get_player_metrics_grids(self, match_ids: List[int], builder: type) -> Dict[int, Any]:
         """
-        Fetch all raw player metrics for a match and build an Excel-like grid.
-
-        The grid structure is:
-        - players (rows)
-        - columns (metric definitions)
-        - values: {player_id(str): {metric_slug: value_or_null}}
+        Fetch all raw player metrics of the matches and build one grid per match.
 
         Args:
-            match_id: Match identifier.
+            match_ids: Match identifiers.
+            builder: _NestedGridBuilder or _ColumnarGridBuilder.
 
         Returns:
-            PlayerMetricsGrid object.
+            match_id -> PlayerMetricsGrid / PlayerMetricsColumnarGrid (matches
+            without player metrics are left out).
         """
-        # Fetch all player metric values for this match with joins
-        rows: List[Tuple[PlayerMatchMetricValue, MetricDefinition, Player]] = (
-            self.db.query(PlayerMatchMetricValue, MetricDefinition, Player)
-            .join(
-                MetricDefinition,
-                PlayerMatchMetricValue.metric_id == MetricDefinition.id,
+        rows = self.db.execute(
+            select(
+                PlayerMatchMetricValue.match_id,
+                Player.id,
+                Player.first_name,
+                Player.last_name,
+                Player.main_position,
+                MetricDefinition.slug,
+                MetricDefinition.label_fr,
+                MetricDefinition.unit,
+                MetricDefinition.category,
+                PlayerMatchMetricValue.value_number,
             )
+            .join(MetricDefinition, PlayerMatchMetricValue.metric_id == MetricDefinition.id)
             .join(Player, PlayerMatchMetricValue.player_id == Player.id)
-            .filter(PlayerMatchMetricValue.match_id == match_id)
+            .where(PlayerMatchMetricValue.match_id.in_(match_ids))
             .order_by(
                 Player.last_name.asc(),
                 Player.first_name.asc(),
+                Player.id.asc(),
                 MetricDefinition.slug.asc(),
             )
-            .all()
         )
 
-        # Build unique players and columns (metrics)
-        player_map: Dict[int, PlayerGridPlayer] = {}
-        col_map: Dict[str, PlayerGridColumn] = {}
+        builders: Dict[int, Any] = {}
+        for match_id, *cell in rows:
+            grid = builders.get(match_id)
+            if grid is None:
+                grid = builders[match_id] = builder()
+            grid.add(*cell)
+        return {match_id: grid.build() for match_id, grid in builders.items()}
 
-        # values[player_id_str][metric_slug] = value
-        values: Dict[str, Dict[str, Optional[float]]] = {}
-
-        for value, metric, player in rows:
-            # players
-            if player.id not in player_map:
-                player_map[player.id] = PlayerGridPlayer(
-                    id=player.id,
-                    name=f"{player.first_name} {player.last_name}",
-                    main_position=player.main_position,
-                )
-                values[str(player.id)] = {}
-
-            # columns (player scope only)
-            if metric.slug not in col_map:
-                col_map[metric.slug] = PlayerGridColumn(
-                    slug=metric.slug,
-                    label=metric.label_fr,
-                    unit=metric.unit,
-                    category=(
-                        metric.category.value
-                        if hasattr(metric.category, "value")
-                        else str(metric.category)
-                    ),
-                )
+    # ---------------------------------------------------------------------
+    # Exports (streamed rows)
+    # ---------------------------------------------------------------------
 
-            values[str(player.id)][metric.slug] = float(value.value_number)
+    EXPORT_MATCH_COLUMNS = [
+        "match_id",
+        "date",
+        "opponent_name",
+        "is_home",
+        "score_for",
+        "score_against",
+    ]
+    EXPORT_PLAYER_COLUMNS = [
+        "player_id",
+        "player_name",
+        "main_position",
+        "is_starter",
+        "is_captain",
+        "minutes_played",
+        "position_played",
+    ]
+
+    # Rows fetched per round trip from the server-side cursor
+    EXPORT_YIELD_PER = 1000
+
+    def _export_match_filter(
+        self,
+        match_id: Optional[int],
+        team_id: Optional[int],
+        season_id: Optional[int],
+    ) -> list:
+        """SQL conditions on Match selecting the exported matches."""
+        conditions = []
+        if match_id is not None:
+            conditions.append(Match.id == match_id)
+        if team_id is not None:
+            conditions.append(Match.team_id == team_id)
+        if season_id is not None:
+            conditions.append(Match.season_id == season_id)
+        return conditions
+
+    def iter_player_grid_rows(
+        self,
+        match_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+        season_id: Optional[int] = None,
+    ) -> Iterator[List[Any]]:
+        """
+        Stream the player metrics grid as flat rows (one per match x player).
 
-        # Sort players and columns for stable frontend rendering
-        players_sorted = sorted(player_map.values(), key=lambda p: p.name.lower())
-        columns_sorted = sorted(col_map.values(), key=lambda c: c.slug)
+        The first yielded row is the header: match columns, player /
+        participation columns, then one column per player metric present in
+        the selection (sorted by slug, like the summary grid).
 
-        # Fill missing metrics with null for each player (important for grid)
-        for p in players_sorted:
-            pid = str(p.id)
-            if pid not in values:
-                values[pid] = {}
-            for col in columns_sorted:
-                values[pid].setdefault(col.slug, None)
+        Args:
+            match_id: Restrict to one match.
+            team_id: Restrict to a team.
+            season_id: Restrict to a season.
 
-        return PlayerMetricsGrid(
-            players=players_sorted,
-            columns=columns_sorted,
-            values=values,
+        Yields:
+            Header row, then data rows (None for missing values).
+        """
+        conditions = self._export_match_filter(match_id, team_id, season_id)
+        registry = get_metric_registry(self.db)
+
+        metric_ids = [
+            mid
+            for (mid,) in self.db.execute(
+                select(PlayerMatchMetricValue.metric_id)
+                .join(Match, PlayerMatchMetricValue.match_id == Match.id)
+                .where(*conditions)
+                .distinct()
+            )
+        ]
+        columns = sorted(
+            (registry.get_by_id(mid) for mid in metric_ids if registry.get_by_id(mid)),
+            key=lambda m: m.slug,
+        )
+        position = {metric.id: i for i, metric in enumerate(columns)}
+
+        yield self.EXPORT_MATCH_COLUMNS + self.EXPORT_PLAYER_COLUMNS + [m.slug for m in columns]
+
+        stmt = (
+            select(
+                Match.id,
+                Match.date,
+                Match.opponent_name,
+                Match.is_home,
+                Match.score_for,
+                Match.score_against,
+                Player.id,
+                Player.first_name,
+                Player.last_name,
+                Player.main_position,
+                MatchPlayerParticipation.is_starter,
+                MatchPlayerParticipation.is_captain,
+                MatchPlayerParticipation.minutes_played,
+                MatchPlayerParticipation.position_played,
+                PlayerMatchMetricValue.metric_id,
+                PlayerMatchMetricValue.value_number,
+            )
+            .join(Match, PlayerMatchMetricValue.match_id == Match.id)
+            .join(Player, PlayerMatchMetricValue.player_id == Player.id)
+            .outerjoin(
+                MatchPlayerParticipation,
+                and_(
+                    MatchPlayerParticipation.match_id == PlayerMatchMetricValue.match_id,
+                    MatchPlayerParticipation.player_id == PlayerMatchMetricValue.player_id,
+                ),
+            )
+            .where(*conditions)
+            .order_by(
+                Match.date.asc(),
+                Match.id.asc(),
+                Player.last_name.asc(),
+                Player.first_name.asc(),
+                Player.id.asc(),
+            )
+            .execution_options(yield_per=self.EXPORT_YIELD_PER)
+        )
+
+        current_key = None
+        current: List[Any] = []
+        for row in self.db.execute(stmt):
+            key = (row[0], row[6])
+            if key != current_key:
+                if current_key is not None:
+                    yield current
+                current_key = key
+                current = [
+                    row[0], row[1], row[2], bool(row[3]), row[4], row[5],
+                    row[6], f"{row[7]} {row[8]}", row[9],
+                    bool(row[10]) if row[10] is not None else None,
+                    bool(row[11]) if row[11] is not None else None,
+                    row[12], row[13],
+                ] + [None] * len(columns)
+            i = position.get(row[14])
+            if i is not None:
+                current[len(self.EXPORT_MATCH_COLUMNS) + len(self.EXPORT_PLAYER_COLUMNS) + i] = float(row[15])
+        if current_key is not None:
+            yield current
+
+    def iter_team_metric_rows(
+        self,
+        match_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+        season_id: Optional[int] = None,
+    ) -> Iterator[List[Any]]:
+        """
+        Stream team metrics as flat rows (one per match).
+
+        Metric columns are named `<slug>:<side>` (e.g. `team_shots:OWN`).
+
+        Args:
+            match_id: Restrict to one match.
+            team_id: Restrict to a team.
+            season_id: Restrict to a season.
+
+        Yields:
+            Header row, then data rows (None for missing values).
+        """
+        conditions = self._export_match_filter(match_id, team_id, season_id)
+        registry = get_metric_registry(self.db)
+
+        keys = [
+            (registry.get_by_id(mid), side)
+            for mid, side in self.db.execute(
+                select(TeamMatchMetricValue.metric_id, TeamMatchMetricValue.side)
+                .join(Match, TeamMatchMetricValue.match_id == Match.id)
+                .where(*conditions)
+                .distinct()
+            )
+            if registry.get_by_id(mid)
+        ]
+        keys.sort(key=lambda k: (k[0].slug, k[1].value))
+        position = {(metric.id, side): i for i, (metric, side) in enumerate(keys)}
+
+        yield self.EXPORT_MATCH_COLUMNS + [f"{metric.slug}:{side.value}" for metric, side in keys]
+
+        stmt = (
+            select(
+                Match.id,
+                Match.date,
+                Match.opponent_name,
+                Match.is_home,
+                Match.score_for,
+                Match.score_against,
+                TeamMatchMetricValue.metric_id,
+                TeamMatchMetricValue.side,
+                TeamMatchMetricValue.value_number,
+            )
+            .join(Match, TeamMatchMetricValue.match_id == Match.id)
+            .where(*conditions)
+            .order_by(Match.date.asc(), Match.id.asc())
+            .execution_options(yield_per=self.EXPORT_YIELD_PER)
         )
 
+        current_id = None
+        current: List[Any] = []
+        for row in self.db.execute(stmt):
+            if row[0] != current_id:
+                if current_id is not None:
+                    yield current
+                current_id = row[0]
+                current = [row[0], row[1], row[2], bool(row[3]), row[4], row[5]] + [None] * len(keys)
+            i = position.get((row[6], row[7]))
+            if i is not None:
+                current[len(self.EXPORT_MATCH_COLUMNS) + i] = float(row[8])
+        if current_id is not None:
+            yield current
+
     # ---------------------------------------------------------------------
     # Mapping helpers
     # ---------------------------------------------------------------------
@@ -279,7 +777,7 @@ class MatchSummaryService:
         Returns:
             MatchSummaryMatch schema object.
         """
-        return MatchSummaryMatch(
+        return MatchSummaryMatch.model_construct(
             id=match.id,
             team_id=match.team_id,
             season_id=match.season_id,
@@ -0,0 +1,106 @@
+"""
+Column-oriented container for metric values.
+
+Analytics reads raw values from the EAV tables (one row per match / metric /
+side) and pivots them in memory into a small matrix:
+- rows: match ids (or any other hashable row key),
+- columns: one list per metric key (e.g. `(slug, side)`), aligned on the rows.
+
+Missing cells are kept as None so that aggregations can still distinguish
+"no stored value" from an explicit zero (SQL SUM/AVG semantics).
+"""
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+Column = List[Optional[float]]
+
+
+class MetricMatrix:
+    """Rows x columns matrix of metric values, stored column by column."""
+
+    def __init__(self, row_keys: Sequence[Hashable]) -> None:
+        self.row_keys: List[Hashable] = list(row_keys)
+        self._index: Dict[Hashable, int] = {key: i for i, key in enumerate(self.row_keys)}
+        self.columns: Dict[Hashable, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.row_keys)
+
+    def set(self, row_key: Hashable, column_key: Hashable, value: float) -> None:
+        """Store a value; unknown row keys are ignored"""
+        i = self._index.get(row_key)
+        if i is None:
+            return
+        column = self.columns.get(column_key)
+        if column is None:
+            column = self.columns[column_key] = [None] * len(self.row_keys)
+        column[i] = value
+
+    def column(self, column_key: Hashable) -> Column:
+        """Raw column (None for missing cells)"""
+        column = self.columns.get(column_key)
+        return column if column is not None else [None] * len(self.row_keys)
+
+    def filled(self, column_key: Hashable, default: float = 0.0) -> List[float]:
+        """Column with missing cells replaced by `default`"""
+        column = self.columns.get(column_key)
+        if column is None:
+            return [default] * len(self.row_keys)
+        return [default if v is None else v for v in column]
+
+    def subset(self, row_keys: Iterable[Hashable]) -> "MetricMatrix":
+        """New matrix restricted to the given rows (same columns)"""
+        keys = [k for k in row_keys if k in self._index]
+        positions = [self._index[k] for k in keys]
+        sub = MetricMatrix(keys)
+        for column_key, column in self.columns.items():
+            sub.columns[column_key] = [column[i] for i in positions]
+        return sub
+
+
+# -----------------------------------------------------------------------------
+# Column aggregations
+# -----------------------------------------------------------------------------
+
+def stored_sum(column: Column) -> float:
+    """SUM over stored cells (0.0 when nothing is stored)"""
+    return float(sum(v for v in column if v is not None))
+
+
+def stored_avg(column: Column) -> float:
+    """AVG over stored cells (0.0 when nothing is stored)"""
+    stored = [v for v in column if v is not None]
+    return float(sum(stored) / len(stored)) if stored else 0.0
+
+
+# -----------------------------------------------------------------------------
+# Series transforms (chronological columns without missing cells)
+# -----------------------------------------------------------------------------
+
+def rolling_mean(values: Sequence[float], window: int) -> List[float]:
+    """Mean over the last `window` points (fewer at the start of the series)"""
+    result: List[float] = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        result.append(total / min(i + 1, window))
+    return result
+
+
+def cumulative_sum(values: Sequence[float]) -> List[float]:
+    """Running total"""
+    result: List[float] = []
+    total = 0.0
+    for value in values:
+        total += value
+        result.append(total)
+    return result
+
+
+def ewm(values: Sequence[float], alpha: float) -> List[float]:
+    """Exponentially weighted mean: s[0] = x[0], s[t] = alpha * x[t] + (1 - alpha) * s[t-1]"""
+    result: List[float] = []
+    for value in values:
+        result.append(value if not result else alpha * value + (1 - alpha) * result[-1])
+    return result
@@ -0,0 +1,196 @@
+"""
+Process-wide metric definitions registry.
+
+`metric_definitions` is a small table (~50 rows) that only changes when
+`app.seed` runs, yet it is read by every analytics call and every row of the
+bulk metric endpoints. The registry loads it once per process (and per
+database engine), exposes each definition as an immutable record and keeps
+the compiled derived formulas next to it.
+
+Consistency across workers relies on the `metric_definitions` version stamp
+(see app.services.data_versions):
+- it is bumped by `invalidate_metric_registry()` (called by the seed script)
+  and, on PostgreSQL, by a statement-level trigger on metric_definitions,
+- each process re-checks it at most every METRIC_REGISTRY_CHECK_SECONDS and
+  reloads the registry when it changed.
+
+A lookup miss reloads the definitions once (rows inserted without bumping
+the stamp); slugs / ids still unknown after that reload are remembered by
+the registry, so repeated requests for a wrong slug do not reload again
+until the version stamp changes.
+"""
+import threading
+import time
+import weakref
+from types import MappingProxyType
+from typing import Dict, Hashable, Iterable, Mapping, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import MetricCategory, MetricDataType, MetricDefinition, MetricScope, MetricSide
+from app.services.data_versions import METRIC_DEFINITIONS_KEY, bump_data_version, get_data_version
+from app.services.formulas import CompiledFormula, compile_formulas
+
+# Upper bound of the remembered lookup misses of a registry
+MAX_REMEMBERED_MISSES = 1024
+
+
+class MetricRecord(NamedTuple):
+    """Immutable snapshot of a MetricDefinition row."""
+
+    id: int
+    slug: str
+    label_fr: str
+    description_fr: Optional[str]
+    scope: MetricScope
+    category: MetricCategory
+    datatype: MetricDataType
+    unit: Optional[str]
+    side: MetricSide
+    is_derived: bool
+    formula: Optional[str]
+
+    @classmethod
+    def from_model(cls, metric: MetricDefinition) -> "MetricRecord":
+        return cls(
+            id=metric.id,
+            slug=metric.slug,
+            label_fr=metric.label_fr,
+            description_fr=metric.description_fr,
+            scope=metric.scope,
+            category=metric.category,
+            datatype=metric.datatype or MetricDataType.INT,
+            unit=metric.unit,
+            side=metric.side or MetricSide.NONE,
+            is_derived=bool(metric.is_derived),
+            formula=metric.formula,
+        )
+
+
+class MetricRegistry:
+    """All metric definitions of one database, indexed by slug and id."""
+
+    def __init__(self, records: Iterable[MetricRecord], version: int) -> None:
+        records = list(records)
+        self.version = version
+        self.by_slug: Mapping[str, MetricRecord] = MappingProxyType({r.slug: r for r in records})
+        self.by_id: Mapping[int, MetricRecord] = MappingProxyType({r.id: r for r in records})
+
+        formulas, errors = compile_formulas(records)
+        self.formulas: Mapping[str, CompiledFormula] = MappingProxyType(formulas)
+        self.formula_errors: Mapping[str, str] = MappingProxyType(errors)
+
+        self.checked_at = time.monotonic()
+        # Slugs / ids unknown after a reload at this version
+        self.misses: Set[Hashable] = set()
+
+    def get(self, slug: str) -> Optional[MetricRecord]:
+        """Definition by slug"""
+        return self.by_slug.get(slug)
+
+    def get_by_id(self, metric_id: int) -> Optional[MetricRecord]:
+        """Definition by id"""
+        return self.by_id.get(metric_id)
+
+    def __len__(self) -> int:
+        return len(self.by_slug)
+
+
+# One registry per engine (tests use several in-memory databases)
+_registries: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _load(db: Session, version: int) -> MetricRegistry:
+    metrics = db.query(MetricDefinition).all()
+    return MetricRegistry((MetricRecord.from_model(m) for m in metrics), version)
+
+
+def get_metric_registry(db: Session, reload: bool = False) -> MetricRegistry:
+    """
+    Get the registry for the session's database.
+
+    Args:
+        db: SQLAlchemy session.
+        reload: Reload the definitions unconditionally (e.g. after a lookup
+            miss, for rows inserted without bumping the version).
+
+    Returns:
+        The current MetricRegistry.
+    """
+    bind = db.get_bind()
+    registry: Optional[MetricRegistry] = _registries.get(bind)
+    now = time.monotonic()
+
+    if registry is not None and not reload:
+        if now - registry.checked_at < settings.METRIC_REGISTRY_CHECK_SECONDS:
+            return registry
+        version = get_data_version(db, METRIC_DEFINITIONS_KEY)
+        if version == registry.version:
+            registry.checked_at = now
+            return registry
+    else:
+        version = get_data_version(db, METRIC_DEFINITIONS_KEY)
+
+    registry = _load(db, version)
+    with _lock:
+        _registries[bind] = registry
+    return registry
+
+
+def _reload_for_misses(db: Session, registry: MetricRegistry, missing: Set[Hashable]) -> MetricRegistry:
+    """Reload once for lookups not already known to be missing at this version"""
+    if missing <= registry.misses:
+        return registry
+    previous = registry
+    registry = get_metric_registry(db, reload=True)
+    if registry.version == previous.version:
+        # Earlier misses of this version are re-checked by the same reload
+        missing = missing | previous.misses
+    still_missing = {key for key in missing if key not in registry.by_slug and key not in registry.by_id}
+    with _lock:
+        if len(registry.misses) + len(still_missing) > MAX_REMEMBERED_MISSES:
+            registry.misses.clear()
+        registry.misses.update(still_missing)
+    return registry
+
+
+def get_metric_records(db: Session, slugs: Iterable[str]) -> Dict[str, MetricRecord]:
+    """
+    Resolve several slugs at once.
+
+    Unknown slugs trigger a single reload so that freshly inserted definitions
+    are picked up; slugs still unknown after that are left out (and do not
+    trigger another reload until the version stamp changes).
+    """
+    slugs = list(slugs)
+    registry = get_metric_registry(db)
+    missing = {slug for slug in slugs if slug not in registry.by_slug}
+    if missing:
+        registry = _reload_for_misses(db, registry, missing)
+    return {slug: registry.by_slug[slug] for slug in slugs if slug in registry.by_slug}
+
+
+def get_metric_record_by_id(db: Session, metric_id: int) -> Optional[MetricRecord]:
+    """Definition by id, with the same reload-on-miss rule as get_metric_records"""
+    registry = get_metric_registry(db)
+    record = registry.get_by_id(metric_id)
+    if record is None:
+        record = _reload_for_misses(db, registry, {metric_id}).get_by_id(metric_id)
+    return record
+
+
+def invalidate_metric_registry(db: Optional[Session] = None) -> None:
+    """
+    Drop cached registries.
+
+    Args:
+        db: When given, also bump the `metric_definitions` version stamp
+            (and commit) so that other workers reload on their next check.
+    """
+    with _lock:
+        _registries.clear()
+    if db is not None:
+        bump_data_version(db, METRIC_DEFINITIONS_KEY)
+        db.commit()
@@ -0,0 +1,268 @@
+"""
+Set-based writes for raw metric values.
+
+The bulk PUT endpoints receive whole grids (typically 20 players x 20 metrics
+per match). Instead of looking up the metric, the player and the existing row
+for every cell, a batch is:
+1. validated in memory against metric definitions (registry) and the set of
+   existing players, fetched once,
+2. compared against the existing keys of the match (one query) to report
+   created / updated counts,
+3. written with multi-row `INSERT ... ON CONFLICT DO UPDATE` statements
+   (PostgreSQL and SQLite share the same construct, see app.db.dialect).
+
+Season rollups (app.services.rollups) are updated from the same payloads, and
+the owning teams' data versions (app.services.team_versions) are bumped.
+
+Validation messages and the `{"created", "updated", "errors"}` report are the
+same as the historical row-by-row implementation. The caller commits.
+
+The validate_* / write_* halves are also used by the multi-match ingest
+(app.services.ingest), which validates match by match but writes whole chunks.
+"""
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.dialect import insert_for
+from app.models import MetricScope, MetricSide, Player, PlayerMatchMetricValue, TeamMatchMetricValue
+from app.schemas import PlayerMetricValueInput, TeamMetricValueInput
+from app.services.metric_registry import MetricRecord, get_metric_records
+from app.services.rollups import record_player_writes, record_team_writes
+from app.services.team_versions import bump_match_teams
+
+# Rows per INSERT statement (keeps bind parameters well below driver limits)
+UPSERT_CHUNK_SIZE = 1000
+
+
+def _chunks(rows: List[Dict], size: int = UPSERT_CHUNK_SIZE) -> Iterable[List[Dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+# -----------------------------------------------------------------------------
+# Validation (in memory)
+# -----------------------------------------------------------------------------
+
+def validate_team_values(
+    values: List[TeamMetricValueInput],
+    metrics: Mapping[str, MetricRecord],
+) -> Tuple[List[Tuple[Tuple[int, MetricSide], float]], List[str]]:
+    """
+    Validate team metric inputs.
+
+    Returns:
+        (rows, errors): valid ((metric_id, side), value) rows in payload order
+        (duplicates included) and error messages.
+    """
+    rows: List[Tuple[Tuple[int, MetricSide], float]] = []
+    errors: List[str] = []
+    for value_input in values:
+        metric = metrics.get(value_input.metric_slug)
+        if not metric:
+            errors.append(f"Metric {value_input.metric_slug} not found")
+            continue
+
+        # Validate not storing derived metrics
+        if metric.is_derived:
+            errors.append(f"Cannot store derived metric {value_input.metric_slug}")
+            continue
+
+        # Validate scope
+        if metric.scope != MetricScope.TEAM:
+            errors.append(f"Metric {value_input.metric_slug} is not a team metric")
+            continue
+
+        # Validate percentage range
+        if metric.datatype.value == "PERCENT" and not (0 <= value_input.value <= 100):
+            errors.append(f"Percentage value must be between 0 and 100")
+            continue
+
+        rows.append(((metric.id, value_input.side), value_input.value))
+    return rows, errors
+
+
+def validate_player_values(
+    values: List[PlayerMetricValueInput],
+    metrics: Mapping[str, MetricRecord],
+    known_players: Set[int],
+) -> Tuple[List[Tuple[Tuple[int, int], float]], List[str]]:
+    """
+    Validate player metric inputs.
+
+    Returns:
+        (rows, errors): valid ((player_id, metric_id), value) rows in payload
+        order (duplicates included) and error messages.
+    """
+    rows: List[Tuple[Tuple[int, int], float]] = []
+    errors: List[str] = []
+    for value_input in values:
+        metric = metrics.get(value_input.metric_slug)
+        if not metric:
+            errors.append(f"Metric {value_input.metric_slug} not found")
+            continue
+
+        # Validate not storing derived metrics
+        if metric.is_derived:
+            errors.append(f"Cannot store derived metric {value_input.metric_slug}")
+            continue
+
+        # Validate scope
+        if metric.scope != MetricScope.PLAYER:
+            errors.append(f"Metric {value_input.metric_slug} is not a player metric")
+            continue
+
+        # Verify player exists
+        if value_input.player_id not in known_players:
+            errors.append(f"Player {value_input.player_id} not found")
+            continue
+
+        # Validate percentage range
+        if metric.datatype.value == "PERCENT" and not (0 <= value_input.value <= 100):
+            errors.append(f"Percentage value must be between 0 and 100")
+            continue
+
+        rows.append(((value_input.player_id, metric.id), value_input.value))
+    return rows, errors
+
+
+def get_known_players(db: Session, player_ids: Set[int]) -> Set[int]:
+    """Subset of player ids that exist"""
+    if not player_ids:
+        return set()
+    return {pid for (pid,) in db.query(Player.id).filter(Player.id.in_(player_ids))}
+
+
+# -----------------------------------------------------------------------------
+# Writes (multi-row upserts)
+# -----------------------------------------------------------------------------
+
+def write_team_values(db: Session, payload: List[Dict]) -> None:
+    """
+    Upsert team metric rows (and their season rollups).
+
+    Args:
+        payload: dicts with match_id, metric_id, side, value_number; keys must
+            be unique within the payload.
+    """
+    record_team_writes(db, payload)
+    bump_match_teams(db, {row["match_id"] for row in payload})
+    table = TeamMatchMetricValue.__table__
+    for chunk in _chunks(payload):
+        stmt = insert_for(db, table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.match_id, table.c.metric_id, table.c.side],
+            set_={"value_number": stmt.excluded.value_number},
+        )
+        db.execute(stmt)
+
+
+def write_player_values(db: Session, payload: List[Dict]) -> None:
+    """
+    Upsert player metric rows (and their season rollups).
+
+    Args:
+        payload: dicts with match_id, player_id, metric_id, value_number; keys
+            must be unique within the payload.
+    """
+    record_player_writes(db, payload)
+    bump_match_teams(db, {row["match_id"] for row in payload})
+    table = PlayerMatchMetricValue.__table__
+    for chunk in _chunks(payload):
+        stmt = insert_for(db, table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.match_id, table.c.player_id, table.c.metric_id],
+            set_={"value_number": stmt.excluded.value_number},
+        )
+        db.execute(stmt)
+
+
+# -----------------------------------------------------------------------------
+# Single-match bulk endpoints
+# -----------------------------------------------------------------------------
+
+def upsert_team_metrics(
+    db: Session,
+    match_id: int,
+    values: List[TeamMetricValueInput],
+) -> Dict:
+    """
+    Validate and upsert a batch of team metric values for one match.
+
+    Args:
+        db: SQLAlchemy session.
+        match_id: Match identifier (must exist).
+        values: Team metric inputs, in payload order.
+
+    Returns:
+        {"created": int, "updated": int, "errors": [str]}
+    """
+    metrics = get_metric_records(db, {v.metric_slug for v in values})
+    valid, errors = validate_team_values(values, metrics)
+    results = {"created": 0, "updated": 0, "errors": errors}
+
+    existing = {
+        (mid, side)
+        for mid, side in db.query(
+            TeamMatchMetricValue.metric_id, TeamMatchMetricValue.side
+        ).filter(TeamMatchMetricValue.match_id == match_id)
+    }
+
+    # (metric_id, side) -> value, last occurrence wins
+    rows: Dict[Tuple[int, MetricSide], float] = {}
+    for key, value in valid:
+        if key in existing or key in rows:
+            results["updated"] += 1
+        else:
+            results["created"] += 1
+        rows[key] = value
+
+    write_team_values(db, [
+        {"match_id": match_id, "metric_id": mid, "side": side, "value_number": value}
+        for (mid, side), value in rows.items()
+    ])
+    return results
+
+
+def upsert_player_metrics(
+    db: Session,
+    match_id: int,
+    values: List[PlayerMetricValueInput],
+) -> Dict:
+    """
+    Validate and upsert a batch of player metric values for one match.
+
+    Args:
+        db: SQLAlchemy session.
+        match_id: Match identifier (must exist).
+        values: Player metric inputs, in payload order.
+
+    Returns:
+        {"created": int, "updated": int, "errors": [str]}
+    """
+    metrics = get_metric_records(db, {v.metric_slug for v in values})
+    known_players = get_known_players(db, {v.player_id for v in values})
+    valid, errors = validate_player_values(values, metrics, known_players)
+    results = {"created": 0, "updated": 0, "errors": errors}
+
+    existing = {
+        (pid, mid)
+        for pid, mid in db.query(
+            PlayerMatchMetricValue.player_id, PlayerMatchMetricValue.metric_id
+        ).filter(PlayerMatchMetricValue.match_id == match_id)
+    }
+
+    # (player_id, metric_id) -> value, last occurrence wins
+    rows: Dict[Tuple[int, int], float] = {}
+    for key, value in valid:
+        if key in existing or key in rows:
+            results["updated"] += 1
+        else:
+            results["created"] += 1
+        rows[key] = value
+
+    write_player_values(db, [
+        {"match_id": match_id, "player_id": pid, "metric_id": mid, "value_number": value}
+        for (pid, mid), value in rows.items()
+    ])
+    return results
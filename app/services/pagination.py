@@ -0,0 +1,132 @@
+"""
+Keyset (cursor) pagination and field projection for list endpoints.
+
+Pages are delimited by the sort key of the last row returned instead of an
+OFFSET, so each page costs an index range scan whatever its position. The
+sort key always ends with the primary key to be unique; the cursor is that
+key, JSON-encoded then base64url-encoded, and opaque to clients.
+
+List endpoints keep returning a JSON array; pagination metadata travels in
+headers:
+- `X-Next-Cursor`: cursor of the next page (absent on the last page),
+- `X-Total-Count`: number of rows matching the filters (only when requested
+  with `include_total=true`, as it costs a COUNT).
+"""
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class InvalidCursor(ValueError):
+    """Cursor that cannot be decoded for the requested sort key"""
+
+
+class InvalidFields(ValueError):
+    """Unknown names in a fields= projection"""
+
+
+class SortKey:
+    """
+    Sort key of a list endpoint: columns (all ascending or all descending)
+    and how each value is stored in the cursor.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[ColumnElement],
+        descending: bool = False,
+        decoders: Optional[Sequence[Callable[[Any], Any]]] = None,
+    ) -> None:
+        self.columns = list(columns)
+        self.descending = descending
+        self.decoders = list(decoders) if decoders else [lambda v: v] * len(self.columns)
+
+    @property
+    def names(self) -> List[str]:
+        return [c.key for c in self.columns]
+
+    def order_by(self) -> List[ColumnElement]:
+        return [c.desc() if self.descending else c.asc() for c in self.columns]
+
+    def after(self, values: Sequence[Any]) -> ColumnElement:
+        """Rows strictly after the given key in sort order (row-value comparison)"""
+        key, bound = tuple_(*self.columns), tuple_(*values)
+        return key < bound if self.descending else key > bound
+
+    def encode(self, row: Any) -> str:
+        values = [getattr(row, name) for name in self.names]
+        payload = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            return [decode(v) for decode, v in zip(self.decoders, values)]
+        except (ValueError, TypeError, binascii.Error, UnicodeError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Requested field names in schema order (None when no projection is asked)"""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in allowed if name in requested]
+
+
+def project(rows: Sequence[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Rows as dicts restricted to the requested fields"""
+    return [{name: getattr(row, name) for name in fields} for row in rows]
+
+
+def projection_columns(model: Any, fields: Sequence[str], sort_key: SortKey) -> List[ColumnElement]:
+    """Columns to select for a projection (requested fields + sort key)"""
+    names = list(fields) + [name for name in sort_key.names if name not in fields]
+    return [getattr(model, name) for name in names]
+
+
+def paginate(
+    query: Query,
+    sort_key: SortKey,
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> Tuple[List[Any], Dict[str, str]]:
+    """
+    Rows of one page and the pagination headers.
+
+    Without `limit` every row is returned (unchanged behaviour for existing
+    clients); `cursor` and `include_total` still apply.
+    """
+    headers: Dict[str, str] = {}
+    if include_total:
+        headers[TOTAL_COUNT_HEADER] = str(query.order_by(None).count())
+
+    if cursor:
+        query = query.filter(sort_key.after(sort_key.decode(cursor)))
+    query = query.order_by(*sort_key.order_by())
+
+    if limit is None:
+        return query.all(), headers
+
+    # One extra row tells whether there is a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = sort_key.encode(rows[-1])
+    return rows, headers
@@ -0,0 +1,105 @@
+"""
+In-process cache for analytics responses.
+
+Dashboards request the same KPIs / timeseries / radar / leaderboards with the
+same parameters over and over. Responses are cached as serialized JSON bytes
+under a key made of:
+- the endpoint and its normalized parameters,
+- the team data version (app.services.team_versions),
+- the metric definitions registry version.
+
+Any write to the team's data bumps its version, so stale entries are never
+served: they simply stop being requested and age out of the LRU. The same
+key gives a strong ETag, which lets browsers revalidate with
+`If-None-Match` and receive a 304 without the response being recomputed.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from app.config import settings
+
+
+class ResponseCache:
+    """Thread-safe LRU of response bodies bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key: str, body: bytes) -> int:
+        return len(key) + len(body)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached body (marks it as recently used), or None"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        """Store a body, evicting least recently used entries above max_bytes"""
+        size = self._entry_size(key, body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= self._entry_size(key, previous)
+            self._entries[key] = body
+            self._size += size
+            while self._size > self.max_bytes:
+                old_key, old_body = self._entries.popitem(last=False)
+                self._size -= self._entry_size(old_key, old_body)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def cache_key(endpoint: str, params: Mapping[str, Any], version: str) -> str:
+    """Deterministic key for an endpoint call at a given data version"""
+    normalized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{endpoint}?{normalized}@{version}"
+
+
+def etag_for(key: str) -> str:
+    """Strong ETag derived from a cache key"""
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches the ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+analytics_cache = ResponseCache(max_bytes=settings.ANALYTICS_CACHE_MAX_BYTES)
@@ -0,0 +1,441 @@
+"""
+Per-season metric rollups.
+
+Team KPIs and player leaderboards aggregate raw values over every match of a
+team (and season). Instead of summing `team_match_metric_values` and
+`player_match_metric_values` on each request, two rollup tables keep the
+running SUM and COUNT of raw values:
+- team_season_metric_rollups: (team, season, metric, side),
+- player_season_metric_rollups: (match team, season, player, metric).
+
+They are maintained incrementally, in the same transaction as the raw writes:
+- multi-row upserts (app.services.metric_writes) compute their deltas against
+  the existing rows right before writing (`record_team_writes` /
+  `record_player_writes`),
+- ORM writes (single rows, match deletion cascades, a match moved to another
+  team or season) are accounted for by a `before_flush` hook.
+
+Writes that bypass both (raw SQL, bulk `Query.delete()` on value tables)
+leave the rollups stale: `check_rollups` compares them with the raw tables
+and `rebuild_rollups` recomputes them (`python -m app.rollups check|rebuild`).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Query, Session
+
+from app.db.dialect import insert_for
+from app.models import (
+    Match,
+    MetricSide,
+    PlayerMatchMetricValue,
+    PlayerSeasonMetricRollup,
+    TeamMatchMetricValue,
+    TeamSeasonMetricRollup,
+)
+
+# Rows per INSERT statement
+ROLLUP_CHUNK_SIZE = 1000
+
+TEAM_KEY_COLUMNS = ("team_id", "season_id", "metric_id", "side")
+PLAYER_KEY_COLUMNS = ("team_id", "season_id", "player_id", "metric_id")
+
+# (team_id, season_id)
+MatchKey = Tuple[int, int]
+# rollup key -> [sum delta, count delta]
+Deltas = Dict[Tuple, List[float]]
+
+
+def _add(deltas: Deltas, key: Tuple, value: float, count: int) -> None:
+    entry = deltas.setdefault(key, [0.0, 0])
+    entry[0] += value
+    entry[1] += count
+
+
+def _match_keys(db: Session, match_ids: Iterable[int]) -> Dict[int, MatchKey]:
+    """(team_id, season_id) of matches, as currently known by the session"""
+    keys: Dict[int, MatchKey] = {}
+    missing = set()
+    for match_id in match_ids:
+        match = db.identity_map.get(inspect(Match).identity_key_from_primary_key((match_id,)))
+        if match is not None:
+            keys[match_id] = (match.team_id, match.season_id)
+        else:
+            missing.add(match_id)
+    if missing:
+        with db.no_autoflush:
+            for match_id, team_id, season_id in db.query(
+                Match.id, Match.team_id, Match.season_id
+            ).filter(Match.id.in_(missing)):
+                keys[match_id] = (team_id, season_id)
+    return keys
+
+
+def _apply(db: Session, model, key_columns: Tuple[str, ...], deltas: Deltas) -> None:
+    rows = [
+        {**dict(zip(key_columns, key)), "value_sum": value, "value_count": count}
+        for key, (value, count) in deltas.items()
+        if value or count
+    ]
+    if not rows:
+        return
+
+    table = model.__table__
+    for start in range(0, len(rows), ROLLUP_CHUNK_SIZE):
+        stmt = insert_for(db, table).values(rows[start:start + ROLLUP_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[c] for c in key_columns],
+            set_={
+                "value_sum": table.c.value_sum + stmt.excluded.value_sum,
+                "value_count": table.c.value_count + stmt.excluded.value_count,
+            },
+        )
+        db.execute(stmt)
+
+    # Rows emptied by deletions are dropped (they would block team / player deletion)
+    if any(count < 0 for _, count in deltas.values()):
+        db.execute(
+            delete(table).where(
+                table.c.value_count <= 0,
+                table.c.team_id.in_({key[0] for key in deltas}),
+            )
+        )
+
+
+def apply_team_deltas(db: Session, deltas: Deltas) -> None:
+    """Add deltas keyed by (team_id, season_id, metric_id, side)"""
+    _apply(db, TeamSeasonMetricRollup, TEAM_KEY_COLUMNS, deltas)
+
+
+def apply_player_deltas(db: Session, deltas: Deltas) -> None:
+    """Add deltas keyed by (team_id, season_id, player_id, metric_id)"""
+    _apply(db, PlayerSeasonMetricRollup, PLAYER_KEY_COLUMNS, deltas)
+
+
+# -----------------------------------------------------------------------------
+# Core writes (multi-row upserts)
+# -----------------------------------------------------------------------------
+
+def record_team_writes(db: Session, payload: List[Dict]) -> None:
+    """
+    Account for an upsert of team metric rows. Call before writing them.
+
+    Args:
+        payload: dicts with match_id, metric_id, side, value_number (unique keys).
+    """
+    if not payload:
+        return
+    match_ids = {row["match_id"] for row in payload}
+    existing = {
+        (match_id, metric_id, side): value
+        for match_id, metric_id, side, value in db.query(
+            TeamMatchMetricValue.match_id,
+            TeamMatchMetricValue.metric_id,
+            TeamMatchMetricValue.side,
+            TeamMatchMetricValue.value_number,
+        ).filter(
+            TeamMatchMetricValue.match_id.in_(match_ids),
+            TeamMatchMetricValue.metric_id.in_({row["metric_id"] for row in payload}),
+        )
+    }
+    matches = _match_keys(db, match_ids)
+
+    deltas: Deltas = {}
+    for row in payload:
+        team_id, season_id = matches[row["match_id"]]
+        key = (team_id, season_id, row["metric_id"], row["side"])
+        old = existing.get((row["match_id"], row["metric_id"], row["side"]))
+        if old is None:
+            _add(deltas, key, row["value_number"], 1)
+        else:
+            _add(deltas, key, row["value_number"] - old, 0)
+    apply_team_deltas(db, deltas)
+
+
+def record_player_writes(db: Session, payload: List[Dict]) -> None:
+    """
+    Account for an upsert of player metric rows. Call before writing them.
+
+    Args:
+        payload: dicts with match_id, player_id, metric_id, value_number (unique keys).
+    """
+    if not payload:
+        return
+    match_ids = {row["match_id"] for row in payload}
+    existing = {
+        (match_id, player_id, metric_id): value
+        for match_id, player_id, metric_id, value in db.query(
+            PlayerMatchMetricValue.match_id,
+            PlayerMatchMetricValue.player_id,
+            PlayerMatchMetricValue.metric_id,
+            PlayerMatchMetricValue.value_number,
+        ).filter(
+            PlayerMatchMetricValue.match_id.in_(match_ids),
+            PlayerMatchMetricValue.metric_id.in_({row["metric_id"] for row in payload}),
+        )
+    }
+    matches = _match_keys(db, match_ids)
+
+    deltas: Deltas = {}
+    for row in payload:
+        team_id, season_id = matches[row["match_id"]]
+        key = (team_id, season_id, row["player_id"], row["metric_id"])
+        old = existing.get((row["match_id"], row["player_id"], row["metric_id"]))
+        if old is None:
+            _add(deltas, key, row["value_number"], 1)
+        else:
+            _add(deltas, key, row["value_number"] - old, 0)
+    apply_player_deltas(db, deltas)
+
+
+# -----------------------------------------------------------------------------
+# ORM writes (before_flush hook)
+# -----------------------------------------------------------------------------
+
+def _previous(obj, attr: str):
+    """Value of an attribute before the pending changes"""
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+
+def _value_key(obj, match_key: MatchKey) -> Tuple:
+    if isinstance(obj, TeamMatchMetricValue):
+        return match_key + (obj.metric_id, obj.side)
+    return match_key + (obj.player_id, obj.metric_id)
+
+
+def _previous_value_key(obj, match_key: MatchKey) -> Tuple:
+    if isinstance(obj, TeamMatchMetricValue):
+        return match_key + (_previous(obj, "metric_id"), _previous(obj, "side"))
+    return match_key + (_previous(obj, "player_id"), _previous(obj, "metric_id"))
+
+
+def _move_match(db: Session, match_id: int, old: MatchKey, new: MatchKey,
+                team_deltas: Deltas, player_deltas: Deltas) -> None:
+    """Move the stored contributions of a match from one (team, season) to another"""
+    for metric_id, side, value, count in db.query(
+        TeamMatchMetricValue.metric_id,
+        TeamMatchMetricValue.side,
+        func.sum(TeamMatchMetricValue.value_number),
+        func.count(TeamMatchMetricValue.id),
+    ).filter(TeamMatchMetricValue.match_id == match_id).group_by(
+        TeamMatchMetricValue.metric_id, TeamMatchMetricValue.side
+    ):
+        _add(team_deltas, old + (metric_id, side), -value, -count)
+        _add(team_deltas, new + (metric_id, side), value, count)
+
+    for player_id, metric_id, value, count in db.query(
+        PlayerMatchMetricValue.player_id,
+        PlayerMatchMetricValue.metric_id,
+        func.sum(PlayerMatchMetricValue.value_number),
+        func.count(PlayerMatchMetricValue.id),
+    ).filter(PlayerMatchMetricValue.match_id == match_id).group_by(
+        PlayerMatchMetricValue.player_id, PlayerMatchMetricValue.metric_id
+    ):
+        _add(player_deltas, old + (player_id, metric_id), -value, -count)
+        _add(player_deltas, new + (player_id, metric_id), value, count)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_orm_writes(session: Session, flush_context, instances) -> None:
+    """Update rollups for value rows and matches changed through the ORM"""
+    moved = []
+    for obj in session.dirty:
+        if isinstance(obj, Match) and session.is_modified(obj):
+            old = (_previous(obj, "team_id"), _previous(obj, "season_id"))
+            if old != (obj.team_id, obj.season_id):
+                moved.append((obj.id, old, (obj.team_id, obj.season_id)))
+
+    values = [
+        (state, obj)
+        for state, objects in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted))
+        for obj in objects
+        if isinstance(obj, (TeamMatchMetricValue, PlayerMatchMetricValue))
+    ]
+    if not moved and not values:
+        return
+
+    team_deltas: Deltas = {}
+    player_deltas: Deltas = {}
+    with session.no_autoflush:
+        for match_id, old, new in moved:
+            _move_match(session, match_id, old, new, team_deltas, player_deltas)
+
+        match_ids = {obj.match_id for _, obj in values if obj.match_id is not None}
+        match_ids |= {_previous(obj, "match_id") for state, obj in values if state != "new"}
+        matches = _match_keys(session, match_ids - {None})
+
+        def match_key(match_id, obj) -> Optional[MatchKey]:
+            if match_id is not None:
+                return matches.get(match_id)
+            match = obj.match
+            return (match.team_id, match.season_id) if match is not None else None
+
+        for state, obj in values:
+            deltas = team_deltas if isinstance(obj, TeamMatchMetricValue) else player_deltas
+            if state == "dirty" and not session.is_modified(obj):
+                continue
+            if state in ("dirty", "deleted"):
+                key = match_key(_previous(obj, "match_id"), obj)
+                if key is not None:
+                    _add(deltas, _previous_value_key(obj, key), -_previous(obj, "value_number"), -1)
+            if state in ("new", "dirty"):
+                key = match_key(obj.match_id, obj)
+                if key is not None:
+                    _add(deltas, _value_key(obj, key), obj.value_number, 1)
+
+        apply_team_deltas(session, team_deltas)
+        apply_player_deltas(session, player_deltas)
+
+
+# -----------------------------------------------------------------------------
+# Reads
+# -----------------------------------------------------------------------------
+
+def team_rollup_totals(
+    db: Session,
+    team_id: int,
+    metric_ids: Iterable[int],
+    season_id: Optional[int] = None,
+) -> Dict[Tuple[int, MetricSide], Tuple[float, int]]:
+    """
+    SUM and COUNT of stored team values over all matches of a team (or season).
+
+    Returns:
+        (metric_id, side) -> (sum, count)
+    """
+    metric_ids = list(metric_ids)
+    if not metric_ids:
+        return {}
+    query = db.query(
+        TeamSeasonMetricRollup.metric_id,
+        TeamSeasonMetricRollup.side,
+        func.sum(TeamSeasonMetricRollup.value_sum),
+        func.sum(TeamSeasonMetricRollup.value_count),
+    ).filter(
+        TeamSeasonMetricRollup.team_id == team_id,
+        TeamSeasonMetricRollup.metric_id.in_(metric_ids),
+    )
+    if season_id:
+        query = query.filter(TeamSeasonMetricRollup.season_id == season_id)
+    rows = query.group_by(TeamSeasonMetricRollup.metric_id, TeamSeasonMetricRollup.side)
+    return {(metric_id, side): (float(total or 0.0), int(count or 0)) for metric_id, side, total, count in rows}
+
+
+def player_rollup_totals(
+    db: Session,
+    team_id: int,
+    metric_id: int,
+    season_id: Optional[int] = None,
+) -> Query:
+    """Query of (player_id, total) for one player metric over the matches of a team (or season)"""
+    query = db.query(
+        PlayerSeasonMetricRollup.player_id.label("player_id"),
+        func.sum(PlayerSeasonMetricRollup.value_sum).label("total"),
+    ).filter(
+        PlayerSeasonMetricRollup.team_id == team_id,
+        PlayerSeasonMetricRollup.metric_id == metric_id,
+    )
+    if season_id:
+        query = query.filter(PlayerSeasonMetricRollup.season_id == season_id)
+    return query.group_by(PlayerSeasonMetricRollup.player_id)
+
+
+# -----------------------------------------------------------------------------
+# Maintenance
+# -----------------------------------------------------------------------------
+
+def _team_source():
+    return select(
+        Match.team_id,
+        Match.season_id,
+        TeamMatchMetricValue.metric_id,
+        TeamMatchMetricValue.side,
+        func.sum(TeamMatchMetricValue.value_number),
+        func.count(TeamMatchMetricValue.id),
+    ).join(Match, TeamMatchMetricValue.match_id == Match.id).group_by(
+        Match.team_id, Match.season_id, TeamMatchMetricValue.metric_id, TeamMatchMetricValue.side
+    )
+
+
+def _player_source():
+    return select(
+        Match.team_id,
+        Match.season_id,
+        PlayerMatchMetricValue.player_id,
+        PlayerMatchMetricValue.metric_id,
+        func.sum(PlayerMatchMetricValue.value_number),
+        func.count(PlayerMatchMetricValue.id),
+    ).join(Match, PlayerMatchMetricValue.match_id == Match.id).group_by(
+        Match.team_id, Match.season_id, PlayerMatchMetricValue.player_id, PlayerMatchMetricValue.metric_id
+    )
+
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """
+    Recompute both rollup tables from the raw values (the caller commits).
+
+    Returns:
+        {"team": rows, "player": rows}
+    """
+    db.execute(delete(TeamSeasonMetricRollup.__table__))
+    db.execute(delete(PlayerSeasonMetricRollup.__table__))
+    db.execute(
+        insert(TeamSeasonMetricRollup.__table__).from_select(
+            list(TEAM_KEY_COLUMNS) + ["value_sum", "value_count"], _team_source()
+        )
+    )
+    db.execute(
+        insert(PlayerSeasonMetricRollup.__table__).from_select(
+            list(PLAYER_KEY_COLUMNS) + ["value_sum", "value_count"], _player_source()
+        )
+    )
+    return {
+        "team": db.query(func.count(TeamSeasonMetricRollup.id)).scalar(),
+        "player": db.query(func.count(PlayerSeasonMetricRollup.id)).scalar(),
+    }
+
+
+def _compare(label: str, expected: Dict, actual: Dict, tolerance: float) -> List[str]:
+    problems = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        exp_sum, exp_count = expected.get(key, (0.0, 0))
+        act_sum, act_count = actual.get(key, (0.0, 0))
+        if exp_count != act_count or abs(exp_sum - act_sum) > tolerance * max(1.0, abs(exp_sum)):
+            problems.append(
+                f"{label} {key}: expected sum={exp_sum} count={exp_count}, "
+                f"found sum={act_sum} count={act_count}"
+            )
+    return problems
+
+
+def check_rollups(db: Session, tolerance: float = 1e-6) -> List[str]:
+    """
+    Compare the rollup tables with the raw EAV tables.
+
+    Returns:
+        One message per mismatching key (empty when consistent).
+    """
+    def side_key(side):
+        return side.value if isinstance(side, MetricSide) else side
+
+    team_expected = {
+        (t, s, m, side_key(side)): (float(total), int(count))
+        for t, s, m, side, total, count in db.execute(_team_source())
+    }
+    team_actual = {
+        (r.team_id, r.season_id, r.metric_id, side_key(r.side)): (r.value_sum, r.value_count)
+        for r in db.query(TeamSeasonMetricRollup)
+    }
+    player_expected = {
+        (t, s, p, m): (float(total), int(count))
+        for t, s, p, m, total, count in db.execute(_player_source())
+    }
+    player_actual = {
+        (r.team_id, r.season_id, r.player_id, r.metric_id): (r.value_sum, r.value_count)
+        for r in db.query(PlayerSeasonMetricRollup)
+    }
+    return (
+        _compare("team", team_expected, team_actual, tolerance)
+        + _compare("player", player_expected, player_actual, tolerance)
+    )
@@ -0,0 +1,314 @@
+"""
+In-process columnar snapshot of a team's metric data.
+
+Dashboards hit the same team over and over with different metric / period
+combinations, which the response cache cannot share. When enabled
+(ANALYTICS_SNAPSHOT_TEAMS > 0), the first analytics call for a team loads
+all its matches, participations and metric values in a few queries and
+keeps them as arrays:
+- team values: one `array('d')` per (slug, side), aligned on the matches,
+- player values: one `array('d')` per slug, aligned on the stored
+  (player, match) pairs,
+with NaN for "no stored value". AnalyticsService then answers KPIs, radar,
+timeseries and leaderboards from these columns instead of SQL.
+
+Matches are kept in date order, so a period is a `bisect` slice of the
+dates, and each match keeps the offsets of its player rows and its
+participants: leaderboard totals only visit the rows of the matches in
+scope instead of scanning every stored (player, match) pair.
+
+Freshness relies on the version stamps used by the response cache: a
+snapshot is tagged with the team data version and the metric definitions
+version, and is reloaded (for that team only) as soon as either changes.
+Sessions with uncommitted writes for the team bypass the snapshot and read
+the database, so uncommitted data never ends up in the shared snapshot.
+"""
+import math
+import threading
+from bisect import bisect_left, bisect_right
+import weakref
+from array import array
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    Match,
+    MatchPlayerParticipation,
+    MetricSide,
+    Player,
+    PlayerMatchMetricValue,
+    TeamMatchMetricValue,
+)
+from app.services.metric_matrix import MetricMatrix
+from app.services.metric_registry import get_metric_registry
+from app.services.team_versions import get_team_version, team_written_in_transaction
+
+NAN = float("nan")
+
+Period = Tuple[Optional[date], Optional[date]]
+
+
+def _cell(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class TeamSnapshot:
+    """Column arrays of one team's matches and metric values."""
+
+    def __init__(
+        self,
+        team_id: int,
+        version: Tuple[int, int],
+        matches: Sequence[Tuple[int, date, Optional[int], str]],
+        team_values: Iterable[Tuple[int, str, MetricSide, float]],
+        players: Iterable[Tuple[int, str, str]],
+        participations: Iterable[Tuple[int, int]],
+        player_values: Iterable[Tuple[int, int, str, float]],
+    ) -> None:
+        self.team_id = team_id
+        self.version = version
+
+        # Matches in chronological order (date, id)
+        matches = sorted(matches, key=lambda m: (m[1], m[0]))
+        self.match_ids = array("q", (m[0] for m in matches))
+        self.match_dates: List[date] = [m[1] for m in matches]
+        self.season_ids: List[Optional[int]] = [m[2] for m in matches]
+        self.opponents: List[str] = [m[3] for m in matches]
+        self._match_index: Dict[int, int] = {mid: i for i, mid in enumerate(self.match_ids)}
+
+        self.team_columns: Dict[Tuple[str, MetricSide], array] = {}
+        for match_id, slug, side, value in team_values:
+            column = self.team_columns.get((slug, side))
+            if column is None:
+                column = self.team_columns[(slug, side)] = array("d", [NAN]) * len(self.match_ids)
+            column[self._match_index[match_id]] = value
+
+        self.player_names: Dict[int, Tuple[str, str]] = {
+            player_id: (first_name, last_name) for player_id, first_name, last_name in players
+        }
+        # match position -> ids of the players who took part in it
+        self._match_players: List[array] = [array("q") for _ in self.match_ids]
+        for player_id, match_id in participations:
+            self._match_players[self._match_index[match_id]].append(player_id)
+
+        player_values = list(player_values)
+        self.player_rows: List[Tuple[int, int]] = sorted({(p, m) for p, m, _, _ in player_values})
+        row_index = {key: i for i, key in enumerate(self.player_rows)}
+        self.player_columns: Dict[str, array] = {}
+        for player_id, match_id, slug, value in player_values:
+            column = self.player_columns.get(slug)
+            if column is None:
+                column = self.player_columns[slug] = array("d", [NAN]) * len(self.player_rows)
+            column[row_index[(player_id, match_id)]] = value
+        # match position -> offsets of its rows in player_rows (ascending, i.e. by player)
+        self._match_rows: List[array] = [array("q") for _ in self.match_ids]
+        for i, (_, match_id) in enumerate(self.player_rows):
+            self._match_rows[self._match_index[match_id]].append(i)
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def _positions(self, match_ids: Iterable[int]) -> List[int]:
+        """Chronological positions of the given (known) matches"""
+        return sorted({self._match_index[mid] for mid in match_ids if mid in self._match_index})
+
+    def period_match_ids(self, periods: Sequence[Period], season_id: Optional[int] = None) -> List[List[int]]:
+        """Match ids in each period (same semantics as the SQL filters)"""
+        buckets: List[List[int]] = []
+        for date_from, date_to in periods:
+            start = 0 if date_from is None else bisect_left(self.match_dates, date_from)
+            stop = len(self.match_dates) if date_to is None else bisect_right(self.match_dates, date_to)
+            buckets.append(sorted(
+                self.match_ids[i] for i in range(start, stop)
+                if not season_id or self.season_ids[i] == season_id
+            ))
+        return buckets
+
+    def last_matches(self, last_n: int) -> List[Tuple[int, date, str]]:
+        """(id, date, opponent) of the last N matches, chronological"""
+        start = max(len(self.match_ids) - last_n, 0)
+        return [
+            (self.match_ids[i], self.match_dates[i], self.opponents[i])
+            for i in range(start, len(self.match_ids))
+        ]
+
+    def team_matrix(self, match_ids: Sequence[int], keys: Iterable[Tuple[str, MetricSide]]) -> MetricMatrix:
+        """MetricMatrix of the given matches, as `_load_team_matrix` would return it"""
+        matrix = MetricMatrix(match_ids)
+        positions = [self._match_index.get(mid) for mid in matrix.row_keys]
+        for key in keys:
+            column = self.team_columns.get(key)
+            if column is None:
+                continue
+            cells = [None if i is None else _cell(column[i]) for i in positions]
+            if any(v is not None for v in cells):
+                matrix.columns[key] = cells
+        return matrix
+
+    def player_matrix(
+        self,
+        match_ids: Iterable[int],
+        keys: Iterable[Tuple[str, MetricSide]],
+        player_ids: Iterable[int],
+    ) -> MetricMatrix:
+        """(player, match) rows with at least one stored value among `keys`"""
+        player_ids = set(player_ids)
+        slugs = {slug: (slug, side) for slug, side in keys}
+        columns = {slug: self.player_columns[slug] for slug in slugs if slug in self.player_columns}
+
+        # Sorted offsets keep the (player, match) order of player_rows
+        positions = sorted(
+            i for position in self._positions(match_ids) for i in self._match_rows[position]
+            if self.player_rows[i][0] in player_ids
+            and any(not math.isnan(column[i]) for column in columns.values())
+        )
+        matrix = MetricMatrix([self.player_rows[i] for i in positions])
+        for slug, column in columns.items():
+            matrix.columns[slugs[slug]] = [_cell(column[i]) for i in positions]
+        return matrix
+
+    def matches_played(self, match_ids: Iterable[int]) -> Dict[int, int]:
+        """Participations per player over the given matches (players with none are left out)"""
+        played: Dict[int, int] = {}
+        for position in self._positions(match_ids):
+            for player_id in self._match_players[position]:
+                played[player_id] = played.get(player_id, 0) + 1
+        return dict(sorted(played.items()))
+
+    def player_totals(self, slug: str, match_ids: Iterable[int]) -> Dict[int, float]:
+        """SUM of stored values per player over the given matches"""
+        column = self.player_columns.get(slug)
+        if column is None:
+            return {}
+        totals: Dict[int, float] = {}
+        for position in self._positions(match_ids):
+            for i in self._match_rows[position]:
+                value = column[i]
+                if not math.isnan(value):
+                    player_id = self.player_rows[i][0]
+                    totals[player_id] = totals.get(player_id, 0.0) + value
+        return totals
+
+
+def _current_version(db: Session, team_id: int) -> Tuple[int, int]:
+    return get_team_version(db, team_id), get_metric_registry(db).version
+
+
+def load_team_snapshot(db: Session, team_id: int, version: Optional[Tuple[int, int]] = None) -> TeamSnapshot:
+    """Read a team's data in five queries"""
+    if version is None:
+        version = _current_version(db, team_id)
+    registry = get_metric_registry(db)
+    matches = db.query(Match.id, Match.date, Match.season_id, Match.opponent_name).filter(
+        Match.team_id == team_id
+    ).all()
+    team_values = db.query(
+        TeamMatchMetricValue.match_id,
+        TeamMatchMetricValue.metric_id,
+        TeamMatchMetricValue.side,
+        TeamMatchMetricValue.value_number,
+    ).join(Match, TeamMatchMetricValue.match_id == Match.id).filter(Match.team_id == team_id).all()
+    players = db.query(Player.id, Player.first_name, Player.last_name).filter(Player.team_id == team_id).all()
+    participations = db.query(
+        MatchPlayerParticipation.player_id, MatchPlayerParticipation.match_id
+    ).join(Match, MatchPlayerParticipation.match_id == Match.id).filter(Match.team_id == team_id).all()
+    player_values = db.query(
+        PlayerMatchMetricValue.player_id,
+        PlayerMatchMetricValue.match_id,
+        PlayerMatchMetricValue.metric_id,
+        PlayerMatchMetricValue.value_number,
+    ).join(Match, PlayerMatchMetricValue.match_id == Match.id).filter(Match.team_id == team_id).all()
+
+    def slug(metric_id: int) -> Optional[str]:
+        record = registry.get_by_id(metric_id)
+        return record.slug if record else None
+
+    return TeamSnapshot(
+        team_id,
+        version,
+        matches,
+        ((m, slug(metric_id), side, v) for m, metric_id, side, v in team_values
+         if v is not None and slug(metric_id)),
+        players,
+        participations,
+        ((p, m, slug(metric_id), v) for p, m, metric_id, v in player_values
+         if v is not None and slug(metric_id)),
+    )
+
+
+class SnapshotStore:
+    """LRU of team snapshots for one database"""
+
+    def __init__(self, max_teams: int) -> None:
+        self.max_teams = max_teams
+        self._snapshots: "OrderedDict[int, TeamSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, team_id: int, version: Tuple[int, int]) -> Optional[TeamSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(team_id)
+            if snapshot is None or snapshot.version != version:
+                return None
+            self._snapshots.move_to_end(team_id)
+            return snapshot
+
+    def put(self, snapshot: TeamSnapshot) -> None:
+        with self._lock:
+            self._snapshots[snapshot.team_id] = snapshot
+            self._snapshots.move_to_end(snapshot.team_id)
+            self.loads += 1
+            while len(self._snapshots) > self.max_teams:
+                self._snapshots.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+# One store per engine, like the metric registry
+_stores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_stores_lock = threading.Lock()
+
+
+def _store(db: Session) -> SnapshotStore:
+    bind = db.get_bind()
+    with _stores_lock:
+        store = _stores.get(bind)
+        if store is None or store.max_teams != settings.ANALYTICS_SNAPSHOT_TEAMS:
+            store = _stores[bind] = SnapshotStore(settings.ANALYTICS_SNAPSHOT_TEAMS)
+        return store
+
+
+def get_team_snapshot(db: Session, team_id: int) -> Optional[TeamSnapshot]:
+    """
+    Current snapshot of a team, loaded on first use.
+
+    None when snapshots are disabled or when the session holds uncommitted
+    writes for the team: callers then query the database.
+    """
+    if settings.ANALYTICS_SNAPSHOT_TEAMS <= 0:
+        return None
+    if db.new or db.dirty or db.deleted or team_written_in_transaction(db, team_id):
+        return None
+
+    # Version read before the data: a write committed in between only makes
+    # the snapshot look older than it is, and it is reloaded on next use.
+    version = _current_version(db, team_id)
+    store = _store(db)
+    snapshot = store.get(team_id, version)
+    if snapshot is None:
+        snapshot = load_team_snapshot(db, team_id, version)
+        store.put(snapshot)
+    return snapshot
+
+
+def clear_team_snapshots() -> None:
+    """Drop every snapshot (tests, maintenance)"""
+    with _stores_lock:
+        for store in _stores.values():
+            store.clear()
@@ -0,0 +1,111 @@
+"""
+Per-team data version stamps.
+
+Analytics responses only depend on the matches, participations, players and
+metric values of one team. Each team gets a `data_versions` row
+(`team:<id>`) that is bumped in the same transaction as any write touching
+that team, so that cached responses (app.services.response_cache) can be
+validated with a single primary-key lookup.
+
+Bumps come from:
+- a `before_flush` hook for ORM writes (matches, players, participations,
+  metric values, including cascaded deletions),
+- explicit calls for Core / bulk statements (metric upserts, participation
+  replacement, bulk ingest).
+
+Each team is bumped at most once per transaction.
+"""
+from typing import Iterable, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Match,
+    MatchPlayerParticipation,
+    Player,
+    PlayerMatchMetricValue,
+    TeamMatchMetricValue,
+)
+from app.services.data_versions import bump_data_version, get_data_version
+
+# session.info key: teams already bumped in the current transaction
+_BUMPED = "bumped_team_versions"
+
+
+def team_version_key(team_id: int) -> str:
+    """data_versions key of a team"""
+    return f"team:{team_id}"
+
+
+def get_team_version(db: Session, team_id: int) -> int:
+    """Current data version of a team"""
+    return get_data_version(db, team_version_key(team_id))
+
+
+def team_written_in_transaction(db: Session, team_id: int) -> bool:
+    """Whether the session's current transaction already bumped the team"""
+    return team_id in db.info.get(_BUMPED, ())
+
+
+def teams_written_in_transaction(db: Session) -> Set[int]:
+    """Teams bumped by the session's current transaction"""
+    return set(db.info.get(_BUMPED, ()))
+
+
+def bump_team_versions(db: Session, team_ids: Iterable[int]) -> None:
+    """Bump the version of each team (once per transaction; the caller commits)"""
+    bumped: Set[int] = db.info.setdefault(_BUMPED, set())
+    # Sorted to take row locks in a stable order across concurrent writers
+    for team_id in sorted({t for t in team_ids if t is not None} - bumped):
+        bump_data_version(db, team_version_key(team_id))
+        bumped.add(team_id)
+
+
+def bump_match_teams(db: Session, match_ids: Iterable[int]) -> None:
+    """Bump the teams owning the given matches"""
+    match_ids = set(match_ids)
+    if not match_ids:
+        return
+    with db.no_autoflush:
+        team_ids = {team_id for (team_id,) in db.query(Match.team_id).filter(Match.id.in_(match_ids)).distinct()}
+    bump_team_versions(db, team_ids)
+
+
+def _previous(obj, attr: str):
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_team_writes(session: Session, flush_context, instances) -> None:
+    """Bump the teams touched by ORM writes"""
+    team_ids: Set[int] = set()
+    match_ids: Set[int] = set()
+    changed = [("new", obj) for obj in session.new]
+    changed += [("dirty", obj) for obj in session.dirty if session.is_modified(obj)]
+    changed += [("deleted", obj) for obj in session.deleted]
+
+    for state, obj in changed:
+        if isinstance(obj, (Match, Player)):
+            team_ids.add(obj.team_id)
+            if state != "new":
+                team_ids.add(_previous(obj, "team_id"))
+        elif isinstance(obj, (MatchPlayerParticipation, TeamMatchMetricValue, PlayerMatchMetricValue)):
+            if obj.match_id is not None:
+                match_ids.add(obj.match_id)
+            elif obj.match is not None:
+                team_ids.add(obj.match.team_id)
+            if state != "new":
+                match_ids.add(_previous(obj, "match_id"))
+
+    if team_ids:
+        bump_team_versions(session, team_ids)
+    if match_ids:
+        bump_match_teams(session, match_ids - {None})
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_bumped(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_BUMPED, None)
@@ -0,0 +1,187 @@
+"""
+Wide match-level team metrics (PostgreSQL materialized view).
+
+`team_match_metric_values` stores one row per match / metric / side, so every
+analytic read pivots it. The `team_match_metrics_wide` materialized view
+(migration d5a2b9e4c107) holds one row per match and one column per raw team
+metric and side, named by `wide_column_name()`; KPIs and timeseries then read
+a few columns of a few rows.
+
+The view is rebuilt / refreshed by the `refresh_team_match_metrics_wide()`
+SQL function:
+- after each commit that bumped a team version (ANALYTICS_USE_WIDE_VIEW), in
+  a background thread that coalesces bursts of writes into one refresh,
+- on demand with `python -m app.wide_metrics refresh`.
+
+Each row carries the team data version seen by the refresh: reads for a team
+whose version moved since then fall back to the EAV table, so a lagging
+refresh never yields stale analytics.
+"""
+import logging
+import threading
+import weakref
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import column, event, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.dialect import dialect_name
+from app.models import MetricSide
+from app.services.metric_matrix import MetricMatrix
+from app.services.team_versions import get_team_version, teams_written_in_transaction
+
+logger = logging.getLogger(__name__)
+
+WIDE_VIEW = "team_match_metrics_wide"
+
+# PostgreSQL identifier length limit (longer columns are not materialized)
+MAX_COLUMN_LENGTH = 63
+
+
+def wide_column_name(slug: str, side: MetricSide) -> str:
+    """View column of a raw team metric side (as named by the SQL function)"""
+    return f"{slug}__{side.value.lower()}"
+
+
+def wide_view_enabled(db: Session) -> bool:
+    """Whether reads / refreshes should use the wide view for this session"""
+    return settings.ANALYTICS_USE_WIDE_VIEW and dialect_name(db) == "postgresql"
+
+
+# engine -> (view signature, column names)
+_columns: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def wide_view_columns(db: Session) -> Optional[FrozenSet[str]]:
+    """Columns of the view (None when it does not exist), re-read when it is rebuilt"""
+    signature = db.execute(
+        text("SELECT obj_description(to_regclass(:view), 'pg_class')"), {"view": WIDE_VIEW}
+    ).scalar()
+    if signature is None:
+        return None
+
+    bind = db.get_bind()
+    cached = _columns.get(bind)
+    if cached is None or cached[0] != signature:
+        names = db.execute(
+            text(
+                "SELECT attname FROM pg_attribute "
+                "WHERE attrelid = to_regclass(:view) AND attnum > 0 AND NOT attisdropped"
+            ),
+            {"view": WIDE_VIEW},
+        ).scalars()
+        cached = _columns[bind] = (signature, frozenset(names))
+    return cached[1]
+
+
+def load_wide_team_matrix(
+    db: Session,
+    team_id: int,
+    match_ids: List[int],
+    keys: Iterable[Tuple[str, MetricSide]],
+) -> Optional[MetricMatrix]:
+    """
+    MetricMatrix of the given matches read from the wide view.
+
+    None when the view cannot answer (disabled, not PostgreSQL, missing
+    columns, rows older than the team's data version): callers then read the
+    EAV table.
+    """
+    keys = list(keys)
+    if not match_ids or not keys or not wide_view_enabled(db):
+        return None
+
+    available = wide_view_columns(db)
+    names = {key: wide_column_name(*key) for key in keys}
+    if available is None or not set(names.values()) <= available:
+        return None
+
+    view = table(WIDE_VIEW, column("match_id"), column("team_id"), column("team_version"),
+                 *(column(name) for name in names.values()))
+    rows = db.execute(
+        select(view.c.match_id, view.c.team_version, *(view.c[name] for name in names.values()))
+        .where(view.c.team_id == team_id, view.c.match_id.in_(match_ids))
+    ).all()
+
+    version = get_team_version(db, team_id)
+    if len(rows) != len(set(match_ids)) or any(row.team_version != version for row in rows):
+        return None
+
+    matrix = MetricMatrix(match_ids)
+    for row in rows:
+        for i, key in enumerate(names):
+            value = row[2 + i]
+            if value is not None:
+                matrix.set(row.match_id, key, value)
+    return matrix
+
+
+def refresh_wide_view(db: Session) -> None:
+    """Rebuild or refresh the view (the caller commits)"""
+    db.execute(text("SELECT refresh_team_match_metrics_wide()"))
+
+
+class WideViewRefresher:
+    """
+    Runs refreshes of one engine in a background thread.
+
+    Requests made while a refresh runs are coalesced into a single follow-up
+    refresh, so a burst of writes costs at most two refreshes.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self._engine = weakref.ref(engine)
+        self._lock = threading.Lock()
+        self._running = False
+        self._pending = False
+
+    def request(self) -> None:
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="wide-view-refresh", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            engine = self._engine()
+            if engine is not None:
+                try:
+                    with Session(bind=engine) as db:
+                        refresh_wide_view(db)
+                        db.commit()
+                except Exception:
+                    logger.exception("%s refresh failed", WIDE_VIEW)
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+
+
+_refreshers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_refreshers_lock = threading.Lock()
+
+
+def request_wide_view_refresh(engine: Engine) -> None:
+    """Schedule a background refresh for an engine"""
+    with _refreshers_lock:
+        refresher = _refreshers.get(engine)
+        if refresher is None:
+            refresher = _refreshers[engine] = WideViewRefresher(engine)
+    refresher.request()
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_after_team_writes(session: Session) -> None:
+    """Refresh the view after commits that changed team data"""
+    if not teams_written_in_transaction(session) or not wide_view_enabled(session):
+        return
+    engine = session.get_bind()
+    # Async sessions write through their own driver; the thread needs a sync engine
+    if engine.dialect.is_async:
+        return
+    request_wide_view_refresh(engine)
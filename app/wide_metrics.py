@@ -0,0 +1,29 @@
+"""
+Wide metrics view maintenance CLI
+Run with: python -m app.wide_metrics refresh
+"""
+import argparse
+
+from app.db.dialect import dialect_name
+from app.db.session import SessionLocal
+from app.services.wide_metrics import WIDE_VIEW, refresh_wide_view
+
+def main():
+    """Main wide metrics view maintenance function"""
+    parser = argparse.ArgumentParser(description="Rebuild or refresh the team_match_metrics_wide view")
+    parser.add_argument("command", choices=["refresh"])
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if dialect_name(db) != "postgresql":
+            print(f"✗ {WIDE_VIEW} is only available on PostgreSQL")
+            raise SystemExit(1)
+        refresh_wide_view(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✓ Refreshed {WIDE_VIEW}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Benchmark suite.
+
+- benchmarks.dataset: synthetic multi-season datasets built from the
+  app.seed metric definitions,
+- benchmarks.run: times the API endpoints against such a dataset and
+  compares the results with a stored baseline.
+
+Run with: python -m benchmarks.run [--postgres-url URL] [--check]
+"""
@@ -0,0 +1,179 @@
+"""
+Synthetic dataset generator.
+
+Builds teams x seasons x matches x players with a random value for every
+raw metric of app.seed. Matches, participations and metric values go
+through the bulk ingest service (app.services.ingest), so season rollups
+and team data versions are maintained exactly as in production.
+
+Values are drawn from a seeded RNG: the same DatasetSpec always produces the
+same dataset, which keeps query counts comparable between runs.
+"""
+import contextlib
+import io
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from app.models import MetricDataType, MetricSide, Player, Season, Team
+from app.schemas.core import MatchCreate, ParticipationBase, PlayerMetricValueInput, TeamMetricValueInput
+from app.schemas.ingest import MatchIngestRecord
+from app.seed import PLAYER_METRICS, TEAM_METRICS, seed_metrics
+from app.services.ingest import ParsedRecord, ingest_records
+
+POSITIONS = ["GK", "DEF", "DEF", "DEF", "DEF", "MID", "MID", "MID", "FWD", "FWD", "FWD"]
+
+# Players fielded per match (starters + substitutes)
+STARTERS = 11
+SUBSTITUTES = 3
+
+
+class DatasetSpec:
+    """Size of a synthetic dataset"""
+
+    def __init__(
+        self,
+        teams: int = 2,
+        seasons: int = 2,
+        matches_per_season: int = 30,
+        players_per_team: int = 22,
+        seed: int = 42,
+    ) -> None:
+        self.teams = teams
+        self.seasons = seasons
+        self.matches_per_season = matches_per_season
+        self.players_per_team = players_per_team
+        self.seed = seed
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "teams": self.teams,
+            "seasons": self.seasons,
+            "matches_per_season": self.matches_per_season,
+            "players_per_team": self.players_per_team,
+            "seed": self.seed,
+        }
+
+
+class Dataset:
+    """Ids of the generated rows"""
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.spec = spec
+        self.team_ids: List[int] = []
+        self.season_ids: List[int] = []
+        self.season_ranges: Dict[int, tuple] = {}
+        self.player_ids: Dict[int, List[int]] = {}
+        self.rows = 0
+
+
+def random_value(rng: random.Random, metric: Dict) -> float:
+    if metric["datatype"] == MetricDataType.PERCENT:
+        return round(rng.uniform(0, 100), 1)
+    if metric["datatype"] == MetricDataType.FLOAT:
+        return round(rng.uniform(0, 20), 2)
+    return float(rng.randint(0, 15))
+
+
+def match_records(
+    rng: random.Random,
+    team_id: int,
+    season_id: int,
+    first_date: date,
+    count: int,
+    player_ids: List[int],
+    opponent_prefix: str = "Opponent",
+) -> Iterator[MatchIngestRecord]:
+    """Ingest records of `count` weekly matches with participations and every raw metric"""
+    team_metrics = [m for m in TEAM_METRICS if not m["is_derived"]]
+    player_metrics = [m for m in PLAYER_METRICS if not m["is_derived"]]
+    for i in range(count):
+        squad = rng.sample(player_ids, min(len(player_ids), STARTERS + SUBSTITUTES))
+        starters = set(squad[:STARTERS])
+        participations = [
+            ParticipationBase(
+                player_id=player_id,
+                is_starter=player_id in starters,
+                is_captain=player_id == squad[0],
+                minutes_played=90 if player_id in starters else rng.randint(5, 45),
+            )
+            for player_id in squad
+        ]
+        yield MatchIngestRecord(
+            match=MatchCreate(
+                team_id=team_id,
+                season_id=season_id,
+                date=first_date + timedelta(days=7 * i),
+                opponent_name=f"{opponent_prefix} {i + 1}",
+                is_home=i % 2 == 0,
+                score_for=rng.randint(0, 4),
+                score_against=rng.randint(0, 3),
+            ),
+            participations=participations,
+            team_metrics=[
+                TeamMetricValueInput(
+                    metric_slug=m["slug"],
+                    side=MetricSide.OWN if m["side"] == MetricSide.NONE else m["side"],
+                    value=random_value(rng, m),
+                )
+                for m in team_metrics
+            ],
+            player_metrics=[
+                PlayerMetricValueInput(player_id=player_id, metric_slug=m["slug"], value=random_value(rng, m))
+                for player_id in squad
+                for m in player_metrics
+            ],
+        )
+
+
+def generate_dataset(db: Session, spec: DatasetSpec) -> Dataset:
+    """Seed metric definitions and write a synthetic dataset (empty database expected)"""
+    rng = random.Random(spec.seed)
+    dataset = Dataset(spec)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_metrics(db)
+
+    first_year = 2024 - spec.seasons + 1
+    seasons = [
+        Season(label=f"{year}-{year + 1}", start_date=date(year, 8, 1), end_date=date(year + 1, 6, 30))
+        for year in range(first_year, first_year + spec.seasons)
+    ]
+    teams = [Team(name=f"Bench Team {i + 1}") for i in range(spec.teams)]
+    db.add_all(seasons + teams)
+    db.flush()
+
+    players = []
+    for team in teams:
+        players += [
+            Player(team_id=team.id, first_name=f"Player{n + 1}", last_name=f"T{team.id}",
+                   main_position=POSITIONS[n % len(POSITIONS)])
+            for n in range(spec.players_per_team)
+        ]
+    db.add_all(players)
+    db.commit()
+
+    dataset.team_ids = [t.id for t in teams]
+    dataset.season_ids = [s.id for s in seasons]
+    dataset.season_ranges = {s.id: (s.start_date, s.end_date) for s in seasons}
+    for player in players:
+        dataset.player_ids.setdefault(player.team_id, []).append(player.id)
+
+    def records() -> Iterator[ParsedRecord]:
+        line = 0
+        for team_id in dataset.team_ids:
+            for season in seasons:
+                # First match on the first Saturday of the season
+                first_date = season.start_date + timedelta(days=(5 - season.start_date.weekday()) % 7)
+                for record in match_records(rng, team_id, season.id, first_date, spec.matches_per_season,
+                                            dataset.player_ids[team_id]):
+                    line += 1
+                    yield line, record
+
+    report = ingest_records(db, records())
+    if report.failed:
+        raise RuntimeError(f"Dataset generation failed: {report.errors[:3]}")
+    dataset.rows = report.rows.participations + report.rows.team_metrics + report.rows.player_metrics
+    return dataset
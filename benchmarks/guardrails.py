@@ -0,0 +1,136 @@
+"""
+Metric value guardrail benchmark (PostgreSQL only)
+Run with: python -m benchmarks.guardrails --postgres-url URL [--cells 400]
+
+Times a grid write (write_player_values: one multi-row upsert of `--cells`
+values) with the per-row guardrail triggers, then with the statement-level
+ones of migration a9d3e7c51f28, both for fresh inserts and for updates of
+existing values (ON CONFLICT DO UPDATE). Each timed write is rolled back.
+
+The tables of the target database are DROPPED and recreated: use a
+dedicated database.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import math
+import os
+import statistics
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models import Match, MetricDefinition, MetricScope, Player, Season, Team
+from app.seed import seed_metrics
+from app.services.metric_writes import write_player_values
+
+MIGRATION_PATH = (
+    Path(__file__).resolve().parent.parent / "alembic" / "versions" / "a9d3e7c51f28_set_based_metric_value_guardrails.py"
+)
+
+
+def load_migration():
+    """Guardrail SQL of the migration module"""
+    spec = importlib.util.spec_from_file_location("set_based_guardrails", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def install(db, migration, variant: str) -> None:
+    db.execute(text(migration.DROP_SET_BASED))
+    db.execute(text(migration.DROP_ROW_BASED))
+    if variant == "row":
+        db.execute(text(migration.ROW_FUNCTIONS))
+        db.execute(text(migration.ROW_TRIGGERS))
+    else:
+        db.execute(text(migration.SET_BASED_FUNCTION))
+        db.execute(text(migration.SET_BASED_TRIGGERS))
+    db.commit()
+
+
+def time_writes(db, payload, iterations: int, existing: bool) -> float:
+    """Median ms of one grid write"""
+    if existing:
+        write_player_values(db, payload)
+        db.commit()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        write_player_values(db, payload)
+        db.flush()
+        timings.append((time.perf_counter() - started) * 1000)
+        db.rollback()
+    if existing:
+        db.execute(text("DELETE FROM player_match_metric_values"))
+        db.execute(text("DELETE FROM player_season_metric_rollups"))
+        db.commit()
+    return statistics.median(timings)
+
+
+def main():
+    """Main guardrail benchmark function"""
+    parser = argparse.ArgumentParser(description="Per-row vs statement-level guardrail triggers")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"),
+                        help="Dedicated PostgreSQL database (tables are dropped)")
+    parser.add_argument("--cells", type=int, default=400, help="Values per grid write")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    if not args.postgres_url or make_url(args.postgres_url).get_backend_name() != "postgresql":
+        parser.error("--postgres-url (or BENCH_POSTGRES_URL) must be a PostgreSQL URL")
+
+    engine = create_engine(args.postgres_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    migration = load_migration()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_metrics(db)
+        metric_ids = [
+            m.id for m in db.query(MetricDefinition).filter(
+                MetricDefinition.scope == MetricScope.PLAYER, MetricDefinition.is_derived.is_(False)
+            ).order_by(MetricDefinition.id)
+        ]
+        team, season = Team(name="Guardrail Team"), Season(label="bench", start_date="2024-08-01",
+                                                           end_date="2025-06-30")
+        db.add_all([team, season])
+        db.flush()
+        match = Match(team_id=team.id, season_id=season.id, date="2024-09-01", opponent_name="Bench")
+        players = [
+            Player(team_id=team.id, first_name=f"P{i}", last_name="Bench", main_position="MID")
+            for i in range(math.ceil(args.cells / len(metric_ids)))
+        ]
+        db.add_all([match] + players)
+        db.commit()
+
+        payload = [
+            {"match_id": match.id, "player_id": player.id, "metric_id": metric_id, "value_number": 1.0}
+            for player in players
+            for metric_id in metric_ids
+        ][:args.cells]
+
+        results = {}
+        for variant in ("row", "statement"):
+            install(db, migration, variant)
+            results[variant] = (
+                time_writes(db, payload, args.iterations, existing=False),
+                time_writes(db, payload, args.iterations, existing=True),
+            )
+            print(f"{variant:<10} insert={results[variant][0]:8.2f}ms  update={results[variant][1]:8.2f}ms  "
+                  f"({len(payload)} cells)")
+
+        for i, label in enumerate(("insert", "update")):
+            print(f"{label}: statement-level is {results['row'][i] / results['statement'][i]:.2f}x faster")
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
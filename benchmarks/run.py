@@ -0,0 +1,353 @@
+"""
+API benchmark runner
+Run with: python -m benchmarks.run [--postgres-url URL] [--update-baseline]
+
+Generates a synthetic dataset (benchmarks.dataset) in a fresh database, then
+calls every analytics, summary, listing and bulk-write endpoint through the
+FastAPI test client and reports, per endpoint:
+- p50 / p95 latency over the timed iterations,
+- SQL statements per request (from the Server-Timing header of
+  app.instrumentation),
+- peak Python memory allocated during one request (tracemalloc).
+
+Results are compared with benchmarks/baseline.json; the run fails (exit
+code 1) when an endpoint issues more statements than the baseline, or when
+its p95 latency or peak memory exceed the baseline by more than the
+tolerance. Latencies depend on the machine: refresh the baseline with
+--update-baseline when changing machines, and review query count changes in
+the diff.
+
+SQLite runs on a temporary file. PostgreSQL runs on --postgres-url (or
+BENCH_POSTGRES_URL), whose tables are DROPPED and recreated: use a
+dedicated database.
+
+The response cache is cleared before every request so that timings measure
+the computation, not the cache.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.session import Base, async_database_url, get_async_db, get_db
+from app.main import app
+from app.models import Match
+from app.seed import PLAYER_METRICS, TEAM_METRICS
+from app.services.response_cache import analytics_cache
+from benchmarks.dataset import Dataset, DatasetSpec, generate_dataset, match_records, random_value
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Latency / memory regressions: above baseline * tolerance + slack
+DEFAULT_TOLERANCE = 1.5
+LATENCY_SLACK_MS = 2.0
+MEMORY_SLACK_KIB = 256
+
+# Matches posted by the bulk ingest scenario
+INGEST_MATCHES = 10
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+class Scenario:
+    """One benchmarked request"""
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Any = None,
+        files: Optional[Callable[[], Dict[str, Any]]] = None,
+        status: int = 200,
+    ) -> None:
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = params
+        self.json_body = json_body
+        self.files = files
+        self.status = status
+
+    def call(self, client: TestClient):
+        files = self.files() if self.files else None
+        response = client.request(self.method, self.path, params=self.params, json=self.json_body, files=files)
+        if response.status_code != self.status:
+            raise RuntimeError(f"{self.name}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+
+def build_scenarios(db: Session, dataset: Dataset) -> List[Scenario]:
+    """Requests against the first team of the dataset"""
+    team_id = dataset.team_ids[0]
+    season_id = dataset.season_ids[-1]
+    season_start, season_end = dataset.season_ranges[season_id]
+    mid_season = season_start + (season_end - season_start) / 2
+    match = db.query(Match).filter(Match.team_id == team_id).order_by(Match.date.desc(), Match.id.desc()).first()
+    players = dataset.player_ids[team_id]
+
+    team_slugs = "team_possession_pct,team_goals_scored,team_shots,team_conversion_rate,team_win_rate"
+    radar_slugs = "team_possession_pct,team_passes_completed,team_shots,team_corners,team_attempts"
+    raw_team_metrics = [m for m in TEAM_METRICS if not m["is_derived"]]
+    raw_player_metrics = [m for m in PLAYER_METRICS if not m["is_derived"]]
+
+    def ingest_file() -> Dict[str, Any]:
+        rng = random.Random(dataset.spec.seed)
+        records = match_records(rng, team_id, season_id, season_start + timedelta(days=3), INGEST_MATCHES,
+                                players, opponent_prefix="Ingest Opponent")
+        ndjson = "\n".join(r.model_dump_json() for r in records)
+        return {"file": ("bench.ndjson", ndjson.encode("utf-8"), "application/x-ndjson")}
+
+    rng = random.Random(dataset.spec.seed)
+    return [
+        # Analytics
+        Scenario("analytics.kpis", "GET", "/analytics/team/kpis", {
+            "team_id": team_id, "metrics": team_slugs, "season_id": season_id, "compute_delta": True,
+            "from": mid_season.isoformat(), "to": season_end.isoformat(),
+        }),
+        Scenario("analytics.timeseries", "GET", "/analytics/team/timeseries",
+                 {"team_id": team_id, "metric": "team_possession_pct", "last_n": 20}),
+        Scenario("analytics.timeseries_multi", "GET", "/analytics/team/timeseries/multi", {
+            "team_id": team_id, "metrics": team_slugs, "last_n": 30, "transforms": "rolling_mean,ewm",
+        }),
+        Scenario("analytics.radar", "GET", "/analytics/team/radar", {
+            "team_id": team_id, "metrics": radar_slugs,
+            "fromA": season_start.isoformat(), "toA": mid_season.isoformat(),
+            "fromB": mid_season.isoformat(), "toB": season_end.isoformat(),
+        }),
+        Scenario("analytics.leaderboard", "GET", "/analytics/players/leaderboard",
+                 {"team_id": team_id, "metric": "player_goals", "season_id": season_id, "top_n": 10}),
+        Scenario("analytics.leaderboard_derived", "GET", "/analytics/players/leaderboard",
+                 {"team_id": team_id, "metric": "player_conversion_rate", "top_n": 10}),
+        Scenario("analytics.dashboard", "POST", "/analytics/team/dashboard", json_body={
+            "team_id": team_id,
+            "kpis": {"metrics": team_slugs.split(","), "season_id": season_id, "compute_delta": True,
+                     "from": mid_season.isoformat(), "to": season_end.isoformat()},
+            "timeseries": {"metric": "team_possession_pct", "last_n": 20},
+            "radar": {"metrics": radar_slugs.split(","), "fromA": season_start.isoformat(),
+                      "toA": mid_season.isoformat(), "fromB": mid_season.isoformat(),
+                      "toB": season_end.isoformat()},
+            "leaderboards": [{"metric": "player_goals", "season_id": season_id}],
+        }),
+        # Summaries and exports
+        Scenario("summary.match", "GET", f"/matches/{match.id}/summary"),
+        Scenario("summary.match_columnar", "GET", f"/matches/{match.id}/summary", {"grid": "columnar"}),
+        Scenario("summary.matches_season", "GET", "/matches/summaries",
+                 {"team_id": team_id, "season_id": season_id}),
+        Scenario("summary.match_csv", "GET", f"/matches/{match.id}/summary.csv"),
+        Scenario("export.matches_csv", "GET", "/matches/export.csv", {"team_id": team_id, "season_id": season_id}),
+        # Listings
+        Scenario("list.matches", "GET", "/matches", {"team_id": team_id}),
+        Scenario("list.matches_page", "GET", "/matches",
+                 {"team_id": team_id, "limit": 20, "fields": "id,date,opponent_name", "include_total": True}),
+        Scenario("list.players", "GET", "/players", {"team_id": team_id}),
+        Scenario("list.match_team_metrics", "GET", f"/metrics/matches/{match.id}/team-metrics"),
+        Scenario("list.match_player_metrics", "GET", f"/metrics/matches/{match.id}/player-metrics"),
+        # Bulk writes (idempotent: every iteration rewrites the same rows)
+        Scenario("write.team_metrics", "PUT", f"/metrics/matches/{match.id}/team-metrics", json_body={"values": [
+            {"metric_slug": m["slug"], "side": "OPPONENT" if m["side"] == "OPPONENT" else "OWN",
+             "value": random_value(rng, m)}
+            for m in raw_team_metrics
+        ]}),
+        Scenario("write.player_metrics", "PUT", f"/metrics/matches/{match.id}/player-metrics", json_body={"values": [
+            {"player_id": player_id, "metric_slug": m["slug"], "value": random_value(rng, m)}
+            for player_id in players[:14]
+            for m in raw_player_metrics
+        ]}),
+        Scenario("write.ingest", "POST", "/ingest/matches", files=ingest_file),
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_scenario(client: TestClient, scenario: Scenario, iterations: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        analytics_cache.clear()
+        scenario.call(client)
+
+    latencies, queries = [], []
+    for _ in range(iterations):
+        analytics_cache.clear()
+        started = time.perf_counter()
+        response = scenario.call(client)
+        latencies.append((time.perf_counter() - started) * 1000)
+        match = QUERIES_RE.search(response.headers.get("server-timing", ""))
+        queries.append(int(match.group(1)) if match else 0)
+
+    # Memory is measured on a separate call: tracemalloc slows allocations down
+    analytics_cache.clear()
+    tracemalloc.start()
+    try:
+        scenario.call(client)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "queries": max(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_backend(name: str, url: str, spec: DatasetSpec, iterations: int, warmup: int,
+                only: Optional[str]) -> Dict[str, Any]:
+    """Generate the dataset in `url` and benchmark every scenario"""
+    engine = create_engine(url, poolclass=NullPool)
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False,
+                                           expire_on_commit=False)
+
+    def get_bench_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_bench_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        dataset = generate_dataset(db, spec)
+        print(f"[{name}] dataset: {dataset.rows} rows in {time.perf_counter() - started:.1f}s")
+        scenarios = build_scenarios(db, dataset)
+    finally:
+        db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[get_async_db] = get_bench_async_db
+    results: Dict[str, Any] = {}
+    try:
+        with TestClient(app) as client:
+            for scenario in scenarios:
+                if only and only not in scenario.name:
+                    continue
+                results[scenario.name] = run_scenario(client, scenario, iterations, warmup)
+                r = results[scenario.name]
+                print(f"[{name}] {scenario.name:<32} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+                      f"queries={r['queries']:>3} peak={r['peak_kib']:>8.1f}KiB")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+    return {"dataset": spec.as_dict(), "scenarios": results}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regression messages of `results` against `baseline` (same dataset only)"""
+    regressions = []
+    for backend, current in results.items():
+        reference = baseline.get(backend)
+        if reference is None:
+            print(f"[{backend}] no baseline, skipping comparison")
+            continue
+        if reference["dataset"] != current["dataset"]:
+            print(f"[{backend}] baseline dataset differs ({reference['dataset']}), skipping comparison")
+            continue
+        for name, r in current["scenarios"].items():
+            ref = reference["scenarios"].get(name)
+            if ref is None:
+                continue
+            if r["queries"] > ref["queries"]:
+                regressions.append(f"[{backend}] {name}: {r['queries']} queries (baseline {ref['queries']})")
+            if r["p95_ms"] > ref["p95_ms"] * tolerance + LATENCY_SLACK_MS:
+                regressions.append(f"[{backend}] {name}: p95 {r['p95_ms']}ms (baseline {ref['p95_ms']}ms)")
+            if r["peak_kib"] > ref["peak_kib"] * tolerance + MEMORY_SLACK_KIB:
+                regressions.append(f"[{backend}] {name}: peak {r['peak_kib']}KiB (baseline {ref['peak_kib']}KiB)")
+    return regressions
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the API on a synthetic dataset")
+    parser.add_argument("--teams", type=int, default=2)
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--matches", type=int, default=30, help="Matches per team and season")
+    parser.add_argument("--players", type=int, default=22, help="Players per team")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20, help="Timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", help="Only run scenarios whose name contains this string")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"),
+                        help="Dedicated PostgreSQL database (tables are dropped)")
+    parser.add_argument("--skip-sqlite", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed p95 latency / memory ratio to the baseline")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    spec = DatasetSpec(teams=args.teams, seasons=args.seasons, matches_per_season=args.matches,
+                       players_per_team=args.players, seed=args.seed)
+    results: Dict[str, Any] = {}
+    if not args.skip_sqlite:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+            results["sqlite"] = run_backend("sqlite", url, spec, args.iterations, args.warmup, args.only)
+    if args.postgres_url:
+        if make_url(args.postgres_url).get_backend_name() != "postgresql":
+            parser.error("--postgres-url must be a PostgreSQL URL")
+        results["postgresql"] = run_backend("postgresql", args.postgres_url, spec, args.iterations, args.warmup,
+                                            args.only)
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"max RSS: {max_rss / 1024:.1f} MiB")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        for backend, current in results.items():
+            if args.only and backend in baseline:
+                baseline[backend]["scenarios"].update(current["scenarios"])
+            else:
+                baseline[backend] = current
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"✓ Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create it")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for message in regressions:
+        print(f"✗ {message}")
+    if regressions:
+        sys.exit(1)
+    print("✓ No regression against the baseline")
+
+if __name__ == "__main__":
+    main()
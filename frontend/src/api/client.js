@@ -48,5 +48,7 @@ export const getTeamKPIs = (params) => api.get('/analytics/team/kpis', { params
 export const getTeamTimeseries = (params) => api.get('/analytics/team/timeseries', { params });
 export const getTeamRadar = (params) => api.get('/analytics/team/radar', { params });
 export const getPlayerLeaderboard = (params) => api.get('/analytics/players/leaderboard', { params });
+// All panels in one call: { team_id, kpis, timeseries, radar, leaderboards }
+export const getTeamDashboard = (spec) => api.post('/analytics/team/dashboard', spec);
 
 export default api;
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getTeams, getSeasons, getTeamKPIs, getTeamTimeseries, getTeamRadar, getMetrics } from '../api/client';
+import { getTeams, getSeasons, getTeamDashboard, getTeamRadar, getMetrics } from '../api/client';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, RadarChart, PolarGrid, PolarAngleAxis, PolarRadiusAxis, Radar } from 'recharts';
 import { format } from 'date-fns';
 
@@ -75,35 +75,29 @@ function Dashboard() {
 
     setLoading(true);
     try {
-      // Load KPIs
-      const kpiParams = {
-        team_id: selectedTeam,
-        metrics: selectedKpiMetrics.join(','),
+      // KPIs, timeseries and radar (when periods are set) in one call
+      const kpiSpec = {
+        metrics: selectedKpiMetrics,
         season_id: selectedSeason,
         compute_delta: true
       };
-      if (dateFrom) kpiParams.from = dateFrom;
-      if (dateTo) kpiParams.to = dateTo;
-
-      const kpiRes = await getTeamKPIs(kpiParams);
-      setKpis(kpiRes.data.kpis);
+      if (dateFrom) kpiSpec.from = dateFrom;
+      if (dateTo) kpiSpec.to = dateTo;
 
-      // Load timeseries
-      const tsRes = await getTeamTimeseries({
+      const spec = {
         team_id: selectedTeam,
-        metric: selectedTimeseriesMetric,
-        last_n: 10
-      });
-      setTimeseries(tsRes.data);
-
-      // Load radar if periods are set
+        kpis: kpiSpec,
+        timeseries: { metric: selectedTimeseriesMetric, last_n: 10 }
+      };
       if (radarPeriods.fromA && radarPeriods.toA && radarPeriods.fromB && radarPeriods.toB) {
-        const radarRes = await getTeamRadar({
-          team_id: selectedTeam,
-          metrics: selectedRadarMetrics.join(','),
-          ...radarPeriods
-        });
-        setRadar(radarRes.data);
+        spec.radar = { metrics: selectedRadarMetrics, ...radarPeriods };
+      }
+
+      const dashboardRes = await getTeamDashboard(spec);
+      setKpis(dashboardRes.data.kpis);
+      setTimeseries(dashboardRes.data.timeseries);
+      if (dashboardRes.data.radar) {
+        setRadar(dashboardRes.data.radar);
       }
     } catch (error) {
       console.error('Error loading dashboard data:', error);
@@ -0,0 +1,73 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db.session import Base, get_async_db, get_db
+from app.main import app
+from app.services.response_cache import analytics_cache
+
+# Test database setup: one SQLite file per test, shared by the sync and async engines
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "test.db"
+
+@pytest.fixture
+def db_session(database_path):
+    """Create a test database session"""
+    engine = create_engine(
+        f"sqlite:///{database_path}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+
+    yield session
+
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def _reset_public_schema(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+
+@pytest.fixture
+def pg_session():
+    """Session on the PostgreSQL database of TEST_POSTGRES_URL (schema recreated), skipped without it"""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    engine = create_engine(url)
+    _reset_public_schema(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    yield session
+
+    session.close()
+    # Also drops what migrations add on top of the tables (views, functions, triggers)
+    _reset_public_schema(engine)
+    engine.dispose()
+
+@pytest.fixture
+def client(db_session, database_path):
+    """API test client bound to the test database (sync and async routes)"""
+    # NullPool: connections never outlive the TestClient event loop
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_test_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    analytics_cache.clear()
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,19 @@
+"""Run the upgrade() / downgrade() of a migration file on a test session"""
+import importlib.util
+from pathlib import Path
+
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+
+VERSIONS = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def run_migration(db, filename: str, *steps: str) -> None:
+    """Run the given steps ("upgrade", "downgrade") of alembic/versions/<filename>, then commit"""
+    spec = importlib.util.spec_from_file_location(Path(filename).stem, VERSIONS / filename)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(db.connection())):
+        for step in steps:
+            getattr(migration, step)()
+    db.commit()
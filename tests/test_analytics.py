@@ -1,8 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from datetime import date
-from app.db.session import Base
 from app.models import (
     Team, Season, Player, Match, MatchPlayerParticipation,
     MetricDefinition, PlayerMatchMetricValue, TeamMatchMetricValue,
@@ -10,23 +7,6 @@ from app.models import (
 )
 from app.services.analytics import AnalyticsService
 
-# Test database setup
-TEST_DATABASE_URL = "sqlite:///:memory:"
-
-@pytest.fixture
-def db_session():
-    """Create a test database session"""
-    engine = create_engine(TEST_DATABASE_URL)
-    Base.metadata.create_all(engine)
-
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
-
-    yield session
-
-    session.close()
-    Base.metadata.drop_all(engine)
-
 @pytest.fixture
 def sample_data(db_session):
     """Create sample data for testing"""
@@ -277,6 +257,210 @@ def test_team_kpis_aggregation(db_session, sample_data):
     assert kpis[0]["metric_slug"] == "team_goals_scored"
     assert kpis[0]["value"] == 5.0  # 2 + 3
 
+def test_team_derived_kpis_batched(db_session, sample_data):
+    """Test that derived team KPIs are evaluated over all matches at once"""
+    team = sample_data["team"]
+    season = sample_data["season"]
+
+    team_goals = MetricDefinition(
+        slug="team_goals_scored", label_fr="Buts marqués", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    team_shots = MetricDefinition(
+        slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    team_attempts = MetricDefinition(
+        slug="team_attempts", label_fr="Tentatives totales", scope=MetricScope.TEAM,
+        category=MetricCategory.COMBINATIONS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=True, formula="goals_scored + shots"
+    )
+    team_conversion = MetricDefinition(
+        slug="team_conversion_rate", label_fr="Taux de conversion", scope=MetricScope.TEAM,
+        category=MetricCategory.COMBINATIONS, datatype=MetricDataType.PERCENT, unit="%",
+        side=MetricSide.OWN, is_derived=True, formula="goals_scored / attempts * 100"
+    )
+    db_session.add_all([team_goals, team_shots, team_attempts, team_conversion])
+
+    match2 = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 22), opponent_name="Team B",
+                   is_home=False, match_type=MatchType.LEAGUE, score_for=1, score_against=1)
+    db_session.add(match2)
+    db_session.commit()
+
+    match1 = sample_data["match"]
+    db_session.add_all([
+        TeamMatchMetricValue(match_id=match1.id, metric_id=team_goals.id, side=MetricSide.OWN, value_number=3),
+        TeamMatchMetricValue(match_id=match1.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=7),
+        TeamMatchMetricValue(match_id=match2.id, metric_id=team_goals.id, side=MetricSide.OWN, value_number=1),
+        TeamMatchMetricValue(match_id=match2.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=3),
+    ])
+    db_session.commit()
+
+    analytics = AnalyticsService(db_session)
+    kpis = analytics.get_team_kpis(
+        team_id=team.id,
+        metric_slugs=["team_attempts", "team_conversion_rate", "team_goals_scored"],
+        season_id=season.id
+    )
+
+    values = {k["metric_slug"]: k["value"] for k in kpis}
+    assert values["team_attempts"] == 14.0  # (3 + 7) + (1 + 3)
+    assert values["team_conversion_rate"] == 27.5  # avg(30%, 25%)
+    assert values["team_goals_scored"] == 4.0
+
+    series = analytics.get_team_timeseries(team_id=team.id, metric_slug="team_attempts", last_n=10)
+    assert [p["value"] for p in series["data"]] == [10.0, 4.0]
+
+def test_team_periods_evaluated_together(db_session, sample_data, monkeypatch):
+    """Test that radar periods and KPI deltas share the same match / value queries"""
+    from sqlalchemy import event
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 0)
+
+    team = sample_data["team"]
+    season = sample_data["season"]
+
+    team_goals = MetricDefinition(
+        slug="team_goals_scored", label_fr="Buts marqués", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    team_shots = MetricDefinition(
+        slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    db_session.add_all([team_goals, team_shots])
+
+    # sample match on 2024-06-15 (period B), plus one in period A
+    match_a = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 5), opponent_name="Team A",
+                    is_home=True, match_type=MatchType.LEAGUE, score_for=1, score_against=0)
+    db_session.add(match_a)
+    db_session.commit()
+
+    match_b = sample_data["match"]
+    db_session.add_all([
+        TeamMatchMetricValue(match_id=match_a.id, metric_id=team_goals.id, side=MetricSide.OWN, value_number=1),
+        TeamMatchMetricValue(match_id=match_a.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=4),
+        TeamMatchMetricValue(match_id=match_b.id, metric_id=team_goals.id, side=MetricSide.OWN, value_number=3),
+        TeamMatchMetricValue(match_id=match_b.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=6),
+    ])
+    db_session.commit()
+
+    analytics = AnalyticsService(db_session)
+    slugs = ["team_goals_scored", "team_shots"]
+    team_id = team.id
+    analytics._get_metrics_by_slugs(slugs)  # warm the metric registry
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.bind, "before_cursor_execute", listener)
+    try:
+        radar = analytics.get_team_radar(
+            team_id, slugs, date(2024, 6, 1), date(2024, 6, 10), date(2024, 6, 11), date(2024, 6, 20)
+        )
+        radar_statements = len(statements)
+        kpis = analytics.get_team_kpis(
+            team_id, slugs, date_from=date(2024, 6, 11), date_to=date(2024, 6, 20), compute_delta=True
+        )
+        kpi_statements = len(statements) - radar_statements
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", listener)
+
+    values = {m["metric_slug"]: (m["value_a"], m["value_b"]) for m in radar["metrics"]}
+    assert values == {"team_goals_scored": (1.0, 3.0), "team_shots": (4.0, 6.0)}
+
+    # Previous period of 2024-06-11..20 is 2024-06-02..10
+    deltas = {k["metric_slug"]: (k["value"], k["delta"]) for k in kpis}
+    assert deltas == {"team_goals_scored": (3.0, 200.0), "team_shots": (6.0, 50.0)}
+
+    # One match query and one value query, whatever the number of periods / metrics
+    assert radar_statements == 2
+    assert kpi_statements == 2
+
+def test_team_multi_timeseries(db_session, sample_data):
+    """Test that several metrics and their smoothed series come from one evaluation"""
+    team = sample_data["team"]
+    season = sample_data["season"]
+
+    team_goals = MetricDefinition(
+        slug="team_goals_scored", label_fr="Buts marqués", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    team_shots = MetricDefinition(
+        slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+        category=MetricCategory.EVENTS, datatype=MetricDataType.INT, unit="count",
+        side=MetricSide.OWN, is_derived=False
+    )
+    db_session.add_all([team_goals, team_shots])
+
+    matches = [sample_data["match"]]  # 2024-06-15
+    for day in (22, 29):
+        matches.append(Match(team_id=team.id, season_id=season.id, date=date(2024, 6, day), opponent_name="Team",
+                             is_home=True, match_type=MatchType.LEAGUE, score_for=0, score_against=0))
+    db_session.add_all(matches[1:])
+    db_session.commit()
+
+    for match, goals, shots in zip(matches, (2, 0, 4), (6, 3, 9)):
+        db_session.add_all([
+            TeamMatchMetricValue(match_id=match.id, metric_id=team_goals.id, side=MetricSide.OWN, value_number=goals),
+            TeamMatchMetricValue(match_id=match.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=shots),
+        ])
+    db_session.commit()
+
+    analytics = AnalyticsService(db_session)
+    result = analytics.get_team_multi_timeseries(
+        team.id, ["team_goals_scored", "team_shots"], last_n=10,
+        transforms=["rolling_mean", "cumulative_sum", "ewm"], window=2, alpha=0.5
+    )
+
+    assert [m["match_id"] for m in result["matches"]] == [m.id for m in matches]
+    goals, shots = result["series"]
+    assert goals["values"] == [2.0, 0.0, 4.0]
+    assert goals["rolling_mean"] == [2.0, 1.0, 2.0]
+    assert goals["cumulative_sum"] == [2.0, 2.0, 6.0]
+    assert goals["ewm"] == [2.0, 1.0, 2.5]
+    assert shots["values"] == [6.0, 3.0, 9.0]
+
+    plain = analytics.get_team_multi_timeseries(team.id, ["team_shots"], last_n=2)
+    assert plain["series"][0]["values"] == [3.0, 9.0]
+    assert "rolling_mean" not in plain["series"][0]
+
+def test_player_leaderboard(db_session, sample_data):
+    """Test that the leaderboard ranks players on raw and derived metrics"""
+    team = sample_data["team"]
+    match = sample_data["match"]
+    john, jane = sample_data["players"]
+    metrics = sample_data["metrics"]
+
+    db_session.add_all([
+        MatchPlayerParticipation(match_id=match.id, player_id=john.id, is_starter=True),
+        MatchPlayerParticipation(match_id=match.id, player_id=jane.id, is_starter=True),
+        PlayerMatchMetricValue(match_id=match.id, player_id=john.id, metric_id=metrics["goals"].id, value_number=1),
+        PlayerMatchMetricValue(match_id=match.id, player_id=john.id, metric_id=metrics["shots"].id, value_number=9),
+        PlayerMatchMetricValue(match_id=match.id, player_id=jane.id, metric_id=metrics["goals"].id, value_number=2),
+        PlayerMatchMetricValue(match_id=match.id, player_id=jane.id, metric_id=metrics["shots"].id, value_number=2),
+    ])
+    db_session.commit()
+
+    analytics = AnalyticsService(db_session)
+
+    goals = analytics.get_player_leaderboard(team_id=team.id, metric_slug="player_goals")
+    assert [(e["player_name"], e["value"], e["matches_played"]) for e in goals["entries"]] == [
+        ("Jane Smith", 2.0, 1),
+        ("John Doe", 1.0, 1),
+    ]
+
+    attempts = analytics.get_player_leaderboard(team_id=team.id, metric_slug="player_attempts", top_n=1)
+    assert [(e["player_name"], e["value"]) for e in attempts["entries"]] == [("John Doe", 10.0)]
+
+    conversion = analytics.get_player_leaderboard(team_id=team.id, metric_slug="player_conversion_rate")
+    assert [e["value"] for e in conversion["entries"]] == [50.0, 10.0]
+
 def test_win_rate_calculation(db_session, sample_data):
     """Test win rate calculation"""
     team = sample_data["team"]
@@ -0,0 +1,123 @@
+import pytest
+from datetime import date
+from app.models import (
+    Team, Season, Match, MetricDefinition,
+    MatchType, MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from app.services.response_cache import ResponseCache
+
+@pytest.fixture
+def cache_data(db_session):
+    """One team with a match and a raw team metric"""
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    match = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 1),
+                  opponent_name="Alpha FC", match_type=MatchType.LEAGUE)
+    metric = MetricDefinition(slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+                              category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                              side=MetricSide.OWN, is_derived=False)
+    db_session.add_all([match, metric])
+    db_session.commit()
+    return {"team_id": team.id, "match_id": match.id}
+
+def test_response_cache_lru():
+    """Test LRU eviction under the memory cap and hit/miss counters"""
+    cache = ResponseCache(max_bytes=30)
+    cache.set("a", b"x" * 10)
+    cache.set("b", b"x" * 10)
+    assert cache.get("a") == b"x" * 10
+    cache.set("c", b"x" * 10)  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    cache.set("d", b"x" * 100)  # larger than the cap: not stored
+    assert cache.get("d") is None
+    assert cache.stats() == {
+        "entries": 2, "bytes": 22, "max_bytes": 30, "hits": 2, "misses": 2, "evictions": 1,
+    }
+
+def test_kpis_cached_until_team_data_changes(client, cache_data):
+    """Test cache hits, 304 revalidation and invalidation on writes"""
+    team_id, match_id = cache_data["team_id"], cache_data["match_id"]
+    url = f"/analytics/team/kpis?team_id={team_id}&metrics=team_shots"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert first.json()["kpis"][0]["value"] == 0.0
+
+    second = client.get(url)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.content == first.content
+
+    not_modified = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    client.put(f"/metrics/matches/{match_id}/team-metrics", json={"values": [
+        {"metric_slug": "team_shots", "side": "OWN", "value": 11},
+    ]})
+    fresh = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.headers["etag"] != first.headers["etag"]
+    assert fresh.json()["kpis"][0]["value"] == 11.0
+
+    # ORM writes (match edits) also invalidate
+    client.patch(f"/matches/{match_id}", json={"opponent_name": "Beta FC"})
+    series = client.get(f"/analytics/team/timeseries?team_id={team_id}&metric=team_shots")
+    assert series.json()["data"][0]["opponent_name"] == "Beta FC"
+    assert client.get("/analytics/cache/stats").json()["hits"] >= 1
+
+def test_multi_timeseries_route(client, cache_data):
+    params = {"team_id": cache_data["team_id"], "metrics": "team_shots", "transforms": "rolling_mean,ewm"}
+    response = client.get("/analytics/team/timeseries/multi", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert [m["match_id"] for m in body["matches"]] == [cache_data["match_id"]]
+    assert body["series"][0]["rolling_mean"] == [0.0]
+    assert body["series"][0]["cumulative_sum"] is None
+
+    params["transforms"] = "median"
+    assert client.get("/analytics/team/timeseries/multi", params=params).status_code == 400
+
+def test_team_dashboard_matches_individual_endpoints(client, cache_data):
+    """Test that dashboard panels equal the GET endpoints and are cached together"""
+    team_id = cache_data["team_id"]
+    client.put(f"/metrics/matches/{cache_data['match_id']}/team-metrics",
+               json={"values": [{"metric_slug": "team_shots", "side": "OWN", "value": 9}]})
+
+    spec = {
+        "team_id": team_id,
+        "kpis": {"metrics": ["team_shots"], "from": "2024-05-01", "to": "2024-06-30", "compute_delta": True},
+        "timeseries": {"metric": "team_shots", "last_n": 5},
+        "radar": {"metrics": ["team_shots"], "fromA": "2024-01-01", "toA": "2024-05-31",
+                  "fromB": "2024-06-01", "toB": "2024-06-30"},
+    }
+    response = client.post("/analytics/team/dashboard", json=spec)
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    body = response.json()
+
+    kpis = client.get("/analytics/team/kpis", params={
+        "team_id": team_id, "metrics": "team_shots", "from": "2024-05-01", "to": "2024-06-30",
+        "compute_delta": True,
+    }).json()
+    timeseries = client.get("/analytics/team/timeseries",
+                            params={"team_id": team_id, "metric": "team_shots", "last_n": 5}).json()
+    radar = client.get("/analytics/team/radar", params={
+        "team_id": team_id, "metrics": "team_shots", "fromA": "2024-01-01", "toA": "2024-05-31",
+        "fromB": "2024-06-01", "toB": "2024-06-30",
+    }).json()
+    assert body["kpis"] == kpis["kpis"] and body["kpis"][0]["value"] == 9.0
+    assert body["timeseries"] == timeseries
+    assert body["radar"] == radar
+    assert body["leaderboards"] == []
+
+    assert client.post("/analytics/team/dashboard", json=spec).headers["X-Cache"] == "HIT"
+    spec["radar"]["metrics"] = [f"m{i}" for i in range(9)]
+    assert client.post("/analytics/team/dashboard", json=spec).status_code == 422
@@ -0,0 +1,35 @@
+from app.models import Match, PlayerMatchMetricValue, TeamMatchMetricValue, TeamSeasonMetricRollup
+from benchmarks.dataset import DatasetSpec, generate_dataset
+from benchmarks.run import compare
+
+def test_generate_dataset(db_session):
+    """Test the synthetic dataset shape and that rollups are maintained"""
+    spec = DatasetSpec(teams=2, seasons=2, matches_per_season=3, players_per_team=16)
+    dataset = generate_dataset(db_session, spec)
+
+    assert len(dataset.team_ids) == 2 and len(dataset.season_ids) == 2
+    assert db_session.query(Match).count() == 12
+    assert all(len(ids) == 16 for ids in dataset.player_ids.values())
+    team_values = db_session.query(TeamMatchMetricValue).count()
+    player_values = db_session.query(PlayerMatchMetricValue).count()
+    assert dataset.rows == team_values + player_values + 12 * 14
+    assert db_session.query(TeamSeasonMetricRollup).count() > 0
+
+def test_compare_flags_regressions():
+    """Test query count, latency and memory regressions against a baseline"""
+    dataset = DatasetSpec().as_dict()
+    baseline = {"sqlite": {"dataset": dataset, "scenarios": {
+        "a": {"p50_ms": 5.0, "p95_ms": 10.0, "queries": 3, "peak_kib": 100.0},
+    }}}
+    same = {"sqlite": {"dataset": dataset, "scenarios": {
+        "a": {"p50_ms": 6.0, "p95_ms": 14.0, "queries": 3, "peak_kib": 120.0},
+    }}}
+    assert compare(same, baseline, tolerance=1.5) == []
+
+    worse = {"sqlite": {"dataset": dataset, "scenarios": {
+        "a": {"p50_ms": 30.0, "p95_ms": 40.0, "queries": 4, "peak_kib": 2000.0},
+    }}}
+    assert len(compare(worse, baseline, tolerance=1.5)) == 3
+
+    other_dataset = {"sqlite": dict(worse["sqlite"], dataset=DatasetSpec(teams=5).as_dict())}
+    assert compare(other_dataset, baseline, tolerance=1.5) == []
@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine, text
+from app.db.telemetry import TimedQueuePool, instrument_engine, pool_report
+
+def test_pool_telemetry(tmp_path):
+    """Test checkout timing and pool state reporting"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=2, max_overflow=0,
+        pool_pre_ping=True,
+    )
+    instrument_engine("test", engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            report = pool_report()["test"]
+            assert report["checked_out"] == 1
+            assert report["size"] == 2
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        report = pool_report()["test"]
+        assert report["pool"] == "TimedQueuePool"
+        assert report["checked_out"] == 0
+        assert report["checkouts"] == 2
+        assert report["connects"] == 1
+        assert sum(report["wait_ms"]["histogram"].values()) == 2
+
+        # Counters survive Engine.dispose() (the pool is recreated)
+        engine.dispose()
+        assert pool_report()["test"]["checkouts"] == 2
+    finally:
+        engine.dispose()
+
+def test_health_db(client):
+    """Test the /health/db surface"""
+    pools = client.get("/health/db").json()["pools"]
+    assert {"sync", "async"} <= set(pools)
@@ -0,0 +1,67 @@
+import pytest
+from types import SimpleNamespace
+
+from app.models import MetricSide
+from app.seed import PLAYER_METRICS, TEAM_METRICS
+from app.services.formulas import FormulaError, compile_formulas, parse_formula
+
+
+def _definitions(metrics):
+    return [
+        SimpleNamespace(
+            slug=m["slug"],
+            scope=m["scope"],
+            side=m["side"],
+            is_derived=m["is_derived"],
+            formula=m.get("formula"),
+        )
+        for m in metrics
+    ]
+
+
+def test_seed_formulas_compile():
+    """Test that every seeded derived metric compiles except the match-level win rate"""
+    compiled, errors = compile_formulas(_definitions(PLAYER_METRICS + TEAM_METRICS))
+
+    assert set(errors) == {"team_win_rate"}
+    assert compiled["player_goal_involvements"].inputs == (
+        ("player_goals", MetricSide.NONE),
+        ("player_goal_assists", MetricSide.NONE),
+    )
+    assert compiled["team_attempts_conceded"].inputs == (
+        ("team_goals_conceded", MetricSide.OPPONENT),
+        ("team_shots_conceded", MetricSide.OPPONENT),
+    )
+
+
+def test_derived_dependencies_are_inlined():
+    """Test that team_conversion_rate reuses team_attempts on raw columns only"""
+    compiled, _ = compile_formulas(_definitions(TEAM_METRICS))
+    formula = compiled["team_conversion_rate"]
+
+    assert formula.inputs == (("team_goals_scored", MetricSide.OWN), ("team_shots", MetricSide.OWN))
+
+    columns = {
+        ("team_goals_scored", MetricSide.OWN): [3.0, 0.0, 1.0],
+        ("team_shots", MetricSide.OWN): [7.0, 0.0, 3.0],
+    }
+    assert formula.evaluate(columns, 3) == [30.0, 0.0, 25.0]
+
+
+def test_cycles_and_unsafe_syntax_are_rejected():
+    """Test that cyclic and non-arithmetic formulas do not compile"""
+    definitions = _definitions(TEAM_METRICS) + [
+        SimpleNamespace(slug="team_a", scope=TEAM_METRICS[0]["scope"], side=MetricSide.OWN,
+                        is_derived=True, formula="b + 1"),
+        SimpleNamespace(slug="team_b", scope=TEAM_METRICS[0]["scope"], side=MetricSide.OWN,
+                        is_derived=True, formula="a * 2"),
+    ]
+    compiled, errors = compile_formulas(definitions)
+
+    assert "team_a" not in compiled and "team_b" not in compiled
+    assert errors["team_a"] == "Cyclic formula dependency"
+
+    with pytest.raises(FormulaError):
+        parse_formula("__import__('os').system('true')")
+    with pytest.raises(FormulaError):
+        parse_formula("shots ** 2")
@@ -0,0 +1,51 @@
+import pytest
+from datetime import date
+from sqlalchemy.exc import DBAPIError
+from app.models import (
+    Team, Season, Match, MetricDefinition,
+    MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from app.services.metric_writes import write_team_values
+from tests.migrations import run_migration
+
+GUARDRAILS_MIGRATION = "a9d3e7c51f28_set_based_metric_value_guardrails.py"
+
+@pytest.fixture(params=[("upgrade",), ("upgrade", "downgrade")], ids=["statement-level", "downgraded"])
+def guarded(request, pg_session):
+    """PostgreSQL database with the guardrails after upgrade / downgrade, a match and three team metrics"""
+    run_migration(pg_session, GUARDRAILS_MIGRATION, *request.param)
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    pg_session.add_all([team, season])
+    pg_session.flush()
+    match = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 1), opponent_name="Alpha FC")
+    metrics = {
+        slug: MetricDefinition(slug=slug, label_fr=slug, scope=MetricScope.TEAM, category=MetricCategory.EVENTS,
+                               datatype=datatype, side=MetricSide.OWN, is_derived=derived)
+        for slug, datatype, derived in [
+            ("team_shots", MetricDataType.INT, False),
+            ("team_possession_pct", MetricDataType.PERCENT, False),
+            ("team_conversion_rate", MetricDataType.PERCENT, True),
+        ]
+    }
+    pg_session.add_all([match, *metrics.values()])
+    pg_session.commit()
+    return pg_session, match.id, {slug: m.id for slug, m in metrics.items()}
+
+def _row(match_id, metric_id, value):
+    return {"match_id": match_id, "metric_id": metric_id, "side": MetricSide.OWN, "value_number": value}
+
+def test_set_based_guardrails(guarded):
+    """Test that multi-row writes are rejected by the guardrails (statement-level, or per row after downgrade)"""
+    db, match_id, ids = guarded
+    write_team_values(db, [_row(match_id, ids["team_shots"], 400), _row(match_id, ids["team_possession_pct"], 55)])
+    db.commit()
+
+    with pytest.raises(DBAPIError, match="Percent metric out of range"):
+        # ON CONFLICT DO UPDATE path
+        write_team_values(db, [_row(match_id, ids["team_possession_pct"], 150)])
+    db.rollback()
+
+    with pytest.raises(DBAPIError, match="Cannot store derived metric_id"):
+        write_team_values(db, [_row(match_id, ids["team_shots"], 1), _row(match_id, ids["team_conversion_rate"], 10)])
+    db.rollback()
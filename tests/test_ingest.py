@@ -0,0 +1,94 @@
+import json
+import pytest
+from datetime import date
+from app.models import (
+    Team, Season, Player, Match, MatchPlayerParticipation, MetricDefinition,
+    PlayerMatchMetricValue, TeamMatchMetricValue,
+    MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+
+@pytest.fixture
+def base_data(db_session):
+    """Create a team, a season, two players and raw metric definitions"""
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    players = [
+        Player(team_id=team.id, first_name="John", last_name="Doe", main_position="Attaquant"),
+        Player(team_id=team.id, first_name="Jane", last_name="Smith", main_position="Milieu"),
+    ]
+    db_session.add_all(players + [
+        MetricDefinition(slug="team_goals_scored", label_fr="Buts marqués", scope=MetricScope.TEAM,
+                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                         side=MetricSide.OWN, is_derived=False),
+        MetricDefinition(slug="player_goals", label_fr="Buts", scope=MetricScope.PLAYER,
+                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                         side=MetricSide.NONE, is_derived=False),
+    ])
+    db_session.commit()
+    return {"team": team, "season": season, "players": players}
+
+def _ndjson(records):
+    return "\n".join(json.dumps(r) for r in records).encode()
+
+def test_ingest_ndjson(client, db_session, base_data):
+    """Test that several matches are ingested with per-match error reporting"""
+    team, season = base_data["team"], base_data["season"]
+    john, jane = base_data["players"]
+    match = {"team_id": team.id, "season_id": season.id, "date": "2024-06-01", "opponent_name": "Team A"}
+
+    records = [
+        {
+            "match": match,
+            "participations": [{"player_id": john.id, "is_starter": True}, {"player_id": jane.id}],
+            "team_metrics": [{"metric_slug": "team_goals_scored", "side": "OWN", "value": 2}],
+            "player_metrics": [
+                {"player_id": john.id, "metric_slug": "player_goals", "value": 2},
+                {"player_id": jane.id, "metric_slug": "unknown", "value": 1},
+            ],
+        },
+        {"match": dict(match, team_id=999, opponent_name="Team B")},
+        {"match_id": 12345},
+    ]
+    files = {"file": ("season.ndjson", _ndjson(records) + b"\nnot json\n")}
+
+    response = client.post("/ingest/matches", files=files)
+    assert response.status_code == 200
+    report = response.json()
+
+    assert (report["matches"], report["succeeded"], report["failed"], report["created_matches"]) == (4, 1, 3, 1)
+    assert report["rows"] == {"participations": 2, "team_metrics": 1, "player_metrics": 1}
+    assert [(e["line"], e["errors"]) for e in report["errors"]][1:3] == [
+        (2, ["Team 999 not found"]),
+        (3, ["Match 12345 not found"]),
+    ]
+    assert report["errors"][0]["errors"][0].startswith("Invalid record")
+    assert report["errors"][3] == {"line": 1, "match": "2024-06-01 Team A", "errors": ["Metric unknown not found"]}
+
+    # Re-ingesting the same export is idempotent (natural key match)
+    response = client.post("/ingest/matches", files={"file": ("season.ndjson", _ndjson(records[:1]))})
+    assert response.json()["created_matches"] == 0
+    assert db_session.query(Match).count() == 1
+    assert db_session.query(MatchPlayerParticipation).count() == 2
+    assert db_session.query(PlayerMatchMetricValue).count() == 1
+
+def test_ingest_csv(client, db_session, base_data):
+    """Test that a long-format CSV is grouped into one record per match"""
+    team, season = base_data["team"], base_data["season"]
+    john = base_data["players"][0]
+    csv_body = "\n".join([
+        "team_id,season_id,date,opponent_name,score_for,player_id,metric_slug,side,value",
+        f"{team.id},{season.id},2024-06-01,Team A,2,,team_goals_scored,OWN,2",
+        f"{team.id},{season.id},2024-06-01,Team A,2,{john.id},player_goals,,2",
+        f"{team.id},{season.id},2024-06-08,Team B,0,,team_goals_scored,OWN,0",
+    ]).encode()
+
+    response = client.post("/ingest/matches", files={"file": ("season.csv", csv_body)})
+    report = response.json()
+
+    assert (report["matches"], report["succeeded"], report["errors"]) == (2, 2, [])
+    assert report["rows"]["team_metrics"] == 2 and report["rows"]["player_metrics"] == 1
+    assert sorted(m.score_for for m in db_session.query(Match).all()) == [0, 2]
+    assert db_session.query(TeamMatchMetricValue).count() == 2
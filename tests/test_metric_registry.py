@@ -0,0 +1,92 @@
+from app.config import settings
+from app.models import MetricCategory, MetricDataType, MetricDefinition, MetricScope, MetricSide
+from app.services.metric_registry import (
+    get_metric_record_by_id, get_metric_records, get_metric_registry, invalidate_metric_registry
+)
+
+
+def _metric(slug, **kwargs):
+    data = dict(
+        slug=slug, label_fr=slug, scope=MetricScope.TEAM, category=MetricCategory.EVENTS,
+        datatype=MetricDataType.INT, unit="count", side=MetricSide.OWN, is_derived=False
+    )
+    data.update(kwargs)
+    return MetricDefinition(**data)
+
+
+def test_registry_loads_records_and_formulas(db_session):
+    """Test that the registry exposes immutable records and compiled formulas"""
+    db_session.add_all([
+        _metric("team_goals_scored"),
+        _metric("team_shots"),
+        _metric("team_attempts", category=MetricCategory.COMBINATIONS, is_derived=True,
+                formula="goals_scored + shots"),
+    ])
+    db_session.commit()
+
+    registry = get_metric_registry(db_session)
+
+    shots = registry.get("team_shots")
+    assert shots.side == MetricSide.OWN and shots.is_derived is False
+    assert registry.get_by_id(shots.id) is shots
+    assert registry.formulas["team_attempts"].inputs == (
+        ("team_goals_scored", MetricSide.OWN), ("team_shots", MetricSide.OWN)
+    )
+    # Same process, same database: no reload
+    assert get_metric_registry(db_session) is registry
+
+
+def test_registry_reloads_on_version_bump(db_session, monkeypatch):
+    """Test that a bumped version stamp makes the registry reload"""
+    db_session.add(_metric("team_shots"))
+    db_session.commit()
+    registry = get_metric_registry(db_session)
+
+    monkeypatch.setattr(settings, "METRIC_REGISTRY_CHECK_SECONDS", 0)
+    assert get_metric_registry(db_session) is registry
+
+    db_session.add(_metric("team_corners"))
+    db_session.commit()
+    invalidate_metric_registry(db_session)
+
+    reloaded = get_metric_registry(db_session)
+    assert reloaded is not registry
+    assert reloaded.version == registry.version + 1
+    assert reloaded.get("team_corners") is not None
+
+
+def test_unknown_slug_triggers_reload(db_session):
+    """Test that definitions inserted without a version bump are found on lookup"""
+    db_session.add(_metric("team_shots"))
+    db_session.commit()
+    get_metric_registry(db_session)
+
+    db_session.add(_metric("team_corners"))
+    db_session.commit()
+
+    records = get_metric_records(db_session, ["team_corners", "unknown"])
+    assert list(records) == ["team_corners"]
+
+
+def test_unknown_slug_reloads_once_per_version(db_session, monkeypatch):
+    """Test that a repeatedly requested unknown slug / id does not reload the registry every time"""
+    db_session.add(_metric("team_shots"))
+    db_session.commit()
+    registry = get_metric_registry(db_session)
+
+    get_metric_records(db_session, ["unknown"])
+    assert get_metric_record_by_id(db_session, 999) is None
+    reloaded = get_metric_registry(db_session)
+    assert reloaded is not registry
+    assert reloaded.misses == {"unknown", 999}
+
+    for _ in range(3):
+        assert get_metric_records(db_session, ["team_shots", "unknown"]).keys() == {"team_shots"}
+        assert get_metric_record_by_id(db_session, 999) is None
+    assert get_metric_registry(db_session) is reloaded
+
+    # A version bump clears the remembered misses
+    monkeypatch.setattr(settings, "METRIC_REGISTRY_CHECK_SECONDS", 0)
+    db_session.add(_metric("unknown"))
+    invalidate_metric_registry(db_session)
+    assert list(get_metric_records(db_session, ["unknown"])) == ["unknown"]
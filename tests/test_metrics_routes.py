@@ -0,0 +1,112 @@
+import pytest
+from datetime import date
+from app.models import (
+    Team, Season, Player, Match, MetricDefinition, PlayerMatchMetricValue,
+    MatchType, MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+
+@pytest.fixture
+def match_data(db_session):
+    """Create a match, two players and a few player metric definitions"""
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    players = [
+        Player(team_id=team.id, first_name="John", last_name="Doe", main_position="Attaquant"),
+        Player(team_id=team.id, first_name="Jane", last_name="Smith", main_position="Milieu"),
+    ]
+    match = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 15),
+                  opponent_name="Rival FC", match_type=MatchType.LEAGUE)
+    metrics = {
+        "goals": MetricDefinition(slug="player_goals", label_fr="Buts", scope=MetricScope.PLAYER,
+                                  category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                  side=MetricSide.NONE, is_derived=False),
+        "shots": MetricDefinition(slug="player_shots", label_fr="Tirs", scope=MetricScope.PLAYER,
+                                  category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                  side=MetricSide.NONE, is_derived=False),
+        "pct": MetricDefinition(slug="player_pass_pct", label_fr="Passes (%)", scope=MetricScope.PLAYER,
+                                category=MetricCategory.PASSES, datatype=MetricDataType.PERCENT,
+                                side=MetricSide.NONE, is_derived=False),
+        "attempts": MetricDefinition(slug="player_attempts", label_fr="Tentatives", scope=MetricScope.PLAYER,
+                                     category=MetricCategory.COMBINATIONS, datatype=MetricDataType.INT,
+                                     side=MetricSide.NONE, is_derived=True, formula="goals + shots"),
+        "team_goals": MetricDefinition(slug="team_goals_scored", label_fr="Buts marqués", scope=MetricScope.TEAM,
+                                       category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                       side=MetricSide.OWN, is_derived=False),
+    }
+    db_session.add_all(players + [match] + list(metrics.values()))
+    db_session.commit()
+    return {"match": match, "players": players, "metrics": metrics}
+
+def test_player_metrics_bulk_upsert(client, db_session, match_data):
+    """Test that the player grid is validated as a batch and upserted"""
+    match = match_data["match"]
+    john, jane = match_data["players"]
+    url = f"/metrics/matches/{match.id}/player-metrics"
+
+    response = client.put(url, json={"values": [
+        {"player_id": john.id, "metric_slug": "player_goals", "value": 1},
+        {"player_id": jane.id, "metric_slug": "player_goals", "value": 2},
+        {"player_id": jane.id, "metric_slug": "player_shots", "value": 4},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {"created": 3, "updated": 0, "errors": []}
+
+    response = client.put(url, json={"values": [
+        {"player_id": john.id, "metric_slug": "player_goals", "value": 3},
+        {"player_id": john.id, "metric_slug": "player_shots", "value": 5},
+        {"player_id": john.id, "metric_slug": "unknown", "value": 1},
+        {"player_id": john.id, "metric_slug": "player_attempts", "value": 1},
+        {"player_id": john.id, "metric_slug": "team_goals_scored", "value": 1},
+        {"player_id": 999, "metric_slug": "player_goals", "value": 1},
+        {"player_id": john.id, "metric_slug": "player_pass_pct", "value": 120},
+    ]})
+    assert response.json() == {
+        "created": 1,
+        "updated": 1,
+        "errors": [
+            "Metric unknown not found",
+            "Cannot store derived metric player_attempts",
+            "Metric team_goals_scored is not a player metric",
+            "Player 999 not found",
+            "Percentage value must be between 0 and 100",
+        ],
+    }
+
+    stored = {
+        (v.player_id, v.metric_id): v.value_number
+        for v in db_session.query(PlayerMatchMetricValue).all()
+    }
+    goals, shots = match_data["metrics"]["goals"].id, match_data["metrics"]["shots"].id
+    assert stored == {(john.id, goals): 3, (john.id, shots): 5, (jane.id, goals): 2, (jane.id, shots): 4}
+
+def test_team_metrics_bulk_upsert(client, match_data):
+    """Test that team metrics are validated as a batch and upserted per side"""
+    match = match_data["match"]
+    url = f"/metrics/matches/{match.id}/team-metrics"
+
+    response = client.put(url, json={"values": [
+        {"metric_slug": "team_goals_scored", "side": "OWN", "value": 2},
+        {"metric_slug": "team_goals_scored", "side": "OPPONENT", "value": 1},
+    ]})
+    assert response.json() == {"created": 2, "updated": 0, "errors": []}
+
+    response = client.put(url, json={"values": [
+        {"metric_slug": "team_goals_scored", "side": "OWN", "value": 3},
+        {"metric_slug": "player_goals", "side": "OWN", "value": 1},
+    ]})
+    assert response.json() == {
+        "created": 0,
+        "updated": 1,
+        "errors": ["Metric player_goals is not a team metric"],
+    }
+
+    values = client.get(url).json()
+    assert sorted((v["side"], v["value"]) for v in values) == [("OPPONENT", 1.0), ("OWN", 3.0)]
+
+def test_player_metrics_unknown_match(client, match_data):
+    """Test that writing metrics for a missing match returns 404"""
+    response = client.put("/metrics/matches/999/player-metrics", json={"values": []})
+    assert response.status_code == 404
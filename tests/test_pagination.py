@@ -0,0 +1,67 @@
+import pytest
+from datetime import date
+from app.models import Team, Season, Player, Match, MatchType
+
+@pytest.fixture
+def list_data(db_session):
+    """One team with five matches (two on the same day) and four players"""
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    days = [1, 8, 8, 15, 22]
+    db_session.add_all([
+        Match(team_id=team.id, season_id=season.id, date=date(2024, 3, day),
+              opponent_name=f"Opponent {i}", match_type=MatchType.LEAGUE, veo_url=f"https://veo/{i}")
+        for i, day in enumerate(days)
+    ])
+    db_session.add_all([
+        Player(team_id=team.id, first_name=first, last_name=last, main_position="Milieu")
+        for first, last in [("Ana", "Martin"), ("Zoe", "Bernard"), ("Leo", "Martin"), ("Ana", "Martin")]
+    ])
+    db_session.commit()
+    return {"team_id": team.id}
+
+def _pages(client, url, params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages, response
+
+def test_matches_keyset_pages(client, list_data):
+    """Test that pages follow (date desc, id desc) without gaps or duplicates"""
+    everything = client.get("/matches", params={"team_id": list_data["team_id"]}).json()
+    assert len(everything) == 5
+
+    pages, last = _pages(client, "/matches", {"team_id": list_data["team_id"], "limit": 2})
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [m["id"] for p in pages for m in p] == [m["id"] for m in everything]
+    assert "X-Total-Count" not in last.headers
+
+    response = client.get("/matches", params={
+        "team_id": list_data["team_id"], "limit": 2, "fields": "id,opponent_name", "include_total": True,
+    })
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.json()[0] == {"id": everything[0]["id"], "opponent_name": everything[0]["opponent_name"]}
+
+    # The projected cursor continues where the full rows would
+    second = client.get("/matches", params={
+        "team_id": list_data["team_id"], "limit": 2, "fields": "opponent_name",
+        "cursor": response.headers["X-Next-Cursor"],
+    }).json()
+    assert [m["opponent_name"] for m in second] == [m["opponent_name"] for m in everything[2:4]]
+
+def test_players_keyset_pages(client, list_data):
+    pages, _ = _pages(client, "/players", {"team_id": list_data["team_id"], "limit": 3})
+    names = [(p["last_name"], p["first_name"]) for page in pages for p in page]
+    assert names == [("Bernard", "Zoe"), ("Martin", "Ana"), ("Martin", "Ana"), ("Martin", "Leo")]
+    assert len({p["id"] for page in pages for p in page}) == 4
+
+def test_list_rejects_bad_cursor_and_fields(client, list_data):
+    assert client.get("/matches", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/players", params={"fields": "id,salary"}).status_code == 400
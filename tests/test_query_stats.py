@@ -0,0 +1,55 @@
+import logging
+from sqlalchemy import text
+from app.config import settings
+from app.db.query_stats import current_query_stats, start_query_stats, statement_label, stop_query_stats
+from app.instrumentation import request_metrics
+from app.models import Team
+
+def test_query_stats_collection(db_session):
+    """Test statement and hydrated row counting for the current context"""
+    db_session.add_all([Team(name="A"), Team(name="B")])
+    db_session.commit()
+    db_session.expunge_all()
+
+    token = start_query_stats()
+    try:
+        assert len(db_session.query(Team).all()) == 2
+        stats = current_query_stats()
+    finally:
+        stop_query_stats(token)
+    assert stats.statements == 1
+    assert stats.rows_hydrated == 2
+    assert stats.slowest_statement.startswith("SELECT")
+    assert statement_label(stats.slowest_statement) == "SELECT teams"
+    assert current_query_stats() is None
+
+def test_slow_query_logged_with_plan(db_session, monkeypatch, caplog):
+    """Test the slow statement warning and its EXPLAIN plan"""
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+        db_session.execute(text("SELECT id FROM teams WHERE name = :name"), {"name": "A"})
+    assert "Slow SQL statement" in caplog.text
+    assert "Plan:" in caplog.text and "teams" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+        db_session.execute(text("SELECT 1"))
+    assert caplog.text == ""
+
+def test_server_timing_and_metrics(client):
+    """Test the Server-Timing header and the Prometheus exposition"""
+    request_metrics.clear()
+    client.post("/teams", json={"name": "Test Team"})
+    response = client.get("/teams")
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=") and '1 queries' in timing and "app;dur=" in timing
+    assert 'db-slowest;dur=' in timing and 'desc="SELECT teams"' in timing
+    assert response.headers["x-db-rows-hydrated"] == "1"
+
+    body = client.get("/health/metrics").text
+    assert 'http_requests_total{method="GET",route="/teams",status="200"} 1' in body
+    assert 'db_statements_total{method="GET",route="/teams",status="200"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/teams",status="200",le="+Inf"} 1' in body
+    assert "# TYPE db_pool_checked_out gauge" in body
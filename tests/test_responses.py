@@ -0,0 +1,49 @@
+import json
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+from app import responses, schemas
+from app.schemas.construct import trusted_construct
+from app.services.match_summary import MatchSummaryService
+from tests.test_summary_export import _seed_export_data
+
+def test_trusted_construct_matches_validation():
+    """Test that trusted construction serializes like model_validate"""
+    data = {
+        "kpis": [{"metric_slug": "team_shots", "metric_label": "Tirs", "value": 12, "unit": None, "delta": None}],
+        "timeseries": {"metric_slug": "team_shots", "metric_label": "Tirs", "data": [
+            {"match_id": 1, "match_date": date(2024, 6, 1), "opponent_name": "Alpha FC", "value": 12.5},
+        ]},
+        "radar": None,
+        "leaderboards": [{"metric_slug": "player_goals", "metric_label": "Buts", "unit": None, "entries": [
+            {"player_id": 1, "player_name": "John Doe", "value": 2.0, "matches_played": 1},
+        ]}],
+    }
+    built = trusted_construct(schemas.DashboardResponse, data)
+    assert isinstance(built.leaderboards[0].entries[0], schemas.LeaderboardEntry)
+    assert built.model_dump_json() == schemas.DashboardResponse.model_validate(data).model_dump_json()
+
+    with pytest.raises(ValidationError):
+        # Missing metric_label: falls back to validation
+        trusted_construct(schemas.LeaderboardResponse, {"metric_slug": "unknown", "entries": []})
+
+def test_match_summary_construct_parity(db_session):
+    """Test that the constructed summary serializes like a validated one"""
+    match_id = _seed_export_data(db_session)["match_ids"][0]
+    for grid in ("nested", "columnar"):
+        summary = MatchSummaryService(db_session).get_match_summary(match_id, grid=grid)
+        validated = schemas.MatchSummaryResponse.model_validate(summary.model_dump())
+        assert summary.model_dump_json() == validated.model_dump_json()
+
+def test_fast_json_response(client, monkeypatch):
+    """Test the default response class, with and without orjson"""
+    payload = {"name": "Équipe", "values": [1, 2.5, None]}
+    assert json.loads(responses.dumps(payload)) == payload
+    monkeypatch.setattr(responses, "orjson", None)
+    assert responses.dumps(payload) == '{"name":"Équipe","values":[1,2.5,null]}'.encode("utf-8")
+
+    response = client.post("/teams", json={"name": "Équipe"})
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["name"] == "Équipe"
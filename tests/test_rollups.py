@@ -0,0 +1,122 @@
+import pytest
+from datetime import date
+from app.config import settings
+from app.models import (
+    Team, Season, Player, Match, MetricDefinition, TeamMatchMetricValue,
+    TeamSeasonMetricRollup, PlayerSeasonMetricRollup,
+    MatchType, MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from app.services.analytics import AnalyticsService
+from app.services.rollups import check_rollups, rebuild_rollups
+
+@pytest.fixture
+def rollup_data(db_session):
+    """Two seasons, one match each, a player and three metric definitions"""
+    team = Team(name="Test Team")
+    seasons = [
+        Season(label="2023", start_date=date(2023, 1, 1), end_date=date(2023, 12, 31)),
+        Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)),
+    ]
+    db_session.add_all([team] + seasons)
+    db_session.commit()
+
+    player = Player(team_id=team.id, first_name="John", last_name="Doe", main_position="Attaquant")
+    matches = [
+        Match(team_id=team.id, season_id=seasons[0].id, date=date(2023, 5, 1),
+              opponent_name="Alpha FC", match_type=MatchType.LEAGUE),
+        Match(team_id=team.id, season_id=seasons[1].id, date=date(2024, 5, 1),
+              opponent_name="Beta FC", match_type=MatchType.LEAGUE),
+    ]
+    metrics = [
+        MetricDefinition(slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                         side=MetricSide.OWN, is_derived=False),
+        MetricDefinition(slug="team_possession", label_fr="Possession", scope=MetricScope.TEAM,
+                         category=MetricCategory.POSSESSION, datatype=MetricDataType.PERCENT,
+                         side=MetricSide.OWN, is_derived=False),
+        MetricDefinition(slug="player_goals", label_fr="Buts", scope=MetricScope.PLAYER,
+                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                         side=MetricSide.NONE, is_derived=False),
+    ]
+    db_session.add_all([player] + matches + metrics)
+    db_session.commit()
+    return {"team_id": team.id, "season_ids": [s.id for s in seasons],
+            "match_ids": [m.id for m in matches], "player_id": player.id}
+
+def _team_rollups(db_session):
+    return {
+        (r.season_id, r.side.value): (r.value_sum, r.value_count)
+        for r in db_session.query(TeamSeasonMetricRollup).all()
+    }
+
+def test_rollups_follow_bulk_upserts(client, db_session, rollup_data):
+    """Test that bulk upserts, match moves and deletions keep rollups in sync"""
+    first, second = rollup_data["match_ids"]
+    old_season, new_season = rollup_data["season_ids"]
+    player_id = rollup_data["player_id"]
+
+    for match_id, shots in ((first, 10), (second, 4)):
+        client.put(f"/metrics/matches/{match_id}/team-metrics", json={"values": [
+            {"metric_slug": "team_shots", "side": "OWN", "value": shots},
+            {"metric_slug": "team_possession", "side": "OWN", "value": 60},
+        ]})
+        client.put(f"/metrics/matches/{match_id}/player-metrics", json={"values": [
+            {"player_id": player_id, "metric_slug": "player_goals", "value": 1},
+        ]})
+    client.put(f"/metrics/matches/{first}/team-metrics", json={"values": [
+        {"metric_slug": "team_shots", "side": "OWN", "value": 12},
+    ]})
+    assert check_rollups(db_session) == []
+
+    shots = db_session.query(TeamSeasonMetricRollup).filter(
+        TeamSeasonMetricRollup.season_id == old_season,
+        TeamSeasonMetricRollup.value_count == 1,
+        TeamSeasonMetricRollup.value_sum == 12,
+    ).count()
+    assert shots == 1
+
+    # Moving a match to another season (e.g. re-ingested) moves its contributions
+    db_session.get(Match, first).season_id = new_season
+    db_session.commit()
+    assert check_rollups(db_session) == []
+    assert db_session.query(TeamSeasonMetricRollup).filter(
+        TeamSeasonMetricRollup.season_id == old_season
+    ).count() == 0
+
+    kpis = AnalyticsService(db_session).get_team_kpis(
+        rollup_data["team_id"], ["team_shots", "team_possession"], season_id=new_season
+    )
+    assert [k["value"] for k in kpis] == [16.0, 60.0]
+
+    # Deleting a match removes its contributions (cascaded ORM deletes)
+    assert client.delete(f"/matches/{second}").status_code == 204
+    assert check_rollups(db_session) == []
+    player_rollup = db_session.query(PlayerSeasonMetricRollup).one()
+    assert (player_rollup.value_sum, player_rollup.value_count) == (1.0, 1)
+
+def test_rollups_check_and_rebuild(db_session, rollup_data, monkeypatch):
+    """Test that stale rollups are detected and rebuilt, and match the raw KPIs"""
+    first, second = rollup_data["match_ids"]
+    metric = db_session.query(MetricDefinition).filter_by(slug="team_shots").one()
+    db_session.add_all([
+        TeamMatchMetricValue(match_id=first, metric_id=metric.id, side=MetricSide.OWN, value_number=3),
+        TeamMatchMetricValue(match_id=second, metric_id=metric.id, side=MetricSide.OWN, value_number=5),
+    ])
+    db_session.commit()
+    assert check_rollups(db_session) == []
+
+    # Writes bypassing the ORM and the bulk upserts are not tracked
+    db_session.query(TeamMatchMetricValue).filter(
+        TeamMatchMetricValue.match_id == second
+    ).delete(synchronize_session=False)
+    db_session.commit()
+    assert len(check_rollups(db_session)) == 1
+
+    assert rebuild_rollups(db_session) == {"team": 1, "player": 0}
+    db_session.commit()
+    assert check_rollups(db_session) == []
+
+    analytics = AnalyticsService(db_session)
+    with_rollups = analytics.get_team_kpis(rollup_data["team_id"], ["team_shots"])
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", False)
+    assert analytics.get_team_kpis(rollup_data["team_id"], ["team_shots"]) == with_rollups
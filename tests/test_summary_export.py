@@ -0,0 +1,197 @@
+import base64
+import csv
+import io
+import json
+import re
+from datetime import date
+
+import pytest
+from app.models import (
+    Team, Season, Player, Match, MatchPlayerParticipation, MetricDefinition,
+    PlayerMatchMetricValue, TeamMatchMetricValue,
+    MatchType, MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from sqlalchemy.orm import Session
+from app.routes import matches as matches_routes
+from app.services.match_summary import MatchSummaryService
+
+def _seed_export_data(db_session):
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    john = Player(team_id=team.id, first_name="John", last_name="Doe", main_position="Attaquant")
+    jane = Player(team_id=team.id, first_name="Jane", last_name="Smith", main_position="Milieu")
+    first = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 1),
+                  opponent_name="Alpha FC", match_type=MatchType.LEAGUE, score_for=2, score_against=1)
+    second = Match(team_id=team.id, season_id=season.id, date=date(2024, 6, 8),
+                   opponent_name="Beta FC", match_type=MatchType.LEAGUE)
+    goals = MetricDefinition(slug="player_goals", label_fr="Buts", scope=MetricScope.PLAYER,
+                             category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                             side=MetricSide.NONE, is_derived=False)
+    shots = MetricDefinition(slug="player_shots", label_fr="Tirs", scope=MetricScope.PLAYER,
+                             category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                             side=MetricSide.NONE, is_derived=False)
+    team_shots = MetricDefinition(slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+                                  category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                  side=MetricSide.OWN, is_derived=False)
+    db_session.add_all([john, jane, first, second, goals, shots, team_shots])
+    db_session.commit()
+
+    db_session.add_all([
+        MatchPlayerParticipation(match_id=first.id, player_id=john.id, is_starter=True, minutes_played=90),
+        PlayerMatchMetricValue(match_id=first.id, player_id=john.id, metric_id=goals.id, value_number=2),
+        PlayerMatchMetricValue(match_id=first.id, player_id=john.id, metric_id=shots.id, value_number=5),
+        PlayerMatchMetricValue(match_id=first.id, player_id=jane.id, metric_id=shots.id, value_number=1),
+        PlayerMatchMetricValue(match_id=second.id, player_id=jane.id, metric_id=goals.id, value_number=1),
+        TeamMatchMetricValue(match_id=first.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=12),
+        TeamMatchMetricValue(match_id=first.id, metric_id=team_shots.id, side=MetricSide.OPPONENT, value_number=7),
+        TeamMatchMetricValue(match_id=second.id, metric_id=team_shots.id, side=MetricSide.OWN, value_number=9),
+    ])
+    db_session.commit()
+    return {"team_id": team.id, "season_id": season.id, "match_ids": [first.id, second.id]}
+
+@pytest.fixture
+def export_data(db_session):
+    """Two matches of one team with player and team metric values"""
+    return _seed_export_data(db_session)
+
+def _read_csv(response):
+    return list(csv.reader(io.StringIO(response.content.decode("utf-8"))))
+
+def test_match_summary_csv(client, export_data):
+    """Test the per-match player grid export"""
+    match_id = export_data["match_ids"][0]
+    response = client.get(f"/matches/{match_id}/summary.csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert f'match_{match_id}_players.csv' in response.headers["content-disposition"]
+
+    header, *rows = _read_csv(response)
+    assert header[-2:] == ["player_goals", "player_shots"]
+    assert [row[header.index("player_name")] for row in rows] == ["John Doe", "Jane Smith"]
+    assert rows[0][header.index("is_starter")] == "True"
+    assert rows[0][header.index("minutes_played")] == "90"
+    assert rows[0][-2:] == ["2.0", "5.0"]
+    assert rows[1][header.index("is_starter")] == ""
+    assert rows[1][-2:] == ["", "1.0"]
+
+    assert client.get("/matches/999/summary.csv").status_code == 404
+
+def test_match_summary_async_route(client, export_data):
+    """Test the JSON summary served by the async route"""
+    match_id = export_data["match_ids"][0]
+    response = client.get(f"/matches/{match_id}/summary")
+    assert response.status_code == 200
+    grid = response.json()["player_metrics"]
+    assert [c["slug"] for c in grid["columns"]] == ["player_goals", "player_shots"]
+
+    assert client.get("/matches/999/summary").status_code == 404
+
+def test_match_summary_columnar_grid(client, export_data):
+    """Test that the columnar grid decodes to the nested grid"""
+    match_id = export_data["match_ids"][0]
+    nested = client.get(f"/matches/{match_id}/summary").json()["player_metrics"]
+    columnar = client.get(f"/matches/{match_id}/summary?grid=columnar").json()["player_metrics"]
+
+    assert columnar["format"] == "columnar"
+    assert columnar["players"] == nested["players"] and columnar["columns"] == nested["columns"]
+    present = base64.b64decode(columnar["present"])
+    width = len(columnar["columns"])
+
+    def cell(i):
+        return columnar["values"][i] if present[i >> 3] >> (i & 7) & 1 else None
+
+    decoded = {
+        str(player["id"]): {column["slug"]: cell(r * width + c) for c, column in enumerate(columnar["columns"])}
+        for r, player in enumerate(columnar["players"])
+    }
+    assert decoded == nested["values"]
+    john = next(p for p in columnar["players"] if p["name"] == "John Doe")
+    assert decoded[str(john["id"])] == {"player_goals": 2.0, "player_shots": 5.0}
+
+    assert client.get(f"/matches/{match_id}/summary?grid=sparse").status_code == 422
+
+def _query_count(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+def test_match_summaries_batch(client, export_data):
+    """Test that batch summaries match the single ones with the same number of queries"""
+    first, second = export_data["match_ids"]
+    single = client.get(f"/matches/{first}/summary")
+    batch = client.get(f"/matches/summaries?ids={second},{first}")
+    assert batch.status_code == 200
+    assert [s["match"]["id"] for s in batch.json()] == [first, second]
+    assert batch.json()[0] == single.json()
+    assert batch.json()[1]["team_metrics"]["OPPONENT"] == []
+    assert _query_count(batch) == _query_count(single)
+
+    by_team = client.get(f"/matches/summaries?team_id={export_data['team_id']}&grid=columnar")
+    assert [s["player_metrics"]["format"] for s in by_team.json()] == ["columnar", "columnar"]
+
+    missing = client.get(f"/matches/summaries?ids={first},999")
+    assert missing.status_code == 404 and "999" in missing.json()["detail"]
+    assert client.get("/matches/summaries").status_code == 400
+    assert client.get("/matches/summaries?ids=1,x").status_code == 400
+
+def test_match_summary_json_parity(pg_session):
+    """Test that the single-statement PostgreSQL summary equals the ORM payload"""
+    data = _seed_export_data(pg_session)
+    # Accented / differently cased / duplicate names: same order on both paths
+    goals = pg_session.query(MetricDefinition).filter_by(slug="player_goals").one()
+    names = [("Élodie", "Martin"), ("elodie", "Martin"), ("Zoé", "Abel"), ("Émile", "Dupont"),
+             ("emile", "dupont"), ("Jean", "Dupont"), ("Jean", "Dupont"), ("jean", "Dupont"),
+             ("Øystein", "Berg"), ("éric", "Berg")]
+    players = [Player(team_id=data["team_id"], first_name=first, last_name=last, main_position="Milieu")
+               for first, last in names]
+    pg_session.add_all(players)
+    pg_session.flush()
+    pg_session.add_all([
+        PlayerMatchMetricValue(match_id=data["match_ids"][0], player_id=player.id, metric_id=goals.id, value_number=1)
+        for player in players
+    ])
+    pg_session.commit()
+
+    service = MatchSummaryService(pg_session)
+    for match_id in data["match_ids"]:
+        expected = json.loads(service.get_match_summary(match_id).model_dump_json())
+        assert json.loads(service.get_match_summary_json(match_id)) == expected
+    with pytest.raises(ValueError):
+        service.get_match_summary_json(999)
+
+def test_season_export(client, export_data):
+    """Test the team-level exports (players and team kinds, CSV and XLSX)"""
+    team_id = export_data["team_id"]
+
+    response = client.get(f"/matches/export.csv?team_id={team_id}&season_id={export_data['season_id']}")
+    header, *rows = _read_csv(response)
+    assert len(rows) == 3
+    assert [row[header.index("opponent_name")] for row in rows] == ["Alpha FC", "Alpha FC", "Beta FC"]
+
+    response = client.get(f"/matches/export.csv?team_id={team_id}&kind=team")
+    header, *rows = _read_csv(response)
+    assert header[-2:] == ["team_shots:OPPONENT", "team_shots:OWN"]
+    assert [row[-2:] for row in rows] == [["7.0", "12.0"], ["", "9.0"]]
+
+    response = client.get(f"/matches/export.xlsx?team_id={team_id}")
+    assert response.status_code == 200
+    assert response.content[:2] == b"PK"
+
+    assert client.get("/matches/export.csv?team_id=999").status_code == 404
+    assert client.get(f"/matches/export.pdf?team_id={team_id}").status_code in (404, 422)
+
+def test_export_streams_from_dedicated_session(client, export_data, db_session, monkeypatch):
+    """Test that the export body reads from its own session, closed once streamed"""
+    opened = []
+
+    def session_local(**kwargs):
+        opened.append(Session(**kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(matches_routes, "SessionLocal", session_local)
+    response = client.get(f"/matches/export.csv?team_id={export_data['team_id']}")
+    assert len(_read_csv(response)) == 4
+    assert len(opened) == 1 and opened[0] is not db_session
+    assert opened[0].get_bind() is db_session.get_bind()
+    assert not opened[0].in_transaction()
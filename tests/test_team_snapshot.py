@@ -0,0 +1,177 @@
+import pytest
+from datetime import date
+from sqlalchemy import event
+from app.config import settings
+from app.models import (
+    Team, Season, Player, Match, MatchPlayerParticipation, MetricDefinition,
+    PlayerMatchMetricValue, TeamMatchMetricValue,
+    MatchType, MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from app.services.analytics import AnalyticsService
+from app.services.team_snapshot import TeamSnapshot, get_team_snapshot
+
+@pytest.fixture
+def snapshot_data(db_session):
+    """Three matches with team values, two players with raw / derived player metrics"""
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+
+    players = [
+        Player(team_id=team.id, first_name="John", last_name="Doe", main_position="Attaquant"),
+        Player(team_id=team.id, first_name="Jane", last_name="Smith", main_position="Milieu"),
+    ]
+    matches = [
+        Match(team_id=team.id, season_id=season.id, date=date(2024, 3, day),
+              opponent_name=f"Opponent {day}", match_type=MatchType.LEAGUE)
+        for day in (1, 8, 15)
+    ]
+    metrics = {
+        "team_shots": MetricDefinition(slug="team_shots", label_fr="Tirs", scope=MetricScope.TEAM,
+                                       category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                       side=MetricSide.OWN, is_derived=False),
+        "team_goals_scored": MetricDefinition(slug="team_goals_scored", label_fr="Buts", scope=MetricScope.TEAM,
+                                              category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                              side=MetricSide.OWN, is_derived=False),
+        "team_conversion_rate": MetricDefinition(slug="team_conversion_rate", label_fr="Conversion",
+                                                 scope=MetricScope.TEAM, category=MetricCategory.COMBINATIONS,
+                                                 datatype=MetricDataType.PERCENT, side=MetricSide.OWN,
+                                                 is_derived=True, formula="goals_scored / shots * 100"),
+        "player_goals": MetricDefinition(slug="player_goals", label_fr="Buts", scope=MetricScope.PLAYER,
+                                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                         side=MetricSide.NONE, is_derived=False),
+        "player_shots": MetricDefinition(slug="player_shots", label_fr="Tirs", scope=MetricScope.PLAYER,
+                                         category=MetricCategory.EVENTS, datatype=MetricDataType.INT,
+                                         side=MetricSide.NONE, is_derived=False),
+        "player_attempts": MetricDefinition(slug="player_attempts", label_fr="Tentatives",
+                                            scope=MetricScope.PLAYER, category=MetricCategory.COMBINATIONS,
+                                            datatype=MetricDataType.INT, side=MetricSide.NONE,
+                                            is_derived=True, formula="goals + shots"),
+    }
+    db_session.add_all(players + matches + list(metrics.values()))
+    db_session.commit()
+
+    for match, shots, goals in zip(matches, (10, 4, 8), (2, 1, 0)):
+        db_session.add_all([
+            TeamMatchMetricValue(match_id=match.id, metric_id=metrics["team_shots"].id,
+                                 side=MetricSide.OWN, value_number=shots),
+            TeamMatchMetricValue(match_id=match.id, metric_id=metrics["team_goals_scored"].id,
+                                 side=MetricSide.OWN, value_number=goals),
+        ])
+        for player, goals_p in zip(players, (goals, 0)):
+            db_session.add_all([
+                MatchPlayerParticipation(match_id=match.id, player_id=player.id, is_starter=True),
+                PlayerMatchMetricValue(match_id=match.id, player_id=player.id,
+                                       metric_id=metrics["player_goals"].id, value_number=goals_p),
+            ])
+    db_session.add(PlayerMatchMetricValue(match_id=matches[1].id, player_id=players[1].id,
+                                          metric_id=metrics["player_shots"].id, value_number=5))
+    db_session.commit()
+    return {"team_id": team.id, "season_id": season.id, "match_ids": [m.id for m in matches],
+            "metric_ids": {slug: m.id for slug, m in metrics.items()}}
+
+def _analytics_results(db_session, data):
+    analytics = AnalyticsService(db_session)
+    team_id = data["team_id"]
+    slugs = ["team_shots", "team_goals_scored", "team_conversion_rate"]
+    return {
+        "kpis": analytics.get_team_kpis(team_id, slugs, season_id=data["season_id"]),
+        "delta": analytics.get_team_kpis(team_id, slugs, date_from=date(2024, 3, 8), date_to=date(2024, 3, 15),
+                                         compute_delta=True),
+        "radar": analytics.get_team_radar(team_id, slugs, date(2024, 3, 1), date(2024, 3, 7),
+                                          date(2024, 3, 8), date(2024, 3, 31)),
+        "timeseries": analytics.get_team_timeseries(team_id, "team_conversion_rate", last_n=2),
+        "multi": analytics.get_team_multi_timeseries(team_id, slugs, last_n=3, transforms=["ewm"]),
+        "leaderboard": analytics.get_player_leaderboard(team_id, "player_goals"),
+        "derived_leaderboard": analytics.get_player_leaderboard(team_id, "player_attempts",
+                                                                season_id=data["season_id"]),
+    }
+
+def test_snapshot_matches_database_results(db_session, snapshot_data, monkeypatch):
+    """Test that analytics answered from the snapshot equal the SQL results"""
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 0)
+    expected = _analytics_results(db_session, snapshot_data)
+
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 4)
+    assert _analytics_results(db_session, snapshot_data) == expected
+    # John: 2 + 1 + 0 goals, Jane: 5 shots
+    assert [e["value"] for e in expected["derived_leaderboard"]["entries"]] == [5.0, 3.0]
+
+def test_snapshot_reloaded_after_writes(db_session, snapshot_data, monkeypatch):
+    """Test that the snapshot serves reads without value queries and follows writes"""
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 4)
+    team_id = snapshot_data["team_id"]
+    analytics = AnalyticsService(db_session)
+
+    first = get_team_snapshot(db_session, team_id)
+    assert len(first) == 3
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.bind, "before_cursor_execute", listener)
+    try:
+        kpis = analytics.get_team_kpis(team_id, ["team_shots"], season_id=snapshot_data["season_id"])
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", listener)
+    assert kpis[0]["value"] == 22.0
+    # Only the team version stamp is read
+    assert len(statements) == 1 and "data_versions" in statements[0]
+    assert get_team_snapshot(db_session, team_id) is first
+
+    # Uncommitted writes bypass the snapshot, committed ones reload it
+    db_session.add(TeamMatchMetricValue(match_id=snapshot_data["match_ids"][0],
+                                        metric_id=snapshot_data["metric_ids"]["team_shots"],
+                                        side=MetricSide.OPPONENT, value_number=3))
+    db_session.flush()
+    assert get_team_snapshot(db_session, team_id) is None
+    db_session.query(TeamMatchMetricValue).filter(
+        TeamMatchMetricValue.match_id == snapshot_data["match_ids"][0],
+        TeamMatchMetricValue.side == MetricSide.OWN,
+        TeamMatchMetricValue.metric_id == snapshot_data["metric_ids"]["team_shots"],
+    ).one().value_number = 12
+    db_session.commit()
+
+    refreshed = get_team_snapshot(db_session, team_id)
+    assert refreshed is not first
+    kpis = analytics.get_team_kpis(team_id, ["team_shots"], season_id=snapshot_data["season_id"])
+    assert kpis[0]["value"] == 24.0
+
+def test_pin_team_data_only_uses_shared_snapshot(db_session, snapshot_data, monkeypatch):
+    """Test that pinning does not load the team's whole history when snapshots are disabled"""
+    team_id = snapshot_data["team_id"]
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 0)
+    analytics = AnalyticsService(db_session)
+    assert analytics.pin_team_data(team_id) is None
+    assert analytics._team_snapshot(team_id) is None
+
+    monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_TEAMS", 4)
+    analytics = AnalyticsService(db_session)
+    assert analytics.pin_team_data(team_id) is get_team_snapshot(db_session, team_id)
+
+def test_snapshot_period_slices_and_match_rows():
+    """Test bisect period slicing and per-match row offsets against a full scan"""
+    matches = [(5, date(2024, 3, 8), 1, "B"), (2, date(2024, 3, 1), 1, "A"),
+               (9, date(2024, 3, 8), 2, "C"), (4, date(2024, 3, 20), 2, "D")]
+    player_values = [(1, 5, "goals", 1.0), (2, 5, "goals", 2.0), (1, 2, "goals", 3.0),
+                     (2, 9, "shots", 4.0), (1, 4, "goals", 5.0), (2, 4, "goals", 6.0)]
+    snapshot = TeamSnapshot(1, (1, 1), matches, [], [(1, "John", "Doe"), (2, "Jane", "Smith")],
+                            [(1, 5), (2, 5), (1, 2), (2, 9), (1, 4)], player_values)
+
+    periods = [(None, None), (date(2024, 3, 8), date(2024, 3, 8)), (date(2024, 3, 2), None),
+               (None, date(2024, 3, 7)), (date(2024, 3, 21), None), (date(2024, 3, 9), date(2024, 3, 1))]
+    for season_id in (None, 1, 2):
+        expected = [
+            sorted(mid for mid, day, season, _ in matches
+                   if (not season_id or season == season_id)
+                   and (start is None or day >= start) and (end is None or day <= end))
+            for start, end in periods
+        ]
+        assert snapshot.period_match_ids(periods, season_id) == expected
+
+    assert snapshot.player_totals("goals", [5, 4, 404]) == {1: 6.0, 2: 8.0}
+    assert snapshot.player_totals("shots", [5, 2]) == {}
+    assert snapshot.matches_played([5, 9, 2]) == {1: 2, 2: 2}
+    matrix = snapshot.player_matrix([5, 4], [("goals", MetricSide.NONE)], [2])
+    assert matrix.row_keys == [(2, 4), (2, 5)]
+    assert matrix.columns[("goals", MetricSide.NONE)] == [6.0, 2.0]
@@ -0,0 +1,136 @@
+import threading
+import time
+from datetime import date
+from app.config import settings
+from app.models import (
+    Team, Season, Match, MatchType, MetricDefinition,
+    MetricScope, MetricCategory, MetricDataType, MetricSide
+)
+from app.services import wide_metrics
+from app.services.analytics import AnalyticsService
+from app.services.metric_writes import write_team_values
+from tests.migrations import run_migration
+from app.services.wide_metrics import (
+    WideViewRefresher, load_wide_team_matrix, refresh_wide_view, wide_column_name, wide_view_columns
+)
+
+WIDE_VIEW_MIGRATION = "d5a2b9e4c107_add_team_match_metrics_wide_view.py"
+
+def _metric(slug):
+    return MetricDefinition(slug=slug, label_fr=slug, scope=MetricScope.TEAM, category=MetricCategory.EVENTS,
+                            datatype=MetricDataType.INT, side=MetricSide.OWN, is_derived=False)
+
+def test_wide_column_name():
+    assert wide_column_name("team_shots", MetricSide.OWN) == "team_shots__own"
+    assert wide_column_name("team_shots", MetricSide.OPPONENT) == "team_shots__opponent"
+
+def test_wide_view_falls_back_outside_postgresql(db_session, monkeypatch):
+    """Test that SQLite reads the EAV table and never schedules refreshes"""
+    monkeypatch.setattr(settings, "ANALYTICS_USE_WIDE_VIEW", True)
+    requested = []
+    monkeypatch.setattr(wide_metrics, "request_wide_view_refresh", requested.append)
+
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    db_session.add_all([team, season])
+    db_session.commit()
+    db_session.add(Match(team_id=team.id, season_id=season.id, date=date(2024, 3, 1),
+                         opponent_name="Alpha FC", match_type=MatchType.LEAGUE))
+    db_session.commit()
+
+    assert load_wide_team_matrix(db_session, team.id, [1], [("team_shots", MetricSide.OWN)]) is None
+    assert requested == []
+
+def test_wide_view_refresher_coalesces_requests(monkeypatch, db_session):
+    """Test that requests made during a refresh trigger a single follow-up refresh"""
+    started, release, done = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+
+    def fake_refresh(db):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        if len(calls) == 2:
+            done.set()
+
+    monkeypatch.setattr(wide_metrics, "refresh_wide_view", fake_refresh)
+    refresher = WideViewRefresher(db_session.get_bind())
+    refresher.request()
+    assert started.wait(5)
+    for _ in range(5):
+        refresher.request()
+    release.set()
+    assert done.wait(5)
+    assert len(calls) == 2
+
+def test_wide_view_falls_back_to_eav_until_refreshed(pg_session, monkeypatch):
+    """Test the wide view on PostgreSQL: reads, EAV fallback after an unrefreshed write, refreshes"""
+    monkeypatch.setattr(settings, "ANALYTICS_USE_WIDE_VIEW", True)
+    requested = []
+    monkeypatch.setattr(wide_metrics, "request_wide_view_refresh", requested.append)
+    db = pg_session
+
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    shots = _metric("team_shots")
+    db.add_all([team, season, shots])
+    db.flush()
+    matches = [Match(team_id=team.id, season_id=season.id, date=date(2024, 3, day), opponent_name=f"Opp {day}",
+                     match_type=MatchType.LEAGUE) for day in (1, 8)]
+    db.add_all(matches)
+    db.flush()
+    match_ids = [m.id for m in matches]
+    write_team_values(db, [{"match_id": match_id, "metric_id": shots.id, "side": MetricSide.OWN,
+                            "value_number": value} for match_id, value in zip(match_ids, (10, 12))])
+    db.commit()
+    run_migration(db, WIDE_VIEW_MIGRATION, "upgrade")
+
+    key = ("team_shots", MetricSide.OWN)
+    wide = load_wide_team_matrix(db, team.id, match_ids, [key])
+    assert wide is not None and wide.filled(key) == [10.0, 12.0]
+
+    # Write without refresh: the view rows carry an older team version
+    write_team_values(db, [{"match_id": match_ids[0], "metric_id": shots.id, "side": MetricSide.OWN,
+                            "value_number": 15}])
+    db.commit()
+    assert requested
+    assert load_wide_team_matrix(db, team.id, match_ids, [key]) is None
+    series = AnalyticsService(db).get_team_timeseries(team.id, "team_shots", last_n=2)
+    assert [point["value"] for point in series["data"]] == [15.0, 12.0]
+
+    # Same columns: REFRESH ... CONCURRENTLY
+    refresh_wide_view(db)
+    db.commit()
+    assert load_wide_team_matrix(db, team.id, match_ids, [key]).filled(key) == [15.0, 12.0]
+
+    # New metric definition: the view is rebuilt with its columns
+    db.add(_metric("team_corners"))
+    db.commit()
+    refresh_wide_view(db)
+    db.commit()
+    assert "team_corners__own" in wide_view_columns(db)
+
+def test_wide_view_refreshed_after_commit(pg_session, monkeypatch):
+    """Test that a commit touching team data refreshes the view in the background"""
+    monkeypatch.setattr(settings, "ANALYTICS_USE_WIDE_VIEW", True)
+    db = pg_session
+    team = Team(name="Test Team")
+    season = Season(label="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    shots = _metric("team_shots")
+    db.add_all([team, season, shots])
+    db.flush()
+    match = Match(team_id=team.id, season_id=season.id, date=date(2024, 3, 1), opponent_name="Alpha FC",
+                  match_type=MatchType.LEAGUE)
+    db.add(match)
+    db.commit()
+    run_migration(db, WIDE_VIEW_MIGRATION, "upgrade")
+
+    write_team_values(db, [{"match_id": match.id, "metric_id": shots.id, "side": MetricSide.OWN,
+                            "value_number": 7}])
+    db.commit()
+    key = ("team_shots", MetricSide.OWN)
+    deadline = time.monotonic() + 10
+    while (wide := load_wide_team_matrix(db, team.id, [match.id], [key])) is None and time.monotonic() < deadline:
+        db.rollback()
+        time.sleep(0.05)
+    assert wide is not None and wide.filled(key) == [7.0]